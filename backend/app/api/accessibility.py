@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from app.core.auth import get_current_user
@@ -40,7 +40,7 @@ class TranslationResponse(BaseModel):
 async def text_to_speech(
     request: TTSRequest,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Convert text to speech using ElevenLabs
@@ -76,7 +76,7 @@ async def text_to_speech(
 async def translate_text(
     request: TranslationRequest,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Translate text using Google Translate
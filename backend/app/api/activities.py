@@ -1,112 +1,168 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from datetime import date, datetime
+from datetime import date, datetime, time, timezone
 from uuid import UUID
 
-from app.core.auth import get_current_user, get_current_staff
+from app.core.auth import get_current_user, get_current_staff, get_optional_user
+from app.core.config import settings
 from app.core.deps import get_db
-from app.models.activity import ActivityCreate, ActivityUpdate, ActivityResponse, ActivityListResponse, StaffContactInfo
-from app.db.models import Activity, User
+from app.models.activity import ActivityCreate, ActivityUpdate, ActivityResponse, ActivityListResponse
 from app.services.activity_service import ActivityService
+from app.services.activity_response_builder import ActivityResponseBuilder, resolve_language, activity_columns
+from app.core.responses import FastJSONResponse, dumps, etag_matches, not_modified, http_date
+from app.services.activity_catalog_cache import get_activity_catalog_cache
+from app.services.catalog_version import get_catalog_version
+from app.utils.cursors import encode_cursor, decode_cursor, InvalidCursorError
 
 router = APIRouter()
 
-
-def _build_activity_response(activity: Activity, db: Session) -> ActivityResponse:
-    """Helper to build ActivityResponse with POC info and translations"""
-    response_data = {
-        "id": activity.id,
-        "title": activity.title,
-        "description": activity.description,
-        "date": activity.date,
-        "start_time": activity.start_time,
-        "end_time": activity.end_time,
-        "location": activity.location,
-        "max_capacity": activity.max_capacity,
-        "current_participants": activity.current_participants,
-        "program_type": activity.program_type,
-        "wheelchair_accessible": activity.wheelchair_accessible,
-        "payment_required": activity.payment_required,
-        "created_by_staff_id": activity.created_by_staff_id,
-        "created_at": activity.created_at,
-        "point_of_contact": None,
-        # Include translations
-        "title_zh": activity.title_zh,
-        "title_ms": activity.title_ms,
-        "title_ta": activity.title_ta,
-        "description_zh": activity.description_zh,
-        "description_ms": activity.description_ms,
-        "description_ta": activity.description_ta,
-    }
-    
-    # Fetch POC information if available
-    if activity.created_by_staff_id:
-        staff = db.query(User).filter(User.id == activity.created_by_staff_id).first()
-        if staff:
-            response_data["point_of_contact"] = StaffContactInfo(
-                id=staff.id,
-                full_name=staff.full_name,
-                email=staff.email,
-                phone=staff.phone
-            )
-    
-    return ActivityResponse(**response_data)
+# Keyset for list pagination: (date, start_time, id)
+CURSOR_FIELDS = (date.fromisoformat, time.fromisoformat, UUID)
 
 
 @router.get("", response_model=ActivityListResponse)
 async def get_activities(
     date_filter: Optional[date] = Query(None, description="Filter by specific date"),
     program_type: Optional[str] = Query(None, description="Filter by program type"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    include_total: str = Query("exact", pattern="^(exact|approximate|none)$"),
+    lang: Optional[str] = Query(None, pattern="^(en|zh|ms|ta)$", description="Localize title/description (defaults to preferred_language)"),
+    if_none_match: Optional[str] = Header(None),
+    current_user = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get list of activities with optional filters
 
     - **date_filter**: Filter activities by specific date
     - **program_type**: Filter by program type
-    - **skip**: Number of records to skip (pagination)
+    - **cursor**: Continue after the previous page (preferred over skip)
+    - **skip**: Number of records to skip (offset pagination, ignored with cursor)
     - **limit**: Maximum number of records to return
+    - **include_total**: `exact` (same query), `approximate` (cached count) or `none`;
+      served from the catalog cache both are exact
+    - **lang**: Return only title/description in this language (English fallback)
+
+    Returns 304 when If-None-Match carries the current ETag.
     """
+    lang = resolve_language(lang, current_user)
+    catalog = get_catalog_version()
+    etag = catalog.etag(
+        await catalog.get(db),
+        "list", date_filter, program_type, cursor, skip, limit, include_total, lang
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    after = None
+    if cursor:
+        try:
+            after = tuple(decode_cursor(cursor, CURSOR_FIELDS))
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    # Assemble from the catalog snapshot's pre-encoded fragments; pages that
+    # start among past activities (not in the snapshot) fall through to the database
+    page = None
+    if settings.ACTIVITY_CACHE_ENABLED:
+        page = await get_activity_catalog_cache().list_page(
+            db,
+            date_filter,
+            program_type,
+            limit=limit,
+            after=after,
+            skip=skip,
+            with_total=include_total != "none",
+            lang=lang
+        )
+    if page is not None:
+        body, total, last = page
+        next_cursor = encode_cursor(last) if last else None
+        return Response(
+            b'{"activities":' + body + b',"total":' + dumps(total) + b',"next_cursor":' + dumps(next_cursor) + b"}",
+            media_type="application/json",
+            headers=headers
+        )
+
     service = ActivityService(db)
-    activities = service.get_with_filters(date_filter, program_type, skip, limit)
-    
-    # Build responses with POC info
-    activity_responses = [_build_activity_response(activity, db) for activity in activities]
-    
-    # Get total count
-    query = db.query(Activity)
-    if date_filter:
-        query = query.filter(Activity.date == date_filter)
-    if program_type:
-        query = query.filter(Activity.program_type == program_type)
-    total = query.count()
-    
-    return ActivityListResponse(activities=activity_responses, total=total)
+    activities, total, has_more = await service.get_page(
+        date_filter,
+        program_type,
+        limit=limit,
+        after=after,
+        skip=skip,
+        with_total=include_total == "exact",
+        columns=activity_columns(lang) if lang else None
+    )
+    if include_total == "approximate":
+        total = await service.count_filtered_cached(date_filter, program_type)
+
+    next_cursor = None
+    if has_more:
+        last = activities[-1]
+        next_cursor = encode_cursor((last.date, last.start_time, last.id))
+
+    # Build responses with POC info (one batched lookup)
+    activity_responses = await ActivityResponseBuilder(db, lang).build_many(activities)
+
+    return FastJSONResponse(
+        {
+            "activities": activity_responses,
+            "total": total,
+            "next_cursor": next_cursor
+        },
+        headers=headers
+    )
 
 
 @router.get("/{activity_id}", response_model=ActivityResponse)
 async def get_activity(
     activity_id: UUID,
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get single activity by ID"""
+    """
+    Get single activity by ID
+
+    Returns 304 when If-None-Match carries the current ETag.
+    """
+    catalog = get_catalog_version()
+    etag = catalog.etag(await catalog.get(db), "detail", activity_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     service = ActivityService(db)
-    activity = service.get_by_id(activity_id)
+    activity = await service.get_by_id(activity_id)
     
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     
-    return _build_activity_response(activity, db)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    last_modified = activity.updated_at or activity.created_at
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    
+    return FastJSONResponse(await ActivityResponseBuilder(db).build(activity), headers=headers)
+
+
+def _valid_ballot_window(closes_at: datetime, activity_date: date, start_time: time) -> bool:
+    """Ballot closes in the future and before the activity starts (naive times are UTC)"""
+    if closes_at.tzinfo is None:
+        closes_at = closes_at.replace(tzinfo=timezone.utc)
+    starts_at = datetime.combine(activity_date, start_time, tzinfo=closes_at.tzinfo)
+    return datetime.now(timezone.utc) < closes_at < starts_at
 
 
 @router.post("", response_model=ActivityResponse, status_code=status.HTTP_201_CREATED)
 async def create_activity(
     activity: ActivityCreate,
     current_user = Depends(get_current_staff),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new activity (Staff only)
@@ -130,6 +186,13 @@ async def create_activity(
             detail="Activity date cannot be in the past"
         )
     
+    # Ballot window must close before the activity starts
+    if activity.ballot_closes_at and not _valid_ballot_window(activity.ballot_closes_at, activity.date, activity.start_time):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ballot must close in the future and before the activity starts"
+        )
+    
     # Create activity with staff POC and auto-translate
     service = ActivityService(db)
     
@@ -142,12 +205,17 @@ async def create_activity(
         "location": activity.location,
         "max_capacity": activity.max_capacity,
         "program_type": activity.program_type,
+        "ballot_closes_at": activity.ballot_closes_at,
         "created_by_staff_id": current_user.id  # Set POC to current staff user
     }
     
     # Create with automatic translations
-    created_activity = service.create_with_translations(activity_data)
-    return _build_activity_response(created_activity, db)
+    created_activity = await service.create_with_translations(activity_data)
+    get_catalog_version().bump()
+    return FastJSONResponse(
+        await ActivityResponseBuilder(db).build(created_activity),
+        status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.put("/{activity_id}", response_model=ActivityResponse)
@@ -155,11 +223,11 @@ async def update_activity(
     activity_id: UUID,
     activity: ActivityUpdate,
     current_user = Depends(get_current_staff),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update activity (Staff only)"""
     service = ActivityService(db)
-    db_activity = service.get_by_id(activity_id)
+    db_activity = await service.get_by_id(activity_id)
     
     if not db_activity:
         raise HTTPException(status_code=404, detail="Activity not found")
@@ -177,38 +245,60 @@ async def update_activity(
     # Update fields
     update_data = activity.model_dump(exclude_unset=True)
     
+    if update_data.get("ballot_closes_at") and not _valid_ballot_window(
+        update_data["ballot_closes_at"],
+        activity.date or db_activity.date,
+        start_time
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ballot must close in the future and before the activity starts"
+        )
+    
     # Check if title or description changed - need to re-translate
     needs_retranslation = "title" in update_data or "description" in update_data
     
+    # A rescheduled activity is reminded again ahead of its new time
+    if any(
+        field in update_data and update_data[field] != getattr(db_activity, field)
+        for field in ("date", "start_time")
+    ):
+        db_activity.reminder_sent_at = None
+    
     for field, value in update_data.items():
         setattr(db_activity, field, value)
     
     # Re-translate if content changed
     if needs_retranslation:
-        translations = service.translate_activity_content(
+        translations = await service.translate_activity_content_async(
             title=db_activity.title,
             description=db_activity.description
         )
         for field, value in translations.items():
             setattr(db_activity, field, value)
     
-    updated_activity = service.update(db_activity)
-    return _build_activity_response(updated_activity, db)
+    await service.publish_catalog_change()
+    await db.commit()
+    await db.refresh(db_activity)
+    get_catalog_version().bump()
+    return FastJSONResponse(await ActivityResponseBuilder(db).build(db_activity))
 
 
 @router.delete("/{activity_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_activity(
     activity_id: UUID,
     current_user = Depends(get_current_staff),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete activity (Staff only)"""
     service = ActivityService(db)
-    activity = service.get_by_id(activity_id)
+    activity = await service.get_by_id(activity_id)
     
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     
     # Delete activity (registrations and matches will be cascaded)
-    service.delete(activity_id)
+    await service.publish_catalog_change()
+    await service.delete(activity_id)
+    get_catalog_version().bump()
     return None
@@ -1,11 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 import bcrypt
 
-from app.core.auth import supabase, get_current_user
+from app.core.auth import supabase, security, get_current_user
+from app.core.concurrency import run_blocking, run_in_bcrypt_pool
+from app.core.principal_cache import get_principal_cache
+from app.core.invalidation import get_invalidation_bus, TOPIC_PRINCIPAL
 from app.core.deps import get_db
 from app.models.user import UserCreate, UserLogin, UserResponse, TokenResponse
 from app.db.models import User
+from app.services.activity_service import ActivityService
+from app.services.catalog_version import get_catalog_version
 
 router = APIRouter()
 
@@ -24,9 +31,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the bcrypt pool without blocking the event loop"""
+    return await run_in_bcrypt_pool(hash_password, password)
+
 
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new user account
 
@@ -37,10 +48,9 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     """
     try:
         # Check if user already exists in database (case-insensitive email check)
-        from sqlalchemy import func as sql_func
-        existing_user = db.query(User).filter(
-            sql_func.lower(User.email) == user_data.email.lower()
-        ).first()
+        existing_user = (await db.execute(select(User.id).where(
+            func.lower(User.email) == user_data.email.lower()
+        ))).first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -48,7 +58,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
             )
 
         # Create user in Supabase Auth
-        auth_response = supabase.auth.sign_up({
+        auth_response = await run_blocking(supabase.auth.sign_up, {
             "email": user_data.email,
             "password": user_data.password,
             "options": {
@@ -72,7 +82,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
         
         # Check if user already exists in PostgreSQL by Supabase Auth ID
         # (handles case where Supabase returns existing user for duplicate email)
-        existing_user_by_id = db.query(User).filter(User.id == auth_response.user.id).first()
+        existing_user_by_id = await db.get(User, auth_response.user.id)
         if existing_user_by_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -83,7 +93,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
         db_user = User(
             id=auth_response.user.id,  # Use same ID as Supabase Auth
             email=user_data.email,
-            hashed_password=hash_password(user_data.password),
+            hashed_password=await hash_password_async(user_data.password),
             role=user_data.role,
             membership_type=user_data.membership_type,
             full_name=user_data.full_name,
@@ -93,8 +103,8 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
             wheelchair_required=user_data.wheelchair_required
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
 
         # Handle case where email confirmation is required (session will be None)
         if auth_response.session is None:
@@ -121,7 +131,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -129,14 +139,14 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """
     Login with email and password
 
     Returns JWT access token
     """
     try:
-        auth_response = supabase.auth.sign_in_with_password({
+        auth_response = await run_blocking(supabase.auth.sign_in_with_password, {
             "email": credentials.email,
             "password": credentials.password
         })
@@ -150,7 +160,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
         user_metadata = auth_response.user.user_metadata
 
         # Check if user exists in PostgreSQL database
-        db_user = db.query(User).filter(User.id == auth_response.user.id).first()
+        db_user = await db.get(User, auth_response.user.id)
 
         # If user doesn't exist in database, create it (handles legacy users)
         if not db_user:
@@ -159,7 +169,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
             db_user = User(
                 id=auth_response.user.id,
                 email=auth_response.user.email,
-                hashed_password=hash_password(credentials.password),
+                hashed_password=await hash_password_async(credentials.password),
                 role=user_metadata.get('role', 'participant'),
                 membership_type=user_metadata.get('membership_type'),
                 full_name=user_metadata.get('full_name'),
@@ -169,8 +179,11 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
                 wheelchair_required=user_metadata.get('wheelchair_required', False)
             )
             db.add(db_user)
-            db.commit()
-            db.refresh(db_user)
+            # Activities naming this user as point of contact now have contact details
+            await ActivityService(db).publish_contact_change(db_user.id)
+            await db.commit()
+            await db.refresh(db_user)
+            get_catalog_version().bump()
 
         return TokenResponse(
             access_token=auth_response.session.access_token,
@@ -193,10 +206,18 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/logout")
-async def logout(current_user = Depends(get_current_user)):
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user = Depends(get_current_user)
+):
     """Logout current user"""
     try:
-        supabase.auth.sign_out()
+        cache = get_principal_cache()
+        cache.evict(credentials.credentials)
+        await get_invalidation_bus().publish(
+            None, TOPIC_PRINCIPAL, cache.fingerprint(credentials.credentials)
+        )
+        await run_blocking(supabase.auth.sign_out)
         return {"message": "Successfully logged out"}
     except Exception as e:
         raise HTTPException(
@@ -206,10 +227,16 @@ async def logout(current_user = Depends(get_current_user)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user = Depends(get_current_user)):
+async def get_current_user_info(current_user = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Get current user information"""
     user_metadata = current_user.user_metadata
-    
+
+    # Locally verified tokens don't carry the account creation time
+    created_at = current_user.created_at
+    if created_at is None:
+        db_user = await db.get(User, current_user.id)
+        created_at = db_user.created_at if db_user else None
+
     return UserResponse(
         id=current_user.id,
         email=current_user.email,
@@ -218,5 +245,5 @@ async def get_current_user_info(current_user = Depends(get_current_user)):
         full_name=user_metadata.get('full_name'),
         phone=user_metadata.get('phone'),
         preferred_language=user_metadata.get('preferred_language', 'en'),
-        created_at=current_user.created_at
+        created_at=created_at
     )
@@ -1,24 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
+from typing import List, Optional
 from uuid import UUID
 
 from app.core.auth import get_current_user, get_current_volunteer
+from app.core.config import settings
 from app.core.deps import get_db
+from app.core.enums import NotificationKind
 from app.models.registration import (
     VolunteerMatchCreate,
     VolunteerMatchResponse,
     VolunteerMatchWithActivity
 )
 from app.models.activity import ActivityResponse
+from app.services.activity_response_builder import ActivityResponseBuilder, resolve_language, activity_columns
+from app.core.responses import FastJSONResponse
+from app.services.activity_catalog_cache import get_activity_catalog_cache
+from app.services.notification_outbox import NotificationOutbox
 
 router = APIRouter()
 
 
 @router.get("/available", response_model=List[ActivityResponse])
 async def get_available_activities(
+    lang: Optional[str] = Query(None, pattern="^(en|zh|ms|ta)$", description="Localize title/description (defaults to preferred_language)"),
     current_user = Depends(get_current_volunteer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get activities available for volunteer matching
@@ -27,81 +36,56 @@ async def get_available_activities(
     - Excludes past activities
     - Only shows activities with available spots
     - Filters by wheelchair accessibility if volunteer requires wheelchair
+    - **lang**: Return only title/description in this language (English fallback)
     """
     from datetime import date
-    from app.db.models import Activity, VolunteerMatch, User
+    from app.db.models import Activity, VolunteerMatch
     from app.core.enums import RegistrationStatus
-    from app.models.activity import StaffContactInfo
+
+    lang = resolve_language(lang, current_user)
 
     # Get IDs of activities volunteer is already matched to
-    matched_activity_ids = db.query(VolunteerMatch.activity_id).filter(
+    matched_activity_ids = await db.execute(select(VolunteerMatch.activity_id).where(
         VolunteerMatch.volunteer_id == current_user.id,
         VolunteerMatch.status != RegistrationStatus.CANCELLED
-    ).all()
+    ))
     matched_ids = [m[0] for m in matched_activity_ids]
 
+    # Access from user_metadata since current_user is a Supabase user object
+    wheelchair_required = current_user.user_metadata.get('wheelchair_required', False)
+
+    if settings.ACTIVITY_CACHE_ENABLED:
+        # Filter the cached catalog and join its pre-encoded fragments
+        body = await get_activity_catalog_cache().list_available(
+            db,
+            exclude_ids=matched_ids,
+            wheelchair_only=wheelchair_required,
+            require_spots=False,
+            lang=lang
+        )
+        return Response(body, media_type="application/json")
+
     # Query future activities not already matched
-    query = db.query(Activity).filter(Activity.date >= date.today())
+    query = select(Activity).options(load_only(*activity_columns(lang))).where(Activity.date >= date.today())
 
     if matched_ids:
-        query = query.filter(~Activity.id.in_(matched_ids))
+        query = query.where(~Activity.id.in_(matched_ids))
     
     # Filter by wheelchair accessibility if volunteer requires wheelchair
-    # Access from user_metadata since current_user is a Supabase user object
-    wheelchair_required = current_user.user_metadata.get('wheelchair_required', False)
     if wheelchair_required:
-        query = query.filter(Activity.wheelchair_accessible == True)
-
-    activities = query.order_by(Activity.date, Activity.start_time).all()
-
-    # Build response with POC info for each activity
-    result = []
-    for activity in activities:
-        response_data = {
-            "id": activity.id,
-            "title": activity.title,
-            "description": activity.description,
-            "date": activity.date,
-            "start_time": activity.start_time,
-            "end_time": activity.end_time,
-            "location": activity.location,
-            "max_capacity": activity.max_capacity,
-            "current_participants": activity.current_participants,
-            "program_type": activity.program_type,
-            "wheelchair_accessible": activity.wheelchair_accessible,
-            "payment_required": activity.payment_required,
-            "created_by_staff_id": activity.created_by_staff_id,
-            "created_at": activity.created_at,
-            "point_of_contact": None,
-            "title_zh": getattr(activity, 'title_zh', None),
-            "title_ms": getattr(activity, 'title_ms', None),
-            "title_ta": getattr(activity, 'title_ta', None),
-            "description_zh": getattr(activity, 'description_zh', None),
-            "description_ms": getattr(activity, 'description_ms', None),
-            "description_ta": getattr(activity, 'description_ta', None),
-        }
-        
-        # Add POC info if available
-        if activity.created_by_staff_id:
-            staff = db.query(User).filter(User.id == activity.created_by_staff_id).first()
-            if staff:
-                response_data["point_of_contact"] = StaffContactInfo(
-                    id=staff.id,
-                    full_name=staff.full_name,
-                    email=staff.email,
-                    phone=staff.phone
-                )
-        
-        result.append(ActivityResponse(**response_data))
-
-    return result
+        query = query.where(Activity.wheelchair_accessible == True)
+
+    activities = (await db.execute(query.order_by(Activity.date, Activity.start_time))).scalars().all()
+
+    # Build response with POC info (one batched lookup)
+    return FastJSONResponse(await ActivityResponseBuilder(db, lang).build_many(activities))
 
 
 @router.post("", response_model=VolunteerMatchResponse, status_code=status.HTTP_201_CREATED)
 async def create_volunteer_match(
     match: VolunteerMatchCreate,
     current_user = Depends(get_current_volunteer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Match volunteer to an activity (Volunteer "swipes right")
@@ -116,7 +100,7 @@ async def create_volunteer_match(
     from app.core.enums import RegistrationStatus
 
     # Validate activity exists and is in the future
-    activity = db.query(Activity).filter(Activity.id == match.activity_id).first()
+    activity = await db.get(Activity, match.activity_id)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
 
@@ -124,23 +108,23 @@ async def create_volunteer_match(
         raise HTTPException(status_code=400, detail="Cannot match to past activity")
 
     # Check for existing active match
-    existing = db.query(VolunteerMatch).filter(
+    existing = (await db.execute(select(VolunteerMatch.id).where(
         VolunteerMatch.volunteer_id == current_user.id,
         VolunteerMatch.activity_id == match.activity_id,
         VolunteerMatch.status != RegistrationStatus.CANCELLED
-    ).first()
+    ).limit(1))).first()
 
     if existing:
         raise HTTPException(status_code=409, detail="Already matched to this activity")
 
     # Check for time conflicts with other matched activities
-    conflicting = db.query(VolunteerMatch).join(Activity).filter(
+    conflicting = (await db.execute(select(VolunteerMatch.id).join(Activity).where(
         VolunteerMatch.volunteer_id == current_user.id,
         VolunteerMatch.status != RegistrationStatus.CANCELLED,
         Activity.date == activity.date,
         Activity.start_time < activity.end_time,
         Activity.end_time > activity.start_time
-    ).first()
+    ).limit(1))).first()
 
     if conflicting:
         raise HTTPException(status_code=409, detail="Time conflict with another matched activity")
@@ -152,16 +136,10 @@ async def create_volunteer_match(
         status=RegistrationStatus.CONFIRMED
     )
     db.add(db_match)
-    db.commit()
-    db.refresh(db_match)
-
-    # Send notification (runs in background, doesn't block response)
-    from app.services.notification_service import NotificationService
-    notification_service = NotificationService(db)
-    await notification_service.send_volunteer_match_confirmation(
-        volunteer_id=current_user.id,
-        activity_id=match.activity_id
-    )
+    # Queue the confirmation in the same transaction; the outbox worker sends it
+    await NotificationOutbox(db).enqueue(NotificationKind.MATCH_CONFIRMATION, current_user.id, match.activity_id)
+    await db.commit()
+    await db.refresh(db_match)
 
     return db_match
 
@@ -169,8 +147,9 @@ async def create_volunteer_match(
 @router.get("/user/{user_id}", response_model=List[VolunteerMatchWithActivity])
 async def get_volunteer_matches(
     user_id: UUID,
+    lang: Optional[str] = Query(None, pattern="^(en|zh|ms|ta)$", description="Localize title/description (defaults to preferred_language)"),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all volunteer matches for a user
@@ -180,6 +159,8 @@ async def get_volunteer_matches(
     from app.db.models import VolunteerMatch
     from app.core.enums import Role
 
+    lang = resolve_language(lang, current_user)
+
     # Get user role from Supabase user metadata
     user_role = current_user.user_metadata.get('role')
     
@@ -189,27 +170,27 @@ async def get_volunteer_matches(
         raise HTTPException(status_code=403, detail="Not authorized to view these matches")
 
     # Fetch matches with activity details (eager load)
-    matches = db.query(VolunteerMatch).filter(
+    matches = (await db.execute(select(VolunteerMatch).where(
         VolunteerMatch.volunteer_id == user_id
     ).options(
-        joinedload(VolunteerMatch.activity)
-    ).order_by(VolunteerMatch.matched_at.desc()).all()
+        joinedload(VolunteerMatch.activity).load_only(*activity_columns(lang))
+    ).order_by(VolunteerMatch.matched_at.desc()))).scalars().all()
 
-    return matches
+    return FastJSONResponse(await ActivityResponseBuilder(db, lang).build_matches(matches))
 
 
 @router.delete("/{match_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_volunteer_match(
     match_id: UUID,
     current_user = Depends(get_current_volunteer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Cancel a volunteer match"""
     from app.db.models import VolunteerMatch
     from app.core.enums import RegistrationStatus
 
     # Fetch the match
-    match = db.query(VolunteerMatch).filter(VolunteerMatch.id == match_id).first()
+    match = await db.get(VolunteerMatch, match_id)
 
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
@@ -222,17 +203,9 @@ async def cancel_volunteer_match(
     if match.status == RegistrationStatus.CANCELLED:
         raise HTTPException(status_code=400, detail="Match already cancelled")
 
-    # Update status to cancelled
-    activity_id = match.activity_id  # Store before commit
+    # Update status to cancelled and queue the notification (one commit)
     match.status = RegistrationStatus.CANCELLED
-    db.commit()
-
-    # Send cancellation notification
-    from app.services.notification_service import NotificationService
-    notification_service = NotificationService(db)
-    await notification_service.send_cancellation_notification(
-        user_id=current_user.id,
-        activity_id=activity_id
-    )
+    await NotificationOutbox(db).enqueue(NotificationKind.CANCELLATION, match.volunteer_id, match.activity_id)
+    await db.commit()
 
     return None
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 
 from app.core.auth import get_current_user, get_current_staff
@@ -11,16 +12,23 @@ from app.models.notification import (
     BulkNotificationCreate,
     BulkNotificationResponse
 )
+from app.db.models import NotificationJob
+from app.services.bulk_notification_service import BulkNotificationService
 from app.services.notification_service import NotificationService
+from app.tasks.notification_jobs import run_notification_job
+from app.utils.cursors import encode_cursor, decode_cursor, InvalidCursorError
 
 router = APIRouter()
 
+# Keyset for history pagination: (created_at, id)
+CURSOR_FIELDS = (datetime.fromisoformat, UUID)
+
 
 @router.post("/send", response_model=NotificationResponse, status_code=status.HTTP_201_CREATED)
 async def send_notification(
     notification: NotificationCreate,
     current_user = Depends(get_current_staff),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Send notification to a user (Staff only)
@@ -41,11 +49,25 @@ async def send_notification(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+def _job_response(job: NotificationJob) -> BulkNotificationResponse:
+    pending = job.total - job.successful - job.failed
+    return BulkNotificationResponse(
+        job_id=job.id,
+        status=job.status,
+        total=job.total,
+        successful=job.successful,
+        failed=job.failed,
+        pending=pending,
+        message=f"Sent {job.successful}/{job.total} notifications ({job.failed} failed, {pending} pending)"
+    )
+
+
 @router.post("/send-bulk", response_model=BulkNotificationResponse, status_code=status.HTTP_202_ACCEPTED)
 async def send_bulk_notifications(
     notification: BulkNotificationCreate,
+    background_tasks: BackgroundTasks,
     current_user = Depends(get_current_staff),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Send notifications to multiple users (Staff only)
@@ -54,40 +76,51 @@ async def send_bulk_notifications(
     - Activity reminders
     - Announcements
     - Emergency notifications
+
+    Returns 202 with a job id straight away; messages are sent in the
+    background. Poll GET /notifications/jobs/{job_id} for progress.
     """
-    service = NotificationService(db)
+    job = await BulkNotificationService(db).create_job(
+        user_ids=notification.user_ids,
+        message=notification.message,
+        channel=notification.channel,
+        created_by=UUID(str(current_user.id))
+    )
+    if job.status == 'queued':
+        background_tasks.add_task(run_notification_job, job.id)
+    return _job_response(job)
 
-    successful = 0
-    failed = 0
 
-    for user_id in notification.user_ids:
-        try:
-            await service.send_notification(
-                user_id=user_id,
-                message=notification.message,
-                channel=notification.channel
-            )
-            successful += 1
-        except ValueError:
-            failed += 1
-
-    total = len(notification.user_ids)
-    return BulkNotificationResponse(
-        total=total,
-        successful=successful,
-        failed=failed,
-        message=f"Sent {successful}/{total} notifications ({failed} failed)"
-    )
+@router.get("/jobs/{job_id}", response_model=BulkNotificationResponse)
+async def get_bulk_notification_job(
+    job_id: UUID,
+    current_user = Depends(get_current_staff),
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress of a bulk send (Staff only)"""
+    job = await db.get(NotificationJob, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification job not found")
+    return _job_response(job)
 
 
 @router.get("/user/{user_id}", response_model=List[NotificationResponse])
 async def get_user_notifications(
     user_id: UUID,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=100),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Get notification history for a user
+    Get notification history for a user, newest first
+
+    - **cursor**: Continue after the previous page
+    - **limit**: Maximum number of records to return
+
+    When more records exist, the X-Next-Cursor response header carries the
+    cursor for the next page.
 
     Users can only see their own notifications.
     Staff can view any user's notifications.
@@ -105,6 +138,16 @@ async def get_user_notifications(
             detail="You can only view your own notifications"
         )
 
+    after = None
+    if cursor:
+        try:
+            after = tuple(decode_cursor(cursor, CURSOR_FIELDS))
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     service = NotificationService(db)
-    notifications = service.get_user_notifications(user_id)
+    notifications, has_more = await service.get_user_notifications(user_id, limit=limit, after=after)
+    if has_more:
+        last = notifications[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor((last.created_at, last.id))
     return notifications
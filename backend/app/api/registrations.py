@@ -1,22 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
+from typing import List, Optional
 from uuid import UUID
 import logging
 
 from app.core.auth import get_current_user
+from app.core.config import settings
 from app.core.deps import get_db
 from app.core.enums import Role, RegistrationStatus
-from app.db.models import Registration, Activity, User
+from app.db.models import Registration, Activity, SeatHold
 from app.models.registration import (
     RegistrationCreate,
     RegistrationResponse,
-    RegistrationWithActivity
+    RegistrationWithActivity,
+    SeatHoldResponse
 )
-from app.models.activity import ActivityResponse, StaffContactInfo
+from app.models.activity import ActivityResponse
+from app.models.ballot import BallotEntryResponse
 from app.services.registration_service import RegistrationService, ConflictError
-from app.services.activity_service import ActivityService
-from app.services.notification_service import NotificationService
+from app.services.ballot_service import BallotService
+from app.services.seat_hold_service import SeatHoldService, HoldExpiredError
+from app.services.activity_response_builder import ActivityResponseBuilder, resolve_language, activity_columns
+from app.core.responses import FastJSONResponse
+from app.services.activity_catalog_cache import get_activity_catalog_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -24,8 +32,9 @@ logger = logging.getLogger(__name__)
 
 @router.get("/available", response_model=List[ActivityResponse])
 async def get_available_activities_for_participant(
+    lang: Optional[str] = Query(None, pattern="^(en|zh|ms|ta)$", description="Localize title/description (defaults to preferred_language)"),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get activities available for participant registration (swiper)
@@ -34,174 +43,252 @@ async def get_available_activities_for_participant(
     - Excludes past activities
     - Only shows activities with available spots
     - Filters by wheelchair accessibility if user requires wheelchair
+    - **lang**: Return only title/description in this language (English fallback)
     """
     from datetime import date
+
+    lang = resolve_language(lang, current_user)
     
     # Get IDs of activities participant is already registered to
-    registered_activity_ids = db.query(Registration.activity_id).filter(
+    registered_activity_ids = await db.execute(select(Registration.activity_id).where(
         Registration.user_id == current_user.id,
         Registration.status != RegistrationStatus.CANCELLED
-    ).all()
+    ))
     registered_ids = [r[0] for r in registered_activity_ids]
 
+    # Access from user_metadata since current_user is a Supabase user object
+    wheelchair_required = current_user.user_metadata.get('wheelchair_required', False)
+
+    if settings.ACTIVITY_CACHE_ENABLED:
+        # Filter the cached catalog and join its pre-encoded fragments
+        body = await get_activity_catalog_cache().list_available(
+            db,
+            exclude_ids=registered_ids,
+            wheelchair_only=wheelchair_required,
+            require_spots=True,
+            lang=lang
+        )
+        return Response(body, media_type="application/json")
+
     # Query future activities not already registered
-    query = db.query(Activity).filter(
+    query = select(Activity).options(load_only(*activity_columns(lang))).where(
         Activity.date >= date.today(),
-        Activity.current_participants < Activity.max_capacity  # Only show activities with spots
+        Activity.current_participants + Activity.held_seats < Activity.max_capacity  # Only show activities with spots
     )
 
     if registered_ids:
-        query = query.filter(~Activity.id.in_(registered_ids))
+        query = query.where(~Activity.id.in_(registered_ids))
     
     # Filter by wheelchair accessibility if user requires wheelchair
-    # Access from user_metadata since current_user is a Supabase user object
-    wheelchair_required = current_user.user_metadata.get('wheelchair_required', False)
     if wheelchair_required:
-        query = query.filter(Activity.wheelchair_accessible == True)
-
-    activities = query.order_by(Activity.date, Activity.start_time).all()
-
-    # Build response with POC info for each activity
-    return [_build_activity_response(activity, db) for activity in activities]
-
-
-def _build_activity_response(activity: Activity, db: Session) -> ActivityResponse:
-    """Build ActivityResponse with POC info"""
-    response_data = {
-        "id": activity.id,
-        "title": activity.title,
-        "description": activity.description,
-        "date": activity.date,
-        "start_time": activity.start_time,
-        "end_time": activity.end_time,
-        "location": activity.location,
-        "max_capacity": activity.max_capacity,
-        "current_participants": activity.current_participants,
-        "program_type": activity.program_type,
-        "wheelchair_accessible": activity.wheelchair_accessible,
-        "payment_required": activity.payment_required,
-        "created_by_staff_id": activity.created_by_staff_id,
-        "created_at": activity.created_at,
-        "point_of_contact": None,
-        "title_zh": getattr(activity, 'title_zh', None),
-        "title_ms": getattr(activity, 'title_ms', None),
-        "title_ta": getattr(activity, 'title_ta', None),
-        "description_zh": getattr(activity, 'description_zh', None),
-        "description_ms": getattr(activity, 'description_ms', None),
-        "description_ta": getattr(activity, 'description_ta', None),
-    }
-    
-    if activity.created_by_staff_id:
-        staff = db.query(User).filter(User.id == activity.created_by_staff_id).first()
-        if staff:
-            response_data["point_of_contact"] = StaffContactInfo(
-                id=staff.id,
-                full_name=staff.full_name,
-                email=staff.email,
-                phone=staff.phone
-            )
-    
-    return ActivityResponse(**response_data)
+        query = query.where(Activity.wheelchair_accessible == True)
+
+    activities = (await db.execute(query.order_by(Activity.date, Activity.start_time))).scalars().all()
 
+    # Build response with POC info (one batched lookup)
+    return FastJSONResponse(await ActivityResponseBuilder(db, lang).build_many(activities))
 
-@router.post("", response_model=RegistrationResponse, status_code=status.HTTP_201_CREATED)
+
+@router.post(
+    "",
+    response_model=RegistrationResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": BallotEntryResponse, "description": "Ballot open: entry recorded"}}
+)
 async def register_for_activity(
     registration: RegistrationCreate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Register current user for an activity
 
     Validates:
-    - Activity exists and is not full
+    - Activity exists
     - User hasn't already registered
     - No time conflicts with other registrations
     - Membership limits not exceeded (for participants)
 
+    If the activity is full the user joins its waitlist: the registration
+    comes back with status 'waitlist' and its waitlist_position, and is
+    confirmed automatically when a spot opens.
+
+    While the activity's ballot window is open, this only records a ballot
+    entry (202 Accepted); seats are drawn by lottery when the window closes.
+
     Returns 409 Conflict if validation fails
     """
     # Check activity exists
-    activity = db.query(Activity).filter(Activity.id == registration.activity_id).first()
+    activity = await db.get(Activity, registration.activity_id)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     
-    # Run all validations
+    if BallotService.is_open(activity):
+        entry = await BallotService(db).enter(current_user.id, activity.id)
+        return FastJSONResponse(
+            {
+                "id": entry.id,
+                "activity_id": entry.activity_id,
+                "user_id": entry.user_id,
+                "status": entry.status,
+                "ballot_closes_at": activity.ballot_closes_at,
+                "created_at": entry.created_at,
+            },
+            status_code=status.HTTP_202_ACCEPTED
+        )
+    
+    # Validate, claim a seat (or a waitlist place) and insert in one transaction
     service = RegistrationService(db)
     try:
-        service.validate_all(current_user.id, registration.activity_id)
+        db_registration = await service.register(current_user.id, registration.activity_id)
     except ConflictError as e:
         raise HTTPException(status_code=409, detail=str(e))
     
-    # Create registration
-    db_registration = Registration(
-        user_id=current_user.id,
-        activity_id=registration.activity_id,
-        status=RegistrationStatus.CONFIRMED
-    )
-    db.add(db_registration)
+    await db.refresh(db_registration)
     
-    # Increment participant count using service
-    activity_service = ActivityService(db)
-    activity_service.increment_participants(registration.activity_id)
+    if db_registration.status == RegistrationStatus.WAITLIST:
+        return await _with_waitlist_rank(service, db_registration)
     
-    db.commit()
-    db.refresh(db_registration)
+    # The confirmation was queued in the outbox with the registration
+    return db_registration
+
+
+@router.post("/holds", response_model=SeatHoldResponse, status_code=status.HTTP_201_CREATED)
+async def hold_seat(
+    registration: RegistrationCreate,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Hold a seat while the participant decides (swiper card shown)
+
+    The seat counts as taken until the hold is confirmed, released or
+    expires (see expires_at). Holding the same activity again extends the
+    existing hold. Runs the same validations as registering.
+
+    Returns 409 Conflict if the activity is full or validation fails
+    """
+    activity = await db.get(Activity, registration.activity_id)
+    if not activity:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    
+    if BallotService.is_open(activity):
+        raise HTTPException(status_code=409, detail="Seats for this activity are allocated by ballot")
     
-    # Send notification (don't block on failure)
     try:
-        notification_service = NotificationService(db)
-        await notification_service.send_registration_confirmation(
-            user_id=current_user.id,
-            activity_id=registration.activity_id
-        )
-    except Exception as e:
-        logger.warning(f"Failed to send registration notification: {e}")
+        return await SeatHoldService(db).hold(current_user.id, activity.id)
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+async def _get_own_hold(hold_id: UUID, current_user, db: AsyncSession) -> SeatHold:
+    hold = await db.get(SeatHold, hold_id)
+    if not hold or str(hold.user_id) != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Seat hold not found")
+    return hold
+
+
+@router.post("/holds/{hold_id}/confirm", response_model=RegistrationResponse, status_code=status.HTTP_201_CREATED)
+async def confirm_seat_hold(
+    hold_id: UUID,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Convert a seat hold into a confirmed registration
+
+    Returns 410 Gone if the hold expired (register normally instead) and
+    409 Conflict if a time conflict or weekly limit arose since holding
+    """
+    hold = await _get_own_hold(hold_id, current_user, db)
+    
+    try:
+        db_registration = await SeatHoldService(db).confirm(hold)
+    except HoldExpiredError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
+    await db.refresh(db_registration)
     return db_registration
 
 
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_seat_hold(
+    hold_id: UUID,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Release a seat hold (participant passed on the activity)
+    """
+    hold = await _get_own_hold(hold_id, current_user, db)
+    await SeatHoldService(db).release(hold)
+    return None
+
+
+async def _with_waitlist_rank(service: RegistrationService, registration: Registration) -> RegistrationResponse:
+    """Response carrying the queue rank rather than the stored ordering key"""
+    response = RegistrationResponse.model_validate(registration)
+    response.waitlist_position = await service.waitlist_rank(registration)
+    return response
+
+
+@router.get("/{registration_id}/waitlist", response_model=RegistrationResponse)
+async def get_waitlist_position(
+    registration_id: UUID,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a registration with its current place in the waitlist
+
+    waitlist_position is null once the registration is confirmed or cancelled
+    """
+    registration = await db.get(Registration, registration_id)
+    if not registration:
+        raise HTTPException(status_code=404, detail="Registration not found")
+    
+    user_role = current_user.user_metadata.get('role')
+    if str(registration.user_id) != str(current_user.id) and user_role != Role.STAFF.value:
+        raise HTTPException(status_code=403, detail="Not authorized to view this registration")
+    
+    return await _with_waitlist_rank(RegistrationService(db), registration)
+
+
 @router.get("", response_model=List[RegistrationWithActivity])
 async def get_my_registrations(
+    lang: Optional[str] = Query(None, pattern="^(en|zh|ms|ta)$", description="Localize title/description (defaults to preferred_language)"),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all registrations for the current user
     """
-    registrations = (
-        db.query(Registration)
-        .filter(Registration.user_id == current_user.id)
-        .options(joinedload(Registration.activity))
+    lang = resolve_language(lang, current_user)
+    registrations = (await db.execute(
+        select(Registration)
+        .where(Registration.user_id == current_user.id)
+        .options(joinedload(Registration.activity).load_only(*activity_columns(lang)))
         .order_by(Registration.created_at.desc())
-        .all()
-    )
+    )).scalars().all()
     
-    # Build response with activity details
-    result = []
-    for reg in registrations:
-        result.append(RegistrationWithActivity(
-            id=reg.id,
-            user_id=reg.user_id,
-            activity=_build_activity_response(reg.activity, db),
-            status=reg.status,
-            created_at=reg.created_at
-        ))
-    
-    return result
+    return FastJSONResponse(await ActivityResponseBuilder(db, lang).build_registrations(registrations))
 
 
 @router.get("/user/{user_id}", response_model=List[RegistrationWithActivity])
 async def get_user_registrations(
     user_id: UUID,
+    lang: Optional[str] = Query(None, pattern="^(en|zh|ms|ta)$", description="Localize title/description (defaults to preferred_language)"),
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all registrations for a specific user
 
     Users can only view their own registrations unless they are staff
     """
+    lang = resolve_language(lang, current_user)
     # Get user role from Supabase user metadata
     user_role = current_user.user_metadata.get('role')
     
@@ -209,33 +296,21 @@ async def get_user_registrations(
     if str(current_user.id) != str(user_id) and user_role != Role.STAFF.value:
         raise HTTPException(status_code=403, detail="Not authorized to view these registrations")
     
-    registrations = (
-        db.query(Registration)
-        .filter(Registration.user_id == user_id)
-        .options(joinedload(Registration.activity))
+    registrations = (await db.execute(
+        select(Registration)
+        .where(Registration.user_id == user_id)
+        .options(joinedload(Registration.activity).load_only(*activity_columns(lang)))
         .order_by(Registration.created_at.desc())
-        .all()
-    )
-    
-    # Build response with activity details
-    result = []
-    for reg in registrations:
-        result.append(RegistrationWithActivity(
-            id=reg.id,
-            user_id=reg.user_id,
-            activity=_build_activity_response(reg.activity, db),
-            status=reg.status,
-            created_at=reg.created_at
-        ))
+    )).scalars().all()
     
-    return result
+    return FastJSONResponse(await ActivityResponseBuilder(db, lang).build_registrations(registrations))
 
 
 @router.get("/activity/{activity_id}", response_model=List[RegistrationResponse])
 async def get_activity_registrations(
     activity_id: UUID,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all registrations for a specific activity
@@ -243,14 +318,14 @@ async def get_activity_registrations(
     Returns list of users registered for the activity
     """
     # Verify activity exists
-    activity = db.query(Activity).filter(Activity.id == activity_id).first()
+    activity = await db.get(Activity, activity_id)
     if not activity:
         raise HTTPException(status_code=404, detail="Activity not found")
 
-    registrations = db.query(Registration).filter(
+    registrations = (await db.execute(select(Registration).where(
         Registration.activity_id == activity_id,
         Registration.status == RegistrationStatus.CONFIRMED
-    ).all()
+    ))).scalars().all()
 
     return registrations
 
@@ -259,17 +334,18 @@ async def get_activity_registrations(
 async def cancel_registration(
     registration_id: UUID,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Cancel a registration
 
     - Updates status to 'cancelled'
     - Decrements activity participant count
-    - Sends cancellation notification
+    - Promotes the next waitlisted participant into the freed spot
+    - Queues cancellation (and promotion) notifications in the outbox
     """
     # Fetch registration
-    registration = db.query(Registration).filter(Registration.id == registration_id).first()
+    registration = await db.get(Registration, registration_id)
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
     
@@ -284,26 +360,7 @@ async def cancel_registration(
     if registration.status == RegistrationStatus.CANCELLED:
         raise HTTPException(status_code=400, detail="Registration already cancelled")
     
-    # Store for notification before committing
-    activity_id = registration.activity_id
-    
-    # Update status
-    registration.status = RegistrationStatus.CANCELLED
-    
-    # Decrement participant count using service
-    activity_service = ActivityService(db)
-    activity_service.decrement_participants(activity_id)
-    
-    db.commit()
-    
-    # Send notification (don't block on failure)
-    try:
-        notification_service = NotificationService(db)
-        await notification_service.send_cancellation_notification(
-            user_id=current_user.id,
-            activity_id=activity_id
-        )
-    except Exception as e:
-        logger.warning(f"Failed to send cancellation notification: {e}")
-    
+    # Update status, release the seat, promote from the waitlist and queue
+    # the notifications (one commit)
+    await RegistrationService(db).cancel(registration)
     return None
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, List
 from uuid import UUID
 from datetime import date
 
 from app.core.auth import get_current_staff
 from app.core.deps import get_db
+from app.models.ballot import BallotAllocationResponse
 from app.services.analytics_service import AnalyticsService
+from app.services.ballot_service import BallotService
 from app.db.models import Activity, Registration, VolunteerMatch, User
 from app.core.enums import RegistrationStatus
 
@@ -16,7 +19,7 @@ router = APIRouter()
 @router.get("/analytics", response_model=Dict)
 async def get_analytics(
     current_user = Depends(get_current_staff),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get dashboard analytics
@@ -32,10 +35,10 @@ async def get_analytics(
     analytics_service = AnalyticsService(db)
 
     # Get base metrics from service
-    metrics = analytics_service.get_dashboard_metrics()
+    metrics = await analytics_service.get_dashboard_metrics()
 
     # Get weekly trends for chart data
-    weekly_trends = analytics_service.get_weekly_trends()
+    weekly_trends = await analytics_service.get_weekly_trends()
 
     return {
         "total_activities": metrics["total_activities"],
@@ -51,7 +54,7 @@ async def get_analytics(
 async def get_activity_attendance(
     activity_id: UUID,
     current_user = Depends(get_current_staff),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get attendance list for an activity
@@ -62,7 +65,7 @@ async def get_activity_attendance(
     - Activity details
     """
     # Fetch activity, 404 if not found
-    activity = db.query(Activity).filter(Activity.id == activity_id).first()
+    activity = await db.get(Activity, activity_id)
     if not activity:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -71,7 +74,7 @@ async def get_activity_attendance(
 
     # Get attendance data via service
     analytics_service = AnalyticsService(db)
-    attendance = analytics_service.get_activity_attendance(str(activity_id))
+    attendance = await analytics_service.get_activity_attendance(activity_id)
 
     return {
         "activity": {
@@ -91,7 +94,7 @@ async def get_activity_attendance(
 async def export_attendance_csv(
     activity_id: UUID,
     current_user = Depends(get_current_staff),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Export attendance as CSV file
@@ -102,7 +105,7 @@ async def export_attendance_csv(
     - Volunteer name, email, phone
     """
     # Fetch activity, 404 if not found
-    activity = db.query(Activity).filter(Activity.id == activity_id).first()
+    activity = await db.get(Activity, activity_id)
     if not activity:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -113,15 +116,14 @@ async def export_attendance_csv(
     csv_content = "Name,Email,Phone,Role,Registration Time\n"
 
     # Get participants with registration timestamps
-    participant_registrations = (
-        db.query(User, Registration)
+    participant_registrations = (await db.execute(
+        select(User, Registration)
         .join(Registration, User.id == Registration.user_id)
-        .filter(
+        .where(
             Registration.activity_id == activity_id,
             Registration.status == RegistrationStatus.CONFIRMED
         )
-        .all()
-    )
+    )).all()
 
     for user, registration in participant_registrations:
         name = user.full_name or ""
@@ -132,15 +134,14 @@ async def export_attendance_csv(
         csv_content += f'"{name}","{email}","{phone}","Participant","{reg_time}"\n'
 
     # Get volunteers with match timestamps
-    volunteer_matches = (
-        db.query(User, VolunteerMatch)
+    volunteer_matches = (await db.execute(
+        select(User, VolunteerMatch)
         .join(VolunteerMatch, User.id == VolunteerMatch.volunteer_id)
-        .filter(
+        .where(
             VolunteerMatch.activity_id == activity_id,
             VolunteerMatch.status == RegistrationStatus.CONFIRMED
         )
-        .all()
-    )
+    )).all()
 
     for user, match in volunteer_matches:
         name = user.full_name or ""
@@ -156,12 +157,40 @@ async def export_attendance_csv(
     )
 
 
+@router.post("/activities/{activity_id}/ballot/allocate", response_model=BallotAllocationResponse)
+async def allocate_ballot(
+    activity_id: UUID,
+    current_user = Depends(get_current_staff),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Draw an activity's ballot now
+
+    Closes the ballot window if it is still open, assigns seats to pending
+    entries by lottery (waitlisting the rest) and notifies every entrant.
+    Draws happen automatically at window close; this is for closing early.
+    """
+    result = await BallotService(db).allocate(activity_id, close_now=True)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity not found"
+        )
+
+    return BallotAllocationResponse(
+        activity_id=result.activity_id,
+        winners=result.winners,
+        waitlisted=result.waitlisted,
+        ineligible=result.ineligible
+    )
+
+
 @router.get("/reports/weekly")
 async def get_weekly_report(
     start_date: date,
     end_date: date,
     current_user = Depends(get_current_staff),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get weekly activity report
@@ -181,9 +210,9 @@ async def get_weekly_report(
     analytics_service = AnalyticsService(db)
 
     # Get counts for date range
-    activities_count = analytics_service.get_activities_in_range(start_date, end_date)
-    registrations = analytics_service.get_registrations_in_range(start_date, end_date)
-    program_breakdown = analytics_service.get_program_breakdown_in_range(start_date, end_date)
+    activities_count = await analytics_service.get_activities_in_range(start_date, end_date)
+    registrations = await analytics_service.get_registrations_in_range(start_date, end_date)
+    program_breakdown = await analytics_service.get_program_breakdown_in_range(start_date, end_date)
 
     return {
         "start_date": start_date,
@@ -6,9 +6,13 @@ from typing import Optional, Dict
 from supabase import create_client, Client
 
 from app.core.config import settings
+from app.core.concurrency import run_blocking
 from app.core.enums import Role
+from app.core.jwt_verifier import get_jwt_verifier, TokenVerificationError
+from app.core.principal_cache import get_principal_cache
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Initialize Supabase client
 supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
@@ -40,27 +44,89 @@ def verify_token(token: str) -> Dict:
         )
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
-    """Get current authenticated user"""
-    token = credentials.credentials
-    
+def _fetch_remote_user(token: str):
+    """Resolve the user by asking the Supabase auth server"""
+    response = supabase.auth.get_user(token)
+    if not response or not response.user:
+        raise TokenVerificationError("Supabase rejected the session")
+    return response.user
+
+
+def _verify_principal(token: str):
+    """
+    Verify a bearer token and return the user (blocking)
+
+    In 'local' mode the Supabase JWT is verified in-process; the remote
+    get_user call is only made when AUTH_REMOTE_SESSION_CHECK is enabled
+    (to catch revoked sessions) or when AUTH_VERIFY_MODE is 'remote'.
+
+    Returns:
+        Tuple of (user, token_exp)
+    """
+    if settings.AUTH_VERIFY_MODE == "remote":
+        user = _fetch_remote_user(token)
+        # Only used to bound the cache lifetime of an already verified user
+        return user, jwt.get_unverified_claims(token).get("exp")
+
+    user = get_jwt_verifier().verify(token)
+    if settings.AUTH_REMOTE_SESSION_CHECK:
+        _fetch_remote_user(token)
+    return user, user.expires_at
+
+
+async def authenticate_token(token: str):
+    """
+    Resolve the principal for a bearer token
+
+    Resolved users are cached by token fingerprint, so repeat requests with
+    the same token skip verification until the token expires or logs out.
+    Verification itself may hit the network (JWKS refresh, remote session
+    check), so it runs in the worker thread pool.
+    """
+    cache = get_principal_cache()
+    user = cache.get(token)
+    if user is not None:
+        return user
+
     try:
-        # Verify with Supabase
-        user = supabase.auth.get_user(token)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return user.user
-    except Exception as e:
+        user, token_exp = await run_blocking(_verify_principal, token)
+    except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    cache.put(token, user, token_exp)
+    return user
+
+
+async def principal_id(token: str) -> str:
+    """Verified user id (token ``sub``) for a bearer token; raises HTTPException if invalid"""
+    return str((await authenticate_token(token)).id)
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
+    """Get current authenticated user"""
+    return await authenticate_token(credentials.credentials)
+
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[Dict]:
+    """
+    Get current user if a valid bearer token was sent (for public endpoints)
+
+    An expired or malformed token is treated as anonymous rather than a 401,
+    so public listings keep working for clients holding a stale session.
+    """
+    if credentials is None:
+        return None
+    try:
+        return await authenticate_token(credentials.credentials)
+    except HTTPException:
+        return None
+
 
 async def get_current_staff(current_user: Dict = Depends(get_current_user)) -> Dict:
     """Verify user is staff"""
@@ -0,0 +1,50 @@
+"""
+Helpers for keeping blocking work off the event loop.
+
+Synchronous SDK calls (Supabase auth) run in the shared worker thread pool.
+Password hashing runs in a dedicated, bounded pool so a burst of logins
+cannot starve the threads other requests depend on.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_bcrypt_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_bcrypt_executor() -> ThreadPoolExecutor:
+    """Get or create the password hashing pool (bcrypt releases the GIL)."""
+    global _bcrypt_executor
+    if _bcrypt_executor is None:
+        _bcrypt_executor = ThreadPoolExecutor(
+            max_workers=settings.BCRYPT_POOL_SIZE,
+            thread_name_prefix="bcrypt"
+        )
+    return _bcrypt_executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking I/O in the shared worker thread pool"""
+    return await run_in_threadpool(func, *args, **kwargs)
+
+
+async def run_in_bcrypt_pool(func: Callable[..., T], *args: Any) -> T:
+    """Run CPU-heavy password hashing in the bounded bcrypt pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_bcrypt_executor(), partial(func, *args))
+
+
+def shutdown_executors() -> None:
+    """Release pool threads on application shutdown"""
+    global _bcrypt_executor
+    if _bcrypt_executor is not None:
+        _bcrypt_executor.shutdown(wait=False)
+        _bcrypt_executor = None
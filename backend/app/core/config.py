@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -9,12 +10,91 @@ class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_ANON_KEY: str
     SUPABASE_SERVICE_KEY: Optional[str] = None
+
+    # Connection pool ('direct', 'pgbouncer_transaction' or 'serverless'; see app/db/pool.py)
+    DB_POOL_PROFILE: str = "direct"
+    DB_POOL_SIZE: Optional[int] = None  # Overrides for the selected profile
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: Optional[int] = None
+    DB_POOL_RECYCLE: Optional[int] = None
     
     # JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+
+    # Supabase token verification
+    AUTH_VERIFY_MODE: Optional[str] = None  # 'local' (verify JWT in-process) or 'remote' (Supabase get_user); see below
+    AUTH_REMOTE_SESSION_CHECK: bool = False  # Also ask Supabase whether the session was revoked
+    SUPABASE_JWT_SECRET: Optional[str] = None  # Needed for HS256-signed projects
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    SUPABASE_JWKS_URL: Optional[str] = None  # Defaults to <SUPABASE_URL>/auth/v1/.well-known/jwks.json
+    JWKS_CACHE_TTL_SECONDS: int = 3600
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300  # Upper bound; entries never outlive the token's exp
+
+    # Activity listing
+    ACTIVITY_COUNT_CACHE_TTL_SECONDS: int = 60  # How stale include_total=approximate may be
+    ACTIVITY_COUNT_CACHE_MAX_SIZE: int = 256  # Distinct (date_filter, program_type) totals kept
+    CATALOG_VERSION_TTL_SECONDS: float = 5.0  # Max ETag/cache staleness for writes made by other workers
+    ACTIVITY_CACHE_ENABLED: bool = True  # Serve activity lists from the in-process catalog snapshot
+
+    # Ballot (lottery) registration
+    BALLOT_ALLOCATOR_ENABLED: bool = True
+    BALLOT_ALLOCATOR_INTERVAL_SECONDS: float = 30.0  # How soon after a window closes seats are drawn
+
+    # Swiper seat holds
+    SEAT_HOLD_TTL_SECONDS: int = 120  # How long a held seat waits for confirmation
+    SEAT_HOLD_SWEEPER_ENABLED: bool = True
+    SEAT_HOLD_SWEEP_INTERVAL_SECONDS: float = 15.0  # Expired holds keep their seat at most this much longer
+    SEAT_HOLD_SWEEP_BATCH: int = 500  # Holds deleted per sweep transaction
+
+    # Notification outbox (registration / match messages sent off the request path)
+    NOTIFICATION_OUTBOX_ENABLED: bool = True  # Run the dispatcher in this process
+    NOTIFICATION_OUTBOX_INTERVAL_SECONDS: float = 2.0  # Max delay before a queued message is picked up
+    NOTIFICATION_OUTBOX_BATCH_SIZE: int = 100
+    NOTIFICATION_OUTBOX_CONCURRENCY: int = 8  # Sends in flight per batch
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS: float = 30.0  # Doubles per attempt, with jitter
+    NOTIFICATION_DIGEST_WINDOW_SECONDS: float = 30.0  # Hold new messages this long to merge bursts per recipient (0 = off)
+
+    # Activity reminders (queued in the outbox ahead of each activity)
+    REMINDER_SCHEDULER_ENABLED: bool = True  # Run the scheduler in this process
+    REMINDER_SCHEDULER_INTERVAL_SECONDS: float = 60.0
+    REMINDER_LEAD_HOURS: int = 24  # Remind for activities starting within this many hours
+
+    # Bulk sends (POST /notifications/send-bulk runs as a background job)
+    NOTIFICATION_BULK_CONCURRENCY: int = 10  # Sends in flight per job
+    NOTIFICATION_BULK_CHUNK_SIZE: int = 100  # Recipients per status update / progress step
+    NOTIFICATION_JOB_REAPER_ENABLED: bool = True  # Resume jobs left behind by a crashed worker
+    NOTIFICATION_JOB_REAPER_INTERVAL_SECONDS: float = 60.0
+    NOTIFICATION_JOB_STALE_SECONDS: float = 300.0  # No progress for this long = runner died (must exceed one chunk)
+    NOTIFICATION_JOB_MAX_ATTEMPTS: int = 3  # Runs before a stale job is marked failed
+
+    # Idempotency-Key support for retried POSTs
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # How long a stored response is replayed to retries
+    IDEMPOTENCY_LOCK_SECONDS: float = 60.0  # After this an unfinished attempt is presumed dead
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # How long a duplicate waits for the in-flight attempt
+    IDEMPOTENCY_CACHE_MAX_SIZE: int = 10000
+
+    # Cross-worker cache invalidation (Postgres LISTEN/NOTIFY)
+    INVALIDATION_BUS_ENABLED: bool = True
+    INVALIDATION_CHANNEL: str = "cache_invalidation"
+
+    # Password hashing
+    BCRYPT_POOL_SIZE: int = 4  # Threads dedicated to bcrypt so logins don't block the event loop
     
+    # Messaging (SMS / WhatsApp, see app/integrations/messaging.py)
+    MESSAGING_BACKEND: str = "mock"  # 'mock' (log only), 'twilio' (live) or 'local' (HTTP stand-in)
+    MESSAGING_LOCAL_URL: str = "http://localhost:8025"  # Stand-in for MESSAGING_BACKEND=local
+    MESSAGING_RATE_PER_SECOND: float = 10.0  # Per sender number; match the Twilio sender's limit (0 = unlimited)
+    MESSAGING_MAX_ATTEMPTS: int = 3  # Per message, for connection errors / 429 (5xx isn't retried)
+    MESSAGING_RETRY_BASE_SECONDS: float = 0.5  # Doubles per attempt, with jitter
+    MESSAGING_MAX_RETRY_AFTER_SECONDS: float = 30.0  # Cap on a provider's Retry-After
+    MESSAGING_MAX_CONNECTIONS: int = 20  # Pooled HTTP connections to the provider
+    MESSAGING_TIMEOUT_SECONDS: float = 10.0
+
     # Twilio
     TWILIO_ACCOUNT_SID: Optional[str] = None
     TWILIO_AUTH_TOKEN: Optional[str] = None
@@ -25,12 +105,20 @@ class Settings(BaseSettings):
     ELEVENLABS_API_KEY: Optional[str] = None
     
     # Google Cloud
+    GOOGLE_TRANSLATE_API_KEY: Optional[str] = None
     GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = None
     GOOGLE_PROJECT_ID: Optional[str] = None
     
     # CORS
     FRONTEND_URL: str = "http://localhost:5173"
     
+    @model_validator(mode="after")
+    def _default_auth_verify_mode(self):
+        """Verify locally only when a JWT secret or JWKS URL is configured"""
+        if not self.AUTH_VERIFY_MODE:
+            self.AUTH_VERIFY_MODE = "local" if (self.SUPABASE_JWT_SECRET or self.SUPABASE_JWKS_URL) else "remote"
+        return self
+
     class Config:
         env_file = ".env"
         case_sensitive = True
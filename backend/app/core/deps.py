@@ -1,11 +1,10 @@
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from typing import AsyncIterator
 
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import AsyncSessionLocal
 
-def get_db():
+
+async def get_db() -> AsyncIterator[AsyncSession]:
     """Database session dependency"""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
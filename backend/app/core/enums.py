@@ -20,6 +20,23 @@ class RegistrationStatus(str, Enum):
     WAITLIST = "waitlist"
 
 
+class BallotStatus(str, Enum):
+    PENDING = "pending"
+    WON = "won"
+    LOST = "lost"
+
+
+class NotificationKind(str, Enum):
+    REGISTRATION_CONFIRMATION = "registration_confirmation"
+    CANCELLATION = "cancellation"
+    WAITLIST_PROMOTION = "waitlist_promotion"
+    MATCH_CONFIRMATION = "match_confirmation"
+    ACTIVITY_REMINDER = "activity_reminder"
+    BALLOT_WON = "ballot_won"
+    BALLOT_WAITLISTED = "ballot_waitlisted"
+    BALLOT_INELIGIBLE = "ballot_ineligible"
+
+
 class Language(str, Enum):
     ENGLISH = "en"
     MANDARIN = "zh"
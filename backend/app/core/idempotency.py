@@ -0,0 +1,427 @@
+"""
+Idempotency-Key support for retried POSTs.
+
+Mobile clients retry POST /registrations, /matches and /notifications/send
+on flaky connections. When such a request carries an ``Idempotency-Key``
+header, the first attempt runs normally and its response is stored; retries
+with the same key get the stored response back without reaching the
+endpoint, so validation isn't re-run and no second SMS goes out.
+
+Keys are scoped to the caller (the verified user id, i.e. the token's
+``sub``, so a retry after a token refresh still matches) plus method and
+path. Requests without a valid bearer token pass straight through and get
+the endpoint's own 401. Completed responses live in the
+``idempotency_keys`` table for IDEMPOTENCY_TTL_SECONDS with a bounded
+in-memory front cache. A duplicate that arrives while the first attempt is
+still running waits for its result: in-process via a shared future, across
+workers by polling the row. 5xx responses are not stored, so those retries
+execute again.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.db.models import IdempotencyRecord
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """A completed response, as replayed to retries"""
+    request_hash: str
+    status_code: int
+    content_type: Optional[str]
+    body: bytes
+
+
+class IdempotencyStore:
+    """
+    Idempotency records: LRU front cache over the idempotency_keys table.
+
+    ``begin`` claims a key for execution (or returns the stored response),
+    ``complete`` records the outcome. Reports counters through ``stats()``.
+    """
+
+    def __init__(
+        self,
+        sessionmaker=AsyncSessionLocal,
+        ttl_seconds: int = 86400,
+        lock_seconds: float = 60.0,
+        wait_seconds: float = 10.0,
+        max_size: int = 10000
+    ):
+        self.sessionmaker = sessionmaker
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.max_size = max_size
+        self._cache: "OrderedDict[str, Tuple[float, StoredResponse]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._in_flight: Dict[str, "asyncio.Future[Optional[StoredResponse]]"] = {}
+        self.executed = 0
+        self.replayed = 0
+        self.waited = 0
+
+    @staticmethod
+    def scope(principal_id: str, method: str, path: str, key: str) -> str:
+        """Storage key for an Idempotency-Key sent by one caller to one endpoint"""
+        raw = "\n".join([principal_id, method, path, key])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def request_hash(body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+
+    def _cached(self, scope: str) -> Optional[StoredResponse]:
+        with self._cache_lock:
+            entry = self._cache.get(scope)
+            if entry is None:
+                return None
+            expires_at, stored = entry
+            if expires_at <= time.time():
+                del self._cache[scope]
+                return None
+            self._cache.move_to_end(scope)
+            return stored
+
+    def _remember(self, scope: str, stored: StoredResponse, expires_at: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[scope] = (expires_at, stored)
+            self._cache.move_to_end(scope)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    async def begin(self, scope: str, request_hash: str) -> Optional[StoredResponse]:
+        """
+        Claim a key, or get the response of the attempt that already used it
+
+        Returns None when the caller should execute the request (and must
+        then call ``complete``). Waits while another attempt is in flight.
+
+        Raises:
+            asyncio.TimeoutError: The other attempt didn't finish in wait_seconds
+        """
+        stored = self._cached(scope)
+        if stored is not None:
+            self.replayed += 1
+            return stored
+
+        pending = self._in_flight.get(scope)
+        if pending is not None:
+            self.waited += 1
+            stored = await asyncio.wait_for(asyncio.shield(pending), self.wait_seconds)
+            if stored is not None:
+                self.replayed += 1
+                return stored
+            # The first attempt failed (5xx) without storing; race for a fresh claim
+            return await self.begin(scope, request_hash)
+
+        self._in_flight[scope] = asyncio.get_running_loop().create_future()
+        try:
+            stored = await self._claim_or_wait(scope, request_hash)
+        except BaseException:
+            self._release(scope, None)
+            raise
+        if stored is not None:
+            self._release(scope, stored)
+            self.replayed += 1
+            return stored
+
+        self.executed += 1
+        return None
+
+    async def _claim_or_wait(self, scope: str, request_hash: str) -> Optional[StoredResponse]:
+        """Insert the in-progress row, or wait for another worker's attempt to finish"""
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            now = datetime.now(timezone.utc)
+            async with self.sessionmaker() as db:
+                db.add(IdempotencyRecord(
+                    key=scope,
+                    request_hash=request_hash,
+                    expires_at=now + timedelta(seconds=self.lock_seconds)
+                ))
+                try:
+                    await db.commit()
+                    return None
+                except IntegrityError:
+                    await db.rollback()
+
+                # Take over rows that expired (including attempts whose worker died)
+                taken = (await db.execute(
+                    update(IdempotencyRecord)
+                    .where(IdempotencyRecord.key == scope, IdempotencyRecord.expires_at <= now)
+                    .values(
+                        request_hash=request_hash,
+                        status_code=None,
+                        content_type=None,
+                        body=None,
+                        created_at=now,
+                        expires_at=now + timedelta(seconds=self.lock_seconds)
+                    )
+                    .execution_options(synchronize_session=False)
+                )).rowcount
+                await db.commit()
+                if taken:
+                    return None
+
+                record = (await db.execute(
+                    select(IdempotencyRecord).where(IdempotencyRecord.key == scope)
+                )).scalar_one_or_none()
+
+            if record is not None and record.status_code is not None:
+                stored = StoredResponse(record.request_hash, record.status_code, record.content_type, record.body or b"")
+                expires_at = record.expires_at
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                self._remember(scope, stored, expires_at.timestamp())
+                return stored
+
+            if time.monotonic() >= deadline:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(0.1)
+
+    async def complete(
+        self,
+        scope: str,
+        request_hash: str,
+        status_code: int,
+        content_type: Optional[str],
+        body: bytes
+    ) -> None:
+        """Store the outcome of an executed attempt and wake up waiting duplicates"""
+        stored = StoredResponse(request_hash, status_code, content_type, body)
+        try:
+            async with self.sessionmaker() as db:
+                if status_code >= 500:
+                    # Let the client retry for real
+                    await db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.key == scope))
+                else:
+                    await db.execute(
+                        update(IdempotencyRecord)
+                        .where(IdempotencyRecord.key == scope)
+                        .values(
+                            status_code=status_code,
+                            content_type=content_type,
+                            body=body,
+                            expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                await db.commit()
+        except Exception as e:
+            # The response has already gone out; a retry will just execute again
+            logger.warning(f"Failed to store idempotent response: {e}")
+            self._release(scope, None)
+            return
+
+        if status_code >= 500:
+            self._release(scope, None)
+        else:
+            self._remember(scope, stored, time.time() + self.ttl_seconds)
+            self._release(scope, stored)
+
+    def _release(self, scope: str, stored: Optional[StoredResponse]) -> None:
+        pending = self._in_flight.pop(scope, None)
+        if pending is not None and not pending.done():
+            pending.set_result(stored)
+
+    async def purge_expired(self) -> int:
+        """Delete expired records (run periodically)"""
+        async with self.sessionmaker() as db:
+            deleted = (await db.execute(
+                delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= datetime.now(timezone.utc))
+            )).rowcount
+            await db.commit()
+        return deleted
+
+    def clear(self) -> None:
+        """Drop the front cache"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._cache_lock:
+            size = len(self._cache)
+        return {
+            "cached": size,
+            "in_flight": len(self._in_flight),
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "waited": self.waited
+        }
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware applying Idempotency-Key to POSTs on the given paths
+
+    ``principal`` resolves a bearer token to the caller's user id and raises
+    if the token is invalid. Requests without the header or a valid token
+    (or to other routes) pass straight through.
+    """
+
+    def __init__(
+        self,
+        app,
+        paths: Iterable[str],
+        principal: Callable[[str], Awaitable[str]],
+        store: Optional[IdempotencyStore] = None
+    ):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.principal = principal
+        self._store = store
+
+    @property
+    def store(self) -> IdempotencyStore:
+        return self._store or get_idempotency_store()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        key = headers.get(HEADER.encode("latin-1"))
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"})
+            return
+
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        try:
+            principal_id = await self.principal(token.strip()) if scheme.lower() == "bearer" else None
+        except Exception:
+            principal_id = None
+        if not principal_id:
+            # Unauthenticated: the endpoint answers 401, nothing to replay
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the body to fingerprint it, then replay it to the app
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                await self.app(scope, receive, send)
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        store = self.store
+        key_scope = store.scope(principal_id, scope["method"], scope["path"], key.decode("latin-1"))
+        request_hash = store.request_hash(body)
+
+        try:
+            stored = await store.begin(key_scope, request_hash)
+        except asyncio.TimeoutError:
+            await _send_json(
+                send, 409, {"detail": "A request with this Idempotency-Key is still in progress"},
+                extra_headers=[(b"retry-after", b"1")]
+            )
+            return
+
+        if stored is not None:
+            if stored.request_hash != request_hash:
+                await _send_json(send, 422, {"detail": "Idempotency-Key was already used with a different request"})
+                return
+            await _replay(send, stored)
+            return
+
+        await self._execute(scope, body, receive, send, store, key_scope, request_hash)
+
+    async def _execute(self, scope, body: bytes, receive, send, store: IdempotencyStore, key_scope: str, request_hash: str):
+        delivered = False
+        response = {"status": 500, "content_type": None, "body": []}
+
+        async def replay_receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        completed = False
+
+        async def capture_send(message):
+            nonlocal completed
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        response["content_type"] = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not completed:
+                completed = True
+                await store.complete(
+                    key_scope, request_hash, response["status"], response["content_type"], b"".join(response["body"])
+                )
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        finally:
+            if not completed:
+                # The app raised before responding; don't store anything
+                await store.complete(key_scope, request_hash, 500, None, b"")
+
+
+async def _replay(send, stored: StoredResponse) -> None:
+    headers = [(b"content-length", str(len(stored.body)).encode("latin-1")), (b"idempotent-replayed", b"true")]
+    if stored.content_type:
+        headers.append((b"content-type", stored.content_type.encode("latin-1")))
+    await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+async def _send_json(send, status_code: int, content: dict, extra_headers=()) -> None:
+    body = dumps(content)
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+        *extra_headers
+    ]
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+# Singleton instance for reuse
+_store_instance: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Get or create the idempotency store singleton."""
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = IdempotencyStore(
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+            wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+            max_size=settings.IDEMPOTENCY_CACHE_MAX_SIZE
+        )
+    return _store_instance
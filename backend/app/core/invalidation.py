@@ -0,0 +1,208 @@
+"""
+Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+Each uvicorn worker keeps its own in-process caches (catalog version and
+snapshot, principal cache). Writes publish a compact change event with
+``pg_notify`` inside their transaction, so it is only delivered if the
+transaction commits. A listener task in every worker applies events from
+other workers to its local caches. The publishing worker has already updated
+its own caches, so it ignores its own events.
+
+LISTEN needs a session-level connection, which pgbouncer in transaction mode
+can't provide, so the listener connects via DIRECT_URL when it is set.
+Publishing works through either. On non-Postgres databases the bus is a no-op.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import select, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Event topics
+TOPIC_CATALOG = "catalog"  # Activity rows or participant counts changed
+TOPIC_PRINCIPAL = "principal"  # Token logged out; key is its fingerprint
+
+# Handlers get the event key, or None when everything for the topic should be dropped
+Handler = Callable[[Optional[str]], None]
+
+
+class InvalidationBus:
+    """Publishes change events and applies events from other workers"""
+
+    def __init__(self, dsn: Optional[str], channel: str = "cache_invalidation", enabled: bool = True):
+        self.dsn = dsn
+        self.channel = channel
+        self.enabled = enabled and dsn is not None
+        self.origin = uuid4().hex[:12]
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._task: Optional[asyncio.Task] = None
+        self._connection = None
+        self.published = 0
+        self.received = 0
+        self.reconnects = 0
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Register a local cache handler for a topic"""
+        self._handlers[topic].append(handler)
+
+    def encode(self, topic: str, key: Optional[str] = None) -> str:
+        """Compact event payload (well under NOTIFY's 8000 byte limit)"""
+        event = {"t": topic, "o": self.origin}
+        if key is not None:
+            event["k"] = key
+        return json.dumps(event, separators=(",", ":"))
+
+    async def publish(self, db: Optional[AsyncSession], topic: str, key: Optional[str] = None) -> None:
+        """
+        Queue an event for other workers
+
+        With a session the NOTIFY joins its transaction and is delivered on
+        commit; without one it is sent immediately on a pooled connection
+        and failures are only logged.
+        """
+        if not self.enabled:
+            return
+
+        statement = select(func.pg_notify(self.channel, self.encode(topic, key)))
+        if db is not None:
+            if db.bind.dialect.name != "postgresql":
+                return
+            await db.execute(statement)
+        else:
+            from app.db.session import async_engine
+            if async_engine.dialect.name != "postgresql":
+                return
+            try:
+                async with async_engine.begin() as conn:
+                    await conn.execute(statement)
+            except Exception as e:
+                # Best effort: the caller's own work already succeeded
+                logger.warning("Failed to publish %s invalidation: %s", topic, e)
+                return
+        self.published += 1
+
+    def handle_payload(self, payload: str) -> None:
+        """Apply one NOTIFY payload from another worker"""
+        try:
+            event = json.loads(payload)
+            topic = event["t"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed invalidation event: %r", payload)
+            return
+
+        if event.get("o") == self.origin:
+            return
+        self.received += 1
+        self._dispatch(topic, event.get("k"))
+
+    def reset_all(self) -> None:
+        """Drop everything (events may have been missed while disconnected)"""
+        for topic in list(self._handlers):
+            self._dispatch(topic, None)
+
+    def _dispatch(self, topic: str, key: Optional[str]) -> None:
+        for handler in self._handlers.get(topic, []):
+            try:
+                handler(key)
+            except Exception:
+                logger.exception("Invalidation handler failed for topic %s", topic)
+
+    async def start(self) -> None:
+        """Start the listener task (no-op when disabled)"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._listen_forever(), name="invalidation-listener")
+
+    async def stop(self) -> None:
+        """Stop the listener task and close its connection"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen_forever(self) -> None:
+        import asyncpg
+
+        backoff = 1.0
+        first_connect = True
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except Exception as e:
+                logger.warning("Invalidation listener can't connect (retrying in %.0fs): %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _conn: closed.set())
+            try:
+                await connection.add_listener(
+                    self.channel,
+                    lambda _conn, _pid, _channel, payload: self.handle_payload(payload)
+                )
+                if not first_connect:
+                    self.reconnects += 1
+                    self.reset_all()
+                first_connect = False
+                backoff = 1.0
+                self._connection = connection
+                await closed.wait()
+                logger.warning("Invalidation listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Invalidation listener error: %s", e)
+                await asyncio.sleep(backoff)
+            finally:
+                self._connection = None
+                if not connection.is_closed():
+                    await connection.close()
+
+    def stats(self) -> dict:
+        """Event counters and listener state"""
+        return {
+            "enabled": self.enabled,
+            "listening": self._connection is not None,
+            "published": self.published,
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
+
+
+def listener_dsn(url: str) -> Optional[str]:
+    """Plain Postgres DSN for asyncpg, or None for other databases"""
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("postgres"):
+        return None
+    query = dict(parsed.query)
+    query.pop("pgbouncer", None)
+    return parsed.set(drivername="postgresql", query=query).render_as_string(hide_password=False)
+
+
+# Singleton instance for reuse
+_bus_instance: Optional[InvalidationBus] = None
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    """Get or create the invalidation bus singleton."""
+    global _bus_instance
+    if _bus_instance is None:
+        _bus_instance = InvalidationBus(
+            dsn=listener_dsn(settings.DIRECT_URL or settings.DATABASE_URL),
+            channel=settings.INVALIDATION_CHANNEL,
+            enabled=settings.INVALIDATION_BUS_ENABLED
+        )
+    return _bus_instance
@@ -0,0 +1,165 @@
+"""
+Local verification of Supabase-issued access tokens.
+
+Checks signature, expiry and audience in-process instead of calling the
+Supabase auth server on every request. HS256 tokens are verified with the
+project's JWT secret; asymmetric tokens (RS256/ES256) are verified against
+the project's JWKS, which is fetched once and cached.
+"""
+
+import time
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import httpx
+from jose import jwt, JWTError
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+
+class AuthenticatedUser(BaseModel):
+    """
+    Principal built from verified token claims.
+
+    Exposes the same attributes as the Supabase ``User`` object that the
+    role dependencies and endpoints read (``id``, ``email``, ``user_metadata``).
+    """
+    id: UUID
+    email: Optional[str] = None
+    user_metadata: Dict[str, Any] = Field(default_factory=dict)
+    app_metadata: Dict[str, Any] = Field(default_factory=dict)
+    created_at: Optional[datetime] = None
+    expires_at: Optional[int] = None
+
+
+class TokenVerificationError(Exception):
+    """Raised when an access token fails local verification"""
+    pass
+
+
+class SupabaseJWTVerifier:
+    """
+    Verifies Supabase access tokens without a network round-trip.
+
+    The JWKS document is only fetched when a token references a key id that
+    is not already cached, or when the cache is older than ``jwks_ttl_seconds``.
+    """
+
+    SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+    ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+    def __init__(
+        self,
+        jwt_secret: Optional[str] = None,
+        audience: Optional[str] = "authenticated",
+        jwks_url: Optional[str] = None,
+        jwks_ttl_seconds: int = 3600
+    ):
+        self.jwt_secret = jwt_secret
+        self.audience = audience
+        self.jwks_url = jwks_url
+        self.jwks_ttl_seconds = jwks_ttl_seconds
+        self._jwks: Dict[str, Dict[str, Any]] = {}
+        self._jwks_fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def verify(self, token: str) -> AuthenticatedUser:
+        """
+        Verify a token and build the authenticated principal.
+
+        Raises:
+            TokenVerificationError: If signature, expiry or audience checks fail
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError as e:
+            raise TokenVerificationError(f"Malformed token: {e}")
+
+        algorithm = header.get("alg")
+        key = self._resolve_key(algorithm, header.get("kid"))
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self.audience,
+                options={"verify_aud": self.audience is not None}
+            )
+        except JWTError as e:
+            raise TokenVerificationError(str(e))
+
+        if not claims.get("sub"):
+            raise TokenVerificationError("Token has no subject")
+
+        return AuthenticatedUser(
+            id=claims["sub"],
+            email=claims.get("email"),
+            user_metadata=claims.get("user_metadata") or {},
+            app_metadata=claims.get("app_metadata") or {},
+            expires_at=claims.get("exp")
+        )
+
+    def _resolve_key(self, algorithm: Optional[str], kid: Optional[str]) -> Any:
+        """Pick the verification key for the token's algorithm"""
+        if algorithm in self.SYMMETRIC_ALGORITHMS:
+            if not self.jwt_secret:
+                raise TokenVerificationError("SUPABASE_JWT_SECRET is not configured")
+            return self.jwt_secret
+
+        if algorithm in self.ASYMMETRIC_ALGORITHMS:
+            key = self._get_jwk(kid)
+            if key is None:
+                raise TokenVerificationError(f"Unknown signing key: {kid}")
+            return key
+
+        raise TokenVerificationError(f"Unsupported algorithm: {algorithm}")
+
+    def _get_jwk(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Look up a signing key, refreshing the JWKS cache on miss or expiry"""
+        expired = time.monotonic() - self._jwks_fetched_at > self.jwks_ttl_seconds
+        if expired or kid not in self._jwks:
+            self._refresh_jwks()
+
+        if kid is None and len(self._jwks) == 1:
+            return next(iter(self._jwks.values()))
+        return self._jwks.get(kid)
+
+    def _refresh_jwks(self) -> None:
+        """Fetch the JWKS document (one fetch at a time)"""
+        if not self.jwks_url:
+            raise TokenVerificationError("JWKS URL is not configured")
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if time.monotonic() - self._jwks_fetched_at < 1.0:
+                return
+            try:
+                response = httpx.get(self.jwks_url, timeout=5.0)
+                response.raise_for_status()
+                keys = response.json().get("keys", [])
+            except Exception as e:
+                raise TokenVerificationError(f"Failed to fetch JWKS: {e}")
+
+            self._jwks = {k.get("kid"): k for k in keys}
+            self._jwks_fetched_at = time.monotonic()
+
+
+# Singleton instance for reuse
+_verifier_instance: Optional[SupabaseJWTVerifier] = None
+
+
+def get_jwt_verifier() -> SupabaseJWTVerifier:
+    """Get or create the Supabase JWT verifier singleton."""
+    global _verifier_instance
+    if _verifier_instance is None:
+        _verifier_instance = SupabaseJWTVerifier(
+            jwt_secret=settings.SUPABASE_JWT_SECRET,
+            audience=settings.SUPABASE_JWT_AUDIENCE or None,
+            jwks_url=settings.SUPABASE_JWKS_URL or f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+            jwks_ttl_seconds=settings.JWKS_CACHE_TTL_SECONDS
+        )
+    return _verifier_instance
@@ -0,0 +1,121 @@
+"""
+In-process cache of authenticated principals.
+
+Keyed by a SHA-256 fingerprint of the bearer token so raw tokens are never
+held in memory. Entries live until the token's ``exp`` (capped by a maximum
+TTL) and the cache is bounded with LRU eviction.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from app.core.config import settings
+
+
+class PrincipalCache:
+    """
+    LRU + TTL cache mapping token fingerprints to resolved users.
+
+    Reports hit/miss counters through ``stats()``.
+    """
+
+    def __init__(self, max_size: int = 10000, max_ttl_seconds: int = 300):
+        self.max_size = max_size
+        self.max_ttl_seconds = max_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def fingerprint(token: str) -> str:
+        """Hash a bearer token into a cache key"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Any]:
+        """Return the cached user for a token, or None on miss/expiry"""
+        key = self.fingerprint(token)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user
+
+    def put(self, token: str, user: Any, token_exp: Optional[int] = None) -> None:
+        """
+        Cache a resolved user
+
+        Lifetime is bounded by the token's exp claim and max_ttl_seconds.
+        """
+        now = time.time()
+        expires_at = now + self.max_ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        if expires_at <= now or self.max_size <= 0:
+            return
+
+        key = self.fingerprint(token)
+        with self._lock:
+            self._entries[key] = (expires_at, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def evict(self, token: str) -> bool:
+        """Remove the entry for a token (e.g. on logout)"""
+        return self.evict_fingerprint(self.fingerprint(token))
+
+    def evict_fingerprint(self, key: str) -> bool:
+        """Remove an entry by its fingerprint"""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Drop all cached principals"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Singleton instance for reuse
+_cache_instance: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get or create the principal cache singleton."""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = PrincipalCache(
+            max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+            max_ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+        )
+    return _cache_instance
@@ -0,0 +1,54 @@
+"""
+Fast JSON responses for trusted payloads.
+
+Endpoints that assemble plain dicts straight from database rows return a
+FastJSONResponse, which skips response_model validation and encodes with
+orjson. response_model is still declared on the route for the OpenAPI schema.
+
+Also holds the helpers for conditional GETs (ETag / If-None-Match).
+"""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+# UTC datetimes end in "Z", matching Pydantic's own JSON output
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    """Encode a payload of dicts/lists/UUIDs/dates to JSON bytes"""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches our ETag (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current validator"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def http_date(value: datetime) -> str:
+    """Format a timestamp for Last-Modified (naive values are taken as UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
@@ -0,0 +1,24 @@
+"""
+Portable SQL functions compiled per dialect (Postgres in production, SQLite in tests).
+"""
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import Date
+
+
+class week_start(FunctionElement):
+    """Monday of the week containing a date: ``week_start(Activity.date)``"""
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(week_start)
+def _week_start_postgresql(element, compiler, **kw):
+    return "CAST(date_trunc('week', %s) AS DATE)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(week_start, "sqlite")
+def _week_start_sqlite(element, compiler, **kw):
+    # Forward to Sunday (same day if already Sunday), then back to Monday
+    return "date(%s, 'weekday 0', '-6 days')" % compiler.process(element.clauses, **kw)
@@ -1,11 +1,11 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, Time, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, Time, Text, LargeBinary, ForeignKey, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 
 from app.db.base import Base
-from app.core.enums import Role, MembershipType, RegistrationStatus
+from app.core.enums import Role, MembershipType, RegistrationStatus, BallotStatus
 
 
 class User(Base):
@@ -42,10 +42,14 @@ class Activity(Base):
     location = Column(String(255))
     max_capacity = Column(Integer, nullable=False)
     current_participants = Column(Integer, default=0)
+    held_seats = Column(Integer, default=0, nullable=False)  # Unexpired seat holds, counted against max_capacity
+    seats_updated_at = Column(DateTime(timezone=True), nullable=True)  # Last seat-count change (these don't touch updated_at)
     program_type = Column(String(50))
     wheelchair_accessible = Column(Boolean, default=True, nullable=False)
     payment_required = Column(Boolean, default=False, nullable=False)
     created_by_staff_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    ballot_closes_at = Column(DateTime(timezone=True), nullable=True)  # Set = seats allocated by lottery at this time
+    reminder_sent_at = Column(DateTime(timezone=True), nullable=True)  # Set once the reminder scheduler has claimed it
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -70,14 +74,43 @@ class Registration(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     activity_id = Column(UUID(as_uuid=True), ForeignKey("activities.id", ondelete="CASCADE"), nullable=False, index=True)
     status = Column(SQLEnum(RegistrationStatus, values_callable=lambda x: [e.value for e in x]), default=RegistrationStatus.CONFIRMED)
+    waitlist_position = Column(Integer, nullable=True)  # Queue order while status is waitlist
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # One row per user and activity (cancelled rows are reused)
+    __table_args__ = (UniqueConstraint("user_id", "activity_id"),)
     
     # Relationships
     user = relationship("User", back_populates="registrations")
     activity = relationship("Activity", back_populates="registrations")
 
 
+class BallotEntry(Base):
+    __tablename__ = "ballot_entries"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    activity_id = Column(UUID(as_uuid=True), ForeignKey("activities.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    status = Column(SQLEnum(BallotStatus, values_callable=lambda x: [e.value for e in x]), default=BallotStatus.PENDING, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    allocated_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (UniqueConstraint("activity_id", "user_id"),)
+
+
+class SeatHold(Base):
+    __tablename__ = "seat_holds"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    activity_id = Column(UUID(as_uuid=True), ForeignKey("activities.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (UniqueConstraint("activity_id", "user_id"),)
+
+
 class VolunteerMatch(Base):
     __tablename__ = "volunteer_matches"
 
@@ -103,6 +136,54 @@ class Notification(Base):
     status = Column(String(20), nullable=False, default='pending')  # 'pending', 'sent', 'failed'
     sent_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    job_id = Column(UUID(as_uuid=True), ForeignKey("notification_jobs.id", ondelete="SET NULL"), nullable=True)  # Bulk send it belongs to
 
     # Relationships
     user = relationship("User", back_populates="notifications")
+
+
+class NotificationJob(Base):
+    __tablename__ = "notification_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_by = Column(UUID(as_uuid=True), nullable=True)  # Staff user who started the bulk send
+    message = Column(Text, nullable=False)
+    channel = Column(String(20), nullable=False)  # 'sms' or 'whatsapp'
+    status = Column(String(20), nullable=False, default='queued')  # 'queued', 'running', 'completed', 'failed'
+    total = Column(Integer, nullable=False, default=0)
+    successful = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)  # Runs started (resumed after a crash)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # Last progress commit of the runner
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class OutboxMessage(Base):
+    __tablename__ = "notification_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(40), nullable=False)  # NotificationKind value
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    activity_id = Column(UUID(as_uuid=True), ForeignKey("activities.id", ondelete="CASCADE"), nullable=True)
+    dedupe_key = Column(String(200), nullable=True, unique=True)  # Optional: enqueue at most once per key
+    status = Column(String(20), nullable=False, default='pending')  # 'pending', 'sent', 'failed', 'duplicate', 'skipped'
+    attempts = Column(Integer, nullable=False, default=0)
+    delivered_channels = Column(String(50), nullable=False, default='')  # Channels already sent, not retried
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)  # SHA-256 of caller, method, path and Idempotency-Key
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)  # NULL while the first attempt is in flight
+    content_type = Column(String(100), nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,196 @@
+"""
+Connection pool profiles and checkout metrics.
+
+Supabase exposes the database two ways: a direct Postgres connection and a
+pgbouncer pooler running in transaction mode. Each profile below sets pool
+sizing, timeouts, recycling and prepared-statement behaviour for one of
+those deployments.
+
+- ``direct``: long-lived app server talking to Postgres directly.
+- ``pgbouncer_transaction``: app server behind the Supabase pooler. Server-side
+  prepared statements are disabled because consecutive statements may land on
+  different backend connections.
+- ``serverless``: short-lived workers behind the pooler. No client-side pool;
+  pgbouncer does the pooling.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from uuid import uuid4
+
+from sqlalchemy.engine import URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+
+POOL_PROFILES: Dict[str, Dict[str, Any]] = {
+    "direct": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "prepared_statements": True,
+    },
+    "pgbouncer_transaction": {
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+        "prepared_statements": False,
+    },
+    "serverless": {
+        "pool_size": None,  # NullPool: one connection per checkout
+        "max_overflow": None,
+        "pool_timeout": None,
+        "pool_recycle": None,
+        "pool_pre_ping": False,
+        "prepared_statements": False,
+    },
+}
+
+
+class PoolMetrics:
+    """
+    Checkout wait times and timeouts for one pool.
+
+    Keeps a rolling window of recent waits so percentiles reflect current load.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait_seconds: float) -> None:
+        """Record a successful checkout and how long it waited"""
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait_seconds
+            self.max_wait = max(self.max_wait, wait_seconds)
+            self._waits.append(wait_seconds)
+
+    def record_timeout(self) -> None:
+        """Record a checkout that gave up after pool_timeout"""
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        """Wait-time summary in milliseconds"""
+        with self._lock:
+            waits = sorted(self._waits)
+            p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_p95": round(p95 * 1000, 3),
+                "wait_ms_max": round(self.max_wait * 1000, 3),
+            }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times how long each checkout waits"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(time.perf_counter() - start)
+        return record
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def get_profile(name: str) -> Dict[str, Any]:
+    """Look up a pool profile by name"""
+    try:
+        return POOL_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown DB_POOL_PROFILE '{name}'. Expected one of: {', '.join(POOL_PROFILES)}"
+        )
+
+
+def build_engine_options(url: URL, profile_name: str, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Keyword arguments for create_async_engine under the given profile
+
+    Overrides (e.g. from DB_POOL_SIZE) replace profile values when not None.
+    """
+    profile = dict(get_profile(profile_name))
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            profile[key] = value
+
+    options: Dict[str, Any] = {"pool_pre_ping": profile["pool_pre_ping"]}
+
+    if profile["pool_size"] is None:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=profile["pool_size"],
+            max_overflow=profile["max_overflow"],
+            pool_timeout=profile["pool_timeout"],
+            pool_recycle=profile["pool_recycle"],
+        )
+
+    if url.drivername == "postgresql+asyncpg" and not profile["prepared_statements"]:
+        # pgbouncer (transaction mode) can't track named prepared statements
+        # across server connections; disable both asyncpg caches and use
+        # unique names so nothing collides on a reused backend.
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    return options
+
+
+def attach_metrics(pool: Pool) -> Optional[PoolMetrics]:
+    """Start collecting checkout metrics for an instrumented pool"""
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        pool.metrics = PoolMetrics()
+        return pool.metrics
+    return None
+
+
+def pool_status(pool: Pool, profile_name: str) -> dict:
+    """Live pool occupancy plus checkout wait metrics"""
+    status: Dict[str, Any] = {"profile": profile_name, "pool_class": type(pool).__name__}
+
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return status
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    status.update(
+        size=pool.size(),
+        max_overflow=pool._max_overflow,
+        checked_out=checked_out,
+        idle=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+        saturation=round(checked_out / capacity, 3) if capacity else 0.0,
+    )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
@@ -1,10 +1,71 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import build_engine_options, attach_metrics, pool_status
 
 # Use DIRECT_URL for direct connections (bypasses pgbouncer parameters)
 # Fall back to DATABASE_URL if DIRECT_URL is not set
 db_url = settings.DIRECT_URL or settings.DATABASE_URL
 
-engine = create_engine(db_url)
+# Pooled profiles go through DATABASE_URL (the Supabase pooler)
+pool_profile = settings.DB_POOL_PROFILE
+api_db_url = db_url if pool_profile == "direct" else settings.DATABASE_URL
+
+# asyncio driver for each sync driver name we accept in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> URL:
+    """
+    Point a sync database URL at its asyncio driver
+
+    asyncpg doesn't understand libpq-only query parameters, so sslmode is
+    mapped to ssl and the Supabase pgbouncer flag is dropped.
+    """
+    parsed = make_url(url)
+    parsed = parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername))
+
+    if parsed.drivername == "postgresql+asyncpg":
+        query = dict(parsed.query)
+        query.pop("pgbouncer", None)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+
+    return parsed
+
+
+# Sync engine for one-off scripts (seed, translate_activities)
+engine = create_engine(db_url, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine used by the API
+_async_url = to_async_url(api_db_url)
+async_engine = create_async_engine(
+    _async_url,
+    **build_engine_options(_async_url, pool_profile, {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    })
+)
+attach_metrics(async_engine.sync_engine.pool)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+def get_pool_status() -> dict:
+    """Occupancy and checkout wait metrics for the API connection pool"""
+    return pool_status(async_engine.sync_engine.pool, pool_profile)
@@ -0,0 +1,274 @@
+"""
+Async SMS / WhatsApp transport.
+
+One transport serves every notification path. It wraps a pluggable backend:
+
+- ``twilio``: the live Twilio Messages API over a pooled httpx connection
+- ``local``: the same HTTP client pointed at the local stand-in
+  (app/integrations/messaging_standin.py), for development and benchmarks
+- ``mock``: keeps the most recent messages in memory and logs them (default)
+
+Sends are paced per sender number (MESSAGING_RATE_PER_SECOND). Failures that
+can't have sent anything (connection errors, 429) are retried with jittered
+backoff; 5xx and read timeouts are not, since the POST isn't idempotent and
+the message may already be on its way. Like the previous Twilio wrappers, a
+send returns the message SID or None.
+"""
+
+import asyncio
+import logging
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TWILIO_API_URL = "https://api.twilio.com"
+
+
+class SendError(Exception):
+    """A backend could not send a message"""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+@dataclass
+class SentMessage:
+    sid: str
+    sender: str
+    to: str
+    body: str
+
+
+class MessagingBackend:
+    """Sends one message; raises SendError on failure"""
+
+    name = "base"
+
+    async def send(self, sender: str, to: str, body: str) -> str:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+class MockBackend(MessagingBackend):
+    """Keeps the last ``max_kept`` messages in memory instead of sending them"""
+
+    name = "mock"
+
+    def __init__(self, max_kept: int = 1000):
+        self.sent: Deque[SentMessage] = deque(maxlen=max_kept)
+        self._count = 0
+
+    async def send(self, sender: str, to: str, body: str) -> str:
+        kind = "WA" if sender.startswith("whatsapp:") else "SMS"
+        self._count += 1
+        sid = f"MOCK_{kind}_SID_{self._count}"
+        self.sent.append(SentMessage(sid, sender, to, body))
+        logger.info(f"[MOCK {kind}] To: {to}")
+        logger.info(f"[MOCK {kind}] Message: {body}")
+        return sid
+
+
+class TwilioBackend(MessagingBackend):
+    """Twilio Messages API (or a stand-in speaking it) over a pooled connection"""
+
+    name = "twilio"
+
+    def __init__(
+        self,
+        account_sid: str,
+        auth_token: str,
+        base_url: str = TWILIO_API_URL,
+        max_connections: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        http_transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        max_connections = max_connections or settings.MESSAGING_MAX_CONNECTIONS
+        self._client = httpx.AsyncClient(
+            base_url=f"{base_url.rstrip('/')}/2010-04-01/Accounts/{account_sid}",
+            auth=(account_sid, auth_token),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout_seconds or settings.MESSAGING_TIMEOUT_SECONDS,
+            transport=http_transport
+        )
+
+    async def send(self, sender: str, to: str, body: str) -> str:
+        try:
+            response = await self._client.post("/Messages.json", data={"From": sender, "To": to, "Body": body})
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            # The request never reached Twilio
+            raise SendError(f"{type(e).__name__}: {e}", retryable=True)
+        except httpx.HTTPError as e:
+            raise SendError(f"{type(e).__name__}: {e}")
+
+        if response.status_code == 429:
+            raise SendError(
+                "HTTP 429",
+                retryable=True,
+                retry_after=_retry_after(response.headers.get("Retry-After"))
+            )
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get("message", response.text)
+            except ValueError:
+                detail = response.text
+            raise SendError(f"HTTP {response.status_code}: {detail}")
+        return response.json()["sid"]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """Spaces calls at least 1 / rate seconds apart (no limit if rate <= 0)"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class MessagingTransport:
+    """Rate-limited, retrying SMS / WhatsApp sends over a backend"""
+
+    def __init__(
+        self,
+        backend: MessagingBackend,
+        sms_sender: str = "MINDS",
+        whatsapp_sender: str = "",
+        rate_per_second: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        max_retry_after_seconds: Optional[float] = None
+    ):
+        self.backend = backend
+        self.sms_sender = sms_sender
+        self.whatsapp_sender = _whatsapp_address(whatsapp_sender or sms_sender)
+        self.rate_per_second = settings.MESSAGING_RATE_PER_SECOND if rate_per_second is None else rate_per_second
+        self.max_attempts = max_attempts or settings.MESSAGING_MAX_ATTEMPTS
+        self.retry_base_seconds = (
+            settings.MESSAGING_RETRY_BASE_SECONDS if retry_base_seconds is None else retry_base_seconds
+        )
+        self.max_retry_after_seconds = (
+            settings.MESSAGING_MAX_RETRY_AFTER_SECONDS if max_retry_after_seconds is None else max_retry_after_seconds
+        )
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+
+    async def send_sms(self, to: str, body: str) -> Optional[str]:
+        """Send an SMS; returns the message SID or None"""
+        return await self._send(self.sms_sender, to, body)
+
+    async def send_whatsapp(self, to: str, body: str) -> Optional[str]:
+        """Send a WhatsApp message; returns the message SID or None"""
+        return await self._send(self.whatsapp_sender, _whatsapp_address(to), body)
+
+    async def send(self, channel: str, to: str, body: str) -> Optional[str]:
+        """Send on 'sms' or 'whatsapp'"""
+        if channel == 'whatsapp':
+            return await self.send_whatsapp(to, body)
+        return await self.send_sms(to, body)
+
+    async def _send(self, sender: str, to: str, body: str) -> Optional[str]:
+        limiter = self._limiters.get(sender)
+        if limiter is None:
+            limiter = self._limiters[sender] = RateLimiter(self.rate_per_second)
+
+        for attempt in range(1, self.max_attempts + 1):
+            await limiter.acquire()
+            try:
+                sid = await self.backend.send(sender, to, body)
+                self._sent += 1
+                return sid
+            except SendError as e:
+                if not e.retryable or attempt == self.max_attempts:
+                    self._failed += 1
+                    logger.error(f"Failed to send message to {to} via {self.backend.name}: {e}")
+                    return None
+                self._retried += 1
+                if e.retry_after is not None:
+                    delay = min(e.retry_after, self.max_retry_after_seconds)
+                else:
+                    delay = random.uniform(0, self.retry_base_seconds * (2 ** (attempt - 1)))
+                await asyncio.sleep(delay)
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "sent": self._sent,
+            "failed": self._failed,
+            "retried": self._retried,
+        }
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+
+def _whatsapp_address(number: str) -> str:
+    if not number or number.startswith("whatsapp:"):
+        return number
+    return f"whatsapp:{number}"
+
+
+def _backend_from_settings() -> MessagingBackend:
+    if settings.MESSAGING_BACKEND == "twilio":
+        if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN and settings.TWILIO_PHONE_NUMBER:
+            logger.info("Messaging transport initialized in LIVE mode")
+            return TwilioBackend(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        logger.warning("Twilio credentials incomplete, falling back to mock messaging")
+    elif settings.MESSAGING_BACKEND == "local":
+        logger.info(f"Messaging transport using local stand-in at {settings.MESSAGING_LOCAL_URL}")
+        return TwilioBackend("AClocal", "local", base_url=settings.MESSAGING_LOCAL_URL)
+    logger.info("Messaging transport initialized in MOCK mode")
+    return MockBackend()
+
+
+_messaging_transport_instance: Optional[MessagingTransport] = None
+
+
+def get_messaging_transport() -> MessagingTransport:
+    """Get the process-wide messaging transport"""
+    global _messaging_transport_instance
+    if _messaging_transport_instance is None:
+        _messaging_transport_instance = MessagingTransport(
+            _backend_from_settings(),
+            sms_sender=settings.TWILIO_PHONE_NUMBER or "MINDS",
+            whatsapp_sender=settings.TWILIO_WHATSAPP_NUMBER or ""
+        )
+    return _messaging_transport_instance
+
+
+async def close_messaging_transport() -> None:
+    """Close pooled connections on application shutdown"""
+    global _messaging_transport_instance
+    if _messaging_transport_instance is not None:
+        await _messaging_transport_instance.aclose()
+        _messaging_transport_instance = None
@@ -0,0 +1,58 @@
+"""
+Local stand-in for the Twilio Messages API.
+
+Accepts POST /2010-04-01/Accounts/{sid}/Messages.json like Twilio, waits a
+configurable latency and returns a message SID, so MESSAGING_BACKEND=local
+exercises the real HTTP path without sending anything. Optional random
+failures (429 by default, which the transport retries; 5xx is not retried)
+exercise error handling.
+
+Run from backend/:
+    STANDIN_LATENCY_MS=50 STANDIN_FAILURE_RATE=0.02 \\
+        uvicorn app.integrations.messaging_standin:app --port 8025
+"""
+
+import asyncio
+import os
+import random
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_standin_app(latency_seconds: float = 0.05, failure_rate: float = 0.0, failure_status: int = 429) -> FastAPI:
+    """Build a stand-in app with the given per-message latency, failure rate and failure status"""
+    app = FastAPI(title="Messaging stand-in")
+    counts = {"received": 0, "accepted": 0, "rejected": 0}
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Messages.json", status_code=201)
+    async def create_message(account_sid: str, request: Request):
+        form = await request.form()
+        counts["received"] += 1
+        if latency_seconds:
+            await asyncio.sleep(latency_seconds)
+        if failure_rate and random.random() < failure_rate:
+            counts["rejected"] += 1
+            return JSONResponse({"message": "Simulated failure"}, status_code=failure_status, headers={"Retry-After": "0"})
+        counts["accepted"] += 1
+        return {
+            "sid": f"SM{uuid.uuid4().hex}",
+            "account_sid": account_sid,
+            "status": "queued",
+            "from": form.get("From"),
+            "to": form.get("To"),
+            "body": form.get("Body"),
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return counts
+
+    return app
+
+
+app = create_standin_app(
+    latency_seconds=float(os.getenv("STANDIN_LATENCY_MS", "50")) / 1000,
+    failure_rate=float(os.getenv("STANDIN_FAILURE_RATE", "0"))
+)
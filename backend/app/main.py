@@ -1,15 +1,91 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.api.router import api_router
+from app.core.auth import principal_id
+from app.core.concurrency import run_blocking, shutdown_executors
+from app.core.idempotency import IdempotencyMiddleware, get_idempotency_store
+from app.core.invalidation import get_invalidation_bus, TOPIC_CATALOG, TOPIC_PRINCIPAL
+from app.core.principal_cache import get_principal_cache
+from app.integrations.messaging import close_messaging_transport, get_messaging_transport
+from app.db.session import async_engine, get_pool_status
+from app.services.activity_catalog_cache import get_activity_catalog_cache
+from app.services.activity_service import clear_count_cache
+from app.services.catalog_version import get_catalog_version
+from app.services.notification_templates import get_notification_templates
+from app.tasks.ballot_allocator import allocate_due_ballots
+from app.tasks.notification_jobs import resume_stale_jobs
+from app.tasks.outbox_dispatcher import dispatch_notifications
+from app.tasks.periodic import PeriodicTask
+from app.tasks.reminder_scheduler import schedule_reminders
+from app.tasks.seat_hold_sweeper import sweep_expired_holds
+
+
+def _evict_principal(fingerprint):
+    cache = get_principal_cache()
+    if fingerprint is None:
+        cache.clear()
+    else:
+        cache.evict_fingerprint(fingerprint)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown hooks"""
+    bus = get_invalidation_bus()
+    # The catalog snapshot is keyed on the catalog version, so a bump covers both
+    bus.subscribe(TOPIC_CATALOG, lambda _key: get_catalog_version().bump())
+    bus.subscribe(TOPIC_CATALOG, clear_count_cache)
+    bus.subscribe(TOPIC_PRINCIPAL, _evict_principal)
+    await bus.start()
+    # Translate the notification templates once, before the first send needs them
+    await run_blocking(get_notification_templates)
+
+    tasks = []
+    if settings.BALLOT_ALLOCATOR_ENABLED:
+        tasks.append(PeriodicTask("ballot-allocator", allocate_due_ballots, settings.BALLOT_ALLOCATOR_INTERVAL_SECONDS))
+    if settings.SEAT_HOLD_SWEEPER_ENABLED:
+        tasks.append(PeriodicTask("seat-hold-sweeper", sweep_expired_holds, settings.SEAT_HOLD_SWEEP_INTERVAL_SECONDS))
+    if settings.REMINDER_SCHEDULER_ENABLED:
+        tasks.append(PeriodicTask("reminder-scheduler", schedule_reminders, settings.REMINDER_SCHEDULER_INTERVAL_SECONDS))
+    if settings.NOTIFICATION_OUTBOX_ENABLED:
+        tasks.append(PeriodicTask("notification-outbox", dispatch_notifications, settings.NOTIFICATION_OUTBOX_INTERVAL_SECONDS))
+    if settings.NOTIFICATION_JOB_REAPER_ENABLED:
+        tasks.append(PeriodicTask("notification-job-reaper", resume_stale_jobs, settings.NOTIFICATION_JOB_REAPER_INTERVAL_SECONDS))
+    if settings.IDEMPOTENCY_ENABLED:
+        tasks.append(PeriodicTask("idempotency-purge", get_idempotency_store().purge_expired, 3600))
+    for task in tasks:
+        task.start()
+
+    yield
+
+    for task in tasks:
+        await task.stop()
+    await bus.stop()
+    await close_messaging_transport()
+    await async_engine.dispose()
+    shutdown_executors()
+
 
 app = FastAPI(
     title="MINDS ActivityHub API",
     description="Accessibility-focused activity management platform for MINDS",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Replay stored responses to client retries carrying an Idempotency-Key
+# (added before CORS so CORS stays outermost and also covers replays)
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        paths=["/api/registrations", "/api/matches", "/api/notifications/send", "/api/notifications/send-bulk"],
+        principal=principal_id
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +101,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
@@ -47,7 +124,13 @@ async def health_check():
     return {
         "status": "healthy",
         "database": "connected",  # TODO: Add actual DB health check
-        "api": "running"
+        "api": "running",
+        "auth_cache": get_principal_cache().stats(),
+        "database_pool": get_pool_status(),
+        "activity_cache": get_activity_catalog_cache().stats(),
+        "invalidation_bus": get_invalidation_bus().stats(),
+        "idempotency": get_idempotency_store().stats(),
+        "messaging": get_messaging_transport().stats()
     }
 
 
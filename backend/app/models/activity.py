@@ -25,6 +25,7 @@ class ActivityCreate(BaseModel):
     program_type: Optional[str] = None
     wheelchair_accessible: bool = True
     payment_required: bool = False
+    ballot_closes_at: Optional[datetime] = None  # Allocate seats by lottery when this window closes
 
 
 class ActivityUpdate(BaseModel):
@@ -38,6 +39,7 @@ class ActivityUpdate(BaseModel):
     program_type: Optional[str] = None
     wheelchair_accessible: Optional[bool] = None
     payment_required: Optional[bool] = None
+    ballot_closes_at: Optional[datetime] = None
 
 
 class ActivityTranslations(BaseModel):
@@ -60,13 +62,17 @@ class ActivityResponse(BaseSchema):
     location: Optional[str]
     max_capacity: int
     current_participants: int
+    held_seats: int = 0  # Seats under an unexpired hold (not yet registered)
     program_type: Optional[str]
     wheelchair_accessible: bool = True
     payment_required: bool = False
     created_by_staff_id: Optional[UUID] = None
     point_of_contact: Optional[StaffContactInfo] = None
+    ballot_closes_at: Optional[datetime] = None
     created_at: datetime
-    # Translations
+    # Set when title/description were projected into one language (?lang=)
+    language: Optional[str] = None
+    # Translations (omitted from language-projected payloads)
     title_zh: Optional[str] = None
     title_ms: Optional[str] = None
     title_ta: Optional[str] = None
@@ -76,13 +82,14 @@ class ActivityResponse(BaseSchema):
     
     @property
     def is_full(self) -> bool:
-        return self.current_participants >= self.max_capacity
+        return self.current_participants + self.held_seats >= self.max_capacity
     
     @property
     def available_spots(self) -> int:
-        return max(0, self.max_capacity - self.current_participants)
+        return max(0, self.max_capacity - self.current_participants - self.held_seats)
 
 
 class ActivityListResponse(BaseModel):
     activities: list[ActivityResponse]
-    total: int
+    total: Optional[int] = None  # Omitted when include_total=none
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
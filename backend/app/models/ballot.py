@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+
+from app.core.enums import BallotStatus
+from app.models.base import BaseSchema
+
+
+class BallotEntryResponse(BaseSchema):
+    id: UUID
+    activity_id: UUID
+    user_id: UUID
+    status: BallotStatus
+    ballot_closes_at: Optional[datetime] = None
+    created_at: datetime
+
+
+class BallotAllocationResponse(BaseModel):
+    activity_id: UUID
+    winners: List[UUID]
+    waitlisted: List[UUID]
+    ineligible: List[UUID]
@@ -30,7 +30,11 @@ class BulkNotificationCreate(BaseModel):
 
 
 class BulkNotificationResponse(BaseModel):
+    """Bulk send job; returned on submit and by the progress endpoint"""
+    job_id: UUID
+    status: str  # 'queued', 'running', 'completed', 'failed'
     total: int
     successful: int
     failed: int
+    pending: int
     message: str
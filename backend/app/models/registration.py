@@ -17,9 +17,18 @@ class RegistrationResponse(BaseSchema):
     user_id: UUID
     activity_id: UUID
     status: RegistrationStatus
+    waitlist_position: Optional[int] = None  # 1-based place in the queue when waitlisted
     created_at: datetime
 
 
+class SeatHoldResponse(BaseSchema):
+    id: UUID
+    user_id: UUID
+    activity_id: UUID
+    expires_at: datetime  # Confirm before this or the seat goes back
+    created_at: Optional[datetime] = None
+
+
 class RegistrationWithActivity(BaseSchema):
     id: UUID
     user_id: UUID
@@ -0,0 +1,336 @@
+"""
+In-process activity catalog cache.
+
+Holds every upcoming activity as a pre-encoded JSON fragment per language,
+so the read-heavy list endpoints (/activities, /registrations/available,
+/matches/available) assemble responses by filtering in memory and joining
+cached bytes instead of querying and serializing each time. Past activities
+are not cached: an /activities page that runs past the upcoming ones is
+topped up with the newest past activities from one database query, and
+pages starting among past activities are served from the database.
+
+The snapshot is tagged with the catalog version (see catalog_version.py).
+When only the seats part moved (register, cancel, hold), the live counts of
+upcoming activities are read and just the changed fragments re-encoded;
+activity edits, and a new day, reload the snapshot. Concurrent misses share
+a single load.
+"""
+
+import asyncio
+from dataclasses import dataclass, field, replace
+from datetime import date, time
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import dumps
+from app.db.models import Activity
+from app.services.activity_response_builder import ActivityPayload, ActivityResponseBuilder, project_payload
+from app.services.catalog_version import CatalogVersion, get_catalog_version
+
+# Full multilingual payload (no ?lang= projection)
+FULL_PAYLOAD = "*"
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Filter/sort fields for one activity plus its full payload"""
+    id: UUID
+    date: date
+    start_time: time
+    program_type: Optional[str]
+    wheelchair_accessible: bool
+    current_participants: int
+    held_seats: int
+    max_capacity: int
+    payload: ActivityPayload
+
+    @property
+    def sort_key(self) -> Tuple[date, time, UUID]:
+        return (self.date, self.start_time, self.id)
+
+
+@dataclass
+class CatalogSnapshot:
+    """Activities from ``day`` on at one catalog version, sorted by (date, start_time, id)"""
+    version: str
+    day: date
+    entries: List[CatalogEntry]
+    fragments: Dict[str, List[bytes]] = field(default_factory=dict)
+    past_totals: Dict[Optional[str], int] = field(default_factory=dict)  # Per program_type
+
+    def fragments_for(self, lang: Optional[str]) -> List[bytes]:
+        """Encoded payloads for a language, built on first use"""
+        key = lang or FULL_PAYLOAD
+        encoded = self.fragments.get(key)
+        if encoded is None:
+            encoded = [dumps(project_payload(e.payload, lang)) for e in self.entries]
+            self.fragments[key] = encoded
+        return encoded
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(chunk) for encoded in self.fragments.values() for chunk in encoded)
+
+
+class ActivityCatalogCache:
+    """
+    Versioned snapshot of the activity catalog
+
+    Reports hit/miss counters and memory footprint through ``stats()``.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.count_refreshes = 0
+
+    async def snapshot(self, db: AsyncSession) -> CatalogSnapshot:
+        """Current snapshot, refreshing counts or reloading once if the catalog version moved"""
+        version = await get_catalog_version().get(db)
+        today = date.today()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version and snapshot.day == today:
+            self.hits += 1
+            return snapshot
+
+        async with self._lock:
+            # Another request may have loaded this version while we waited
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version and snapshot.day == today:
+                self.hits += 1
+                return snapshot
+
+            self.misses += 1
+            if (
+                snapshot is not None
+                and snapshot.day == today
+                and CatalogVersion.content_part(snapshot.version) == CatalogVersion.content_part(version)
+            ):
+                snapshot = await self._refresh_counts(db, snapshot, version)
+            else:
+                snapshot = await self._load(db, version, today)
+            self._snapshot = snapshot
+            return snapshot
+
+    async def _load(self, db: AsyncSession, version: str, today: date) -> CatalogSnapshot:
+        """Read upcoming activities and build their payloads (POC lookup is batched)"""
+        activities = (await db.execute(
+            select(Activity)
+            .where(Activity.date >= today)
+            .order_by(Activity.date, Activity.start_time, Activity.id)
+        )).scalars().all()
+        payloads = await ActivityResponseBuilder(db).build_many(activities)
+        self.loads += 1
+
+        entries = [
+            CatalogEntry(
+                id=a.id,
+                date=a.date,
+                start_time=a.start_time,
+                program_type=a.program_type,
+                wheelchair_accessible=a.wheelchair_accessible,
+                current_participants=a.current_participants or 0,
+                held_seats=a.held_seats or 0,
+                max_capacity=a.max_capacity,
+                payload=payload
+            )
+            for a, payload in zip(activities, payloads)
+        ]
+        return CatalogSnapshot(version=version, day=today, entries=entries)
+
+    async def _refresh_counts(self, db: AsyncSession, snapshot: CatalogSnapshot, version: str) -> CatalogSnapshot:
+        """Overlay live seat counts, re-encoding only the activities whose counts changed"""
+        counts = {
+            row.id: (row.current_participants, row.held_seats)
+            for row in (await db.execute(
+                select(Activity.id, Activity.current_participants, Activity.held_seats)
+                .where(Activity.date >= snapshot.day)
+            )).all()
+        }
+        self.count_refreshes += 1
+
+        entries = snapshot.entries
+        fragments = snapshot.fragments
+        for i, entry in enumerate(snapshot.entries):
+            participants, held = counts.get(entry.id, (entry.current_participants, entry.held_seats))
+            if (participants or 0, held or 0) == (entry.current_participants, entry.held_seats):
+                continue
+            if entries is snapshot.entries:
+                # Copy on first change; readers of the old snapshot keep a consistent view
+                entries = list(snapshot.entries)
+                fragments = {key: list(encoded) for key, encoded in snapshot.fragments.items()}
+            payload = {**entry.payload, "current_participants": participants, "held_seats": held}
+            entries[i] = replace(
+                entry, current_participants=participants or 0, held_seats=held or 0, payload=payload
+            )
+            for key, encoded in fragments.items():
+                encoded[i] = dumps(project_payload(payload, None if key == FULL_PAYLOAD else key))
+
+        return CatalogSnapshot(
+            version=version,
+            day=snapshot.day,
+            entries=entries,
+            fragments=fragments,
+            past_totals=snapshot.past_totals
+        )
+
+    async def _past_total(self, db: AsyncSession, snapshot: CatalogSnapshot, program_type: Optional[str]) -> int:
+        """Count of past activities for a filter (not cached as entries), once per snapshot"""
+        key = program_type or None
+        if key not in snapshot.past_totals:
+            query = select(func.count(Activity.id)).where(Activity.date < snapshot.day)
+            if key:
+                query = query.where(Activity.program_type == key)
+            snapshot.past_totals[key] = (await db.execute(query)).scalar_one()
+        return snapshot.past_totals[key]
+
+    async def list_page(
+        self,
+        db: AsyncSession,
+        date_filter: Optional[date] = None,
+        program_type: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Tuple[date, time, UUID]] = None,
+        skip: int = 0,
+        with_total: bool = True,
+        lang: Optional[str] = None
+    ) -> Optional[Tuple[bytes, Optional[int], Optional[Tuple[date, time, UUID]]]]:
+        """
+        One page of GET /activities, newest first
+
+        Mirrors ActivityService.get_page: ordered by (date, start_time, id)
+        descending, keyset via ``after`` or offset via ``skip``.
+
+        Returns:
+            Tuple of (JSON array bytes, total or None, sort key of the last
+            row if more pages exist), or None when the page starts among past
+            activities and must be read from the database
+        """
+        snapshot = await self.snapshot(db)
+        if (date_filter is not None and date_filter < snapshot.day) or (after and after[0] < snapshot.day):
+            return None
+
+        matching = [
+            i for i in range(len(snapshot.entries) - 1, -1, -1)
+            if (date_filter is None or snapshot.entries[i].date == date_filter)
+            and (not program_type or snapshot.entries[i].program_type == program_type)
+        ]
+        upcoming = len(matching)
+        total = None
+        if with_total:
+            total = upcoming
+            if date_filter is None:
+                total += await self._past_total(db, snapshot, program_type)
+
+        if after:
+            matching = [i for i in matching if snapshot.entries[i].sort_key < after]
+        elif skip:
+            matching = matching[skip:]
+
+        fragments = snapshot.fragments_for(lang)
+        page = matching[:limit]
+        chunks = [fragments[i] for i in page]
+        last = snapshot.entries[page[-1]].sort_key if page else None
+        has_more = len(matching) > limit
+
+        if not has_more and date_filter is None:
+            # Last upcoming page: past activities follow
+            past_skip = 0 if after else max(skip - upcoming, 0)
+            past = await self._past_page(db, snapshot.day, program_type, limit - len(page), past_skip)
+            has_more = len(past) > limit - len(page)
+            past = past[:limit - len(page)]
+            for activity, payload in zip(past, await ActivityResponseBuilder(db).build_many(past)):
+                chunks.append(dumps(project_payload(payload, lang)))
+                last = (activity.date, activity.start_time, activity.id)
+
+        return b"[" + b",".join(chunks) + b"]", total, last if has_more else None
+
+    @staticmethod
+    async def _past_page(
+        db: AsyncSession,
+        day: date,
+        program_type: Optional[str],
+        limit: int,
+        skip: int
+    ) -> List[Activity]:
+        """Newest activities before ``day``, one more than ``limit`` to tell if more follow"""
+        query = select(Activity).where(Activity.date < day)
+        if program_type:
+            query = query.where(Activity.program_type == program_type)
+        query = (
+            query.order_by(Activity.date.desc(), Activity.start_time.desc(), Activity.id.desc())
+            .offset(skip)
+            .limit(limit + 1)
+        )
+        return list((await db.execute(query)).scalars().all())
+
+    async def list_available(
+        self,
+        db: AsyncSession,
+        exclude_ids: Iterable[UUID] = (),
+        wheelchair_only: bool = False,
+        require_spots: bool = False,
+        lang: Optional[str] = None
+    ) -> bytes:
+        """
+        Upcoming activities for the swiper decks, soonest first
+
+        Args:
+            exclude_ids: Activities the user is already registered/matched to
+            wheelchair_only: Only wheelchair-accessible activities
+            require_spots: Only activities with free capacity
+        """
+        snapshot = await self.snapshot(db)
+        fragments = snapshot.fragments_for(lang)
+        today = date.today()
+        excluded = set(exclude_ids)
+
+        selected = [
+            i for i, entry in enumerate(snapshot.entries)
+            if entry.date >= today
+            and entry.id not in excluded
+            and (not wheelchair_only or entry.wheelchair_accessible)
+            and (not require_spots or entry.current_participants + entry.held_seats < entry.max_capacity)
+        ]
+        return self._join(fragments, selected)
+
+    @staticmethod
+    def _join(fragments: List[bytes], indexes: List[int]) -> bytes:
+        return b"[" + b",".join(fragments[i] for i in indexes) + b"]"
+
+    def invalidate(self) -> None:
+        """Drop the snapshot (next request reloads)"""
+        self._snapshot = None
+
+    def stats(self) -> dict:
+        """Hit/miss counters and memory footprint of encoded fragments"""
+        snapshot = self._snapshot
+        lookups = self.hits + self.misses
+        return {
+            "activities": len(snapshot.entries) if snapshot else 0,
+            "languages": sorted(snapshot.fragments) if snapshot else [],
+            "encoded_bytes": snapshot.size_bytes if snapshot else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "count_refreshes": self.count_refreshes,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Singleton instance for reuse
+_catalog_cache_instance: Optional[ActivityCatalogCache] = None
+
+
+def get_activity_catalog_cache() -> ActivityCatalogCache:
+    """Get or create the activity catalog cache singleton."""
+    global _catalog_cache_instance
+    if _catalog_cache_instance is None:
+        _catalog_cache_instance = ActivityCatalogCache()
+    return _catalog_cache_instance
@@ -0,0 +1,211 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from app.core.enums import Language, Role
+from app.db.models import Activity, Registration, User, VolunteerMatch
+
+# Plain-dict payloads shaped like the Pydantic response models
+ActivityPayload = Dict[str, Any]
+
+SUPPORTED_LANGUAGES = {lang.value for lang in Language}
+TRANSLATED_LANGUAGES = ("zh", "ms", "ta")
+
+# Columns every payload needs regardless of language
+BASE_COLUMNS = (
+    Activity.id,
+    Activity.title,
+    Activity.description,
+    Activity.date,
+    Activity.start_time,
+    Activity.end_time,
+    Activity.location,
+    Activity.max_capacity,
+    Activity.current_participants,
+    Activity.held_seats,
+    Activity.program_type,
+    Activity.wheelchair_accessible,
+    Activity.payment_required,
+    Activity.created_by_staff_id,
+    Activity.ballot_closes_at,
+    Activity.created_at,
+)
+
+
+def resolve_language(requested: Optional[str], user: Any = None) -> Optional[str]:
+    """
+    Pick the language to project activity text into
+
+    An explicit ?lang= wins; otherwise the user's preferred_language. Staff
+    (and anonymous callers) get the full multilingual payload by default,
+    since staff tools edit the source text.
+
+    Returns:
+        Language code, or None for the full payload
+    """
+    if requested:
+        return requested
+    if user is None:
+        return None
+
+    metadata = getattr(user, "user_metadata", None) or {}
+    if metadata.get("role") == Role.STAFF.value:
+        return None
+    preferred = metadata.get("preferred_language")
+    return preferred if preferred in SUPPORTED_LANGUAGES else None
+
+
+def activity_columns(lang: Optional[str]) -> tuple:
+    """Activity columns needed to build payloads in the given language"""
+    if lang is None:
+        return BASE_COLUMNS + tuple(
+            getattr(Activity, f"{field}_{code}")
+            for field in ("title", "description")
+            for code in TRANSLATED_LANGUAGES
+        )
+    if lang == Language.ENGLISH.value:
+        return BASE_COLUMNS
+    return BASE_COLUMNS + (getattr(Activity, f"title_{lang}"), getattr(Activity, f"description_{lang}"))
+
+
+def project_payload(payload: ActivityPayload, lang: Optional[str]) -> ActivityPayload:
+    """Project a full multilingual payload into one language (None keeps it as is)"""
+    if lang is None:
+        return payload
+
+    projected = {
+        key: value for key, value in payload.items()
+        if not key.startswith(("title_", "description_"))
+    }
+    if lang != Language.ENGLISH.value:
+        projected["title"] = payload[f"title_{lang}"] or payload["title"]
+        projected["description"] = payload[f"description_{lang}"] or payload["description"]
+    projected["language"] = lang
+    return projected
+
+
+class ActivityResponseBuilder:
+    """
+    Builds ActivityResponse payloads with point-of-contact info
+
+    Staff contacts for a whole batch of activities are loaded with a single
+    IN query, so list endpoints run a constant number of queries. Contact
+    details are cached inside activity payloads (catalog snapshot, ETags), so
+    code that writes a staff user's name, email or phone must call
+    ActivityService.publish_contact_change.
+
+    Payloads are plain dicts built from trusted database rows; they match the
+    ActivityResponse / RegistrationWithActivity / VolunteerMatchWithActivity
+    schemas and are returned through FastJSONResponse without re-validation.
+
+    With a ``lang``, title/description are localized (falling back to
+    English) and the per-language columns are left out of the payload; only
+    the columns from ``activity_columns(lang)`` need to be loaded.
+    """
+
+    def __init__(self, db: AsyncSession, lang: Optional[str] = None):
+        self.db = db
+        self.lang = lang
+
+    async def build(self, activity: Activity) -> ActivityPayload:
+        """Build the payload for a single activity"""
+        return (await self.build_many([activity]))[0]
+
+    async def build_many(self, activities: Iterable[Activity]) -> List[ActivityPayload]:
+        """Build payloads for a batch of activities, preserving order"""
+        activities = list(activities)
+        contacts = await self._load_contacts(
+            {a.created_by_staff_id for a in activities if a.created_by_staff_id}
+        )
+        return [
+            self._to_payload(activity, contacts.get(activity.created_by_staff_id), self.lang)
+            for activity in activities
+        ]
+
+    async def build_registrations(self, registrations: List[Registration]) -> List[Dict[str, Any]]:
+        """RegistrationWithActivity payloads (activity relationship must be loaded)"""
+        activities = await self.build_many(reg.activity for reg in registrations)
+        return [
+            {
+                "id": reg.id,
+                "user_id": reg.user_id,
+                "activity": activity,
+                "status": reg.status,
+                "created_at": reg.created_at,
+            }
+            for reg, activity in zip(registrations, activities)
+        ]
+
+    async def build_matches(self, matches: List[VolunteerMatch]) -> List[Dict[str, Any]]:
+        """VolunteerMatchWithActivity payloads (activity relationship must be loaded)"""
+        activities = await self.build_many(m.activity for m in matches)
+        return [
+            {
+                "id": m.id,
+                "volunteer_id": m.volunteer_id,
+                "activity": activity,
+                "status": m.status,
+                "matched_at": m.matched_at,
+            }
+            for m, activity in zip(matches, activities)
+        ]
+
+    async def _load_contacts(self, staff_ids: set) -> Dict[UUID, Dict[str, Any]]:
+        """Fetch point-of-contact details for all staff ids in one query"""
+        if not staff_ids:
+            return {}
+
+        rows = await self.db.execute(
+            select(User.id, User.full_name, User.email, User.phone)
+            .where(User.id.in_(staff_ids))
+        )
+        return {
+            row.id: {
+                "id": row.id,
+                "full_name": row.full_name,
+                "email": row.email,
+                "phone": row.phone,
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    def _to_payload(
+        activity: Activity,
+        point_of_contact: Optional[Dict[str, Any]] = None,
+        lang: Optional[str] = None
+    ) -> ActivityPayload:
+        payload = {
+            "id": activity.id,
+            "title": activity.title,
+            "description": activity.description,
+            "date": activity.date,
+            "start_time": activity.start_time,
+            "end_time": activity.end_time,
+            "location": activity.location,
+            "max_capacity": activity.max_capacity,
+            "current_participants": activity.current_participants,
+            "held_seats": activity.held_seats,
+            "program_type": activity.program_type,
+            "wheelchair_accessible": activity.wheelchair_accessible,
+            "payment_required": activity.payment_required,
+            "created_by_staff_id": activity.created_by_staff_id,
+            "point_of_contact": point_of_contact,
+            "ballot_closes_at": activity.ballot_closes_at,
+            "created_at": activity.created_at,
+        }
+
+        if lang is None:
+            # Full multilingual payload
+            payload["language"] = None
+            for code in TRANSLATED_LANGUAGES:
+                payload[f"title_{code}"] = getattr(activity, f"title_{code}")
+                payload[f"description_{code}"] = getattr(activity, f"description_{code}")
+            return payload
+
+        if lang != Language.ENGLISH.value:
+            payload["title"] = getattr(activity, f"title_{lang}") or activity.title
+            payload["description"] = getattr(activity, f"description_{lang}") or activity.description
+        payload["language"] = lang
+        return payload
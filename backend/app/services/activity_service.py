@@ -1,20 +1,40 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from datetime import date, datetime
+from sqlalchemy import select, func, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, load_only
+from typing import List, Optional, Dict, Any, Tuple, Sequence
+from datetime import date, datetime, time
 from uuid import UUID
+import threading
+import time as time_module
+from collections import OrderedDict
 
+from app.core.concurrency import run_blocking
+from app.core.config import settings
 from app.services.base_service import BaseService
 from app.db.models import Activity
 from app.integrations.google_translate import get_google_translate_client
+from app.services.catalog_version import SEAT_CHANGE, get_catalog_version
+from app.core.invalidation import get_invalidation_bus, TOPIC_CATALOG
 
 # Languages to translate to (excluding English)
 TARGET_LANGUAGES = ["zh", "ms", "ta"]
 
+# Approximate list totals: (date_filter, program_type) -> (expires_at, count),
+# least recently used first. Keys come from query parameters, so it is bounded.
+_count_cache: "OrderedDict[Tuple[Optional[date], Optional[str]], Tuple[float, int]]" = OrderedDict()
+_count_cache_lock = threading.Lock()
+
+
+def clear_count_cache(_key: Optional[str] = None) -> None:
+    """Drop cached list totals (catalog invalidation handler)"""
+    with _count_cache_lock:
+        _count_cache.clear()
+
 
 class ActivityService(BaseService[Activity]):
     """Service for activity operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         super().__init__(Activity, db)
     
     def translate_activity_content(self, title: str, description: Optional[str] = None) -> Dict[str, str]:
@@ -48,12 +68,20 @@ class ActivityService(BaseService[Activity]):
         
         return translations
     
-    def create_with_translations(self, data: Dict[str, Any]) -> Activity:
+    async def translate_activity_content_async(
+        self,
+        title: str,
+        description: Optional[str] = None
+    ) -> Dict[str, str]:
+        """Translate activity content without blocking the event loop"""
+        return await run_blocking(self.translate_activity_content, title, description)
+    
+    async def create_with_translations(self, data: Dict[str, Any]) -> Activity:
         """
         Create an activity and automatically translate title/description.
         """
         # Get translations
-        translations = self.translate_activity_content(
+        translations = await self.translate_activity_content_async(
             title=data.get("title", ""),
             description=data.get("description")
         )
@@ -64,31 +92,44 @@ class ActivityService(BaseService[Activity]):
         # Create the activity
         activity = Activity(**activity_data)
         self.db.add(activity)
-        self.db.commit()
-        self.db.refresh(activity)
+        await self.publish_catalog_change()
+        await self.db.commit()
+        await self.db.refresh(activity)
         
         return activity
     
-    def get_by_date(self, activity_date: date) -> List[Activity]:
+    async def get_by_date(self, activity_date: date) -> List[Activity]:
         """Get all activities on a specific date"""
-        return self.db.query(Activity).filter(Activity.date == activity_date).all()
+        result = await self.db.execute(select(Activity).where(Activity.date == activity_date))
+        return list(result.scalars().all())
     
-    def get_by_program_type(self, program_type: str) -> List[Activity]:
+    async def get_by_program_type(self, program_type: str) -> List[Activity]:
         """Get activities by program type"""
-        return self.db.query(Activity).filter(Activity.program_type == program_type).all()
+        result = await self.db.execute(select(Activity).where(Activity.program_type == program_type))
+        return list(result.scalars().all())
     
-    def get_upcoming(self, limit: int = 10) -> List[Activity]:
+    async def get_upcoming(self, limit: int = 10) -> List[Activity]:
         """Get upcoming activities"""
         today = date.today()
-        return (
-            self.db.query(Activity)
-            .filter(Activity.date >= today)
+        result = await self.db.execute(
+            select(Activity)
+            .where(Activity.date >= today)
             .order_by(Activity.date, Activity.start_time)
             .limit(limit)
-            .all()
         )
+        return list(result.scalars().all())
     
-    def get_with_filters(
+    @staticmethod
+    def _filter_conditions(date_filter: Optional[date], program_type: Optional[str]) -> list:
+        """WHERE clauses shared by list queries and counts"""
+        conditions = []
+        if date_filter:
+            conditions.append(Activity.date == date_filter)
+        if program_type:
+            conditions.append(Activity.program_type == program_type)
+        return conditions
+    
+    async def get_with_filters(
         self,
         date_filter: Optional[date] = None,
         program_type: Optional[str] = None,
@@ -96,40 +137,182 @@ class ActivityService(BaseService[Activity]):
         limit: int = 100
     ) -> List[Activity]:
         """Get activities with optional filters"""
-        query = self.db.query(Activity)
+        query = select(Activity).where(*self._filter_conditions(date_filter, program_type))
         
-        if date_filter:
-            query = query.filter(Activity.date == date_filter)
+        result = await self.db.execute(
+            query.order_by(Activity.date.desc(), Activity.start_time.desc(), Activity.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    async def get_page(
+        self,
+        date_filter: Optional[date] = None,
+        program_type: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Tuple[date, time, UUID]] = None,
+        skip: int = 0,
+        with_total: bool = True,
+        columns: Optional[Sequence] = None
+    ) -> Tuple[List[Activity], Optional[int], bool]:
+        """
+        Get one page of activities ordered by (date, start_time, id) descending
         
-        if program_type:
-            query = query.filter(Activity.program_type == program_type)
+        Args:
+            after: Keyset of the last row on the previous page; rows strictly
+                after it are returned (skip is ignored when set)
+            with_total: Count all matching rows with a window function in the
+                same query
+            columns: Only load these Activity columns (others stay deferred)
+        
+        Returns:
+            Tuple of (activities, total or None, has_more)
+        """
+        conditions = self._filter_conditions(date_filter, program_type)
+        
+        if with_total:
+            # count(*) OVER () sees the whole filtered set; the keyset and
+            # limit are applied outside so the total isn't truncated
+            inner = select(*(columns or [Activity]), func.count().over().label("total")).where(*conditions).subquery()
+            model = aliased(Activity, inner)
+            query = select(model, inner.c.total)
+        else:
+            model = Activity
+            query = select(Activity).where(*conditions)
+        
+        if columns:
+            query = query.options(load_only(*(getattr(model, c.key) for c in columns)))
+        
+        if after:
+            query = query.where(tuple_(model.date, model.start_time, model.id) < tuple_(*after))
+        elif skip:
+            query = query.offset(skip)
+        
+        query = query.order_by(model.date.desc(), model.start_time.desc(), model.id.desc()).limit(limit + 1)
+        rows = (await self.db.execute(query)).all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        activities = [row[0] for row in rows]
         
-        return query.order_by(Activity.date.desc()).offset(skip).limit(limit).all()
+        total = None
+        if with_total:
+            if rows:
+                total = rows[0].total
+            else:
+                # Past the end of the result set: no row to carry the window total
+                total = await self.count_filtered(date_filter, program_type)
+        
+        return activities, total, has_more
     
-    def increment_participants(self, activity_id: UUID) -> bool:
-        """Increment participant count"""
-        activity = self.get_by_id(activity_id)
-        if not activity:
-            return False
+    async def count_filtered(self, date_filter: Optional[date] = None, program_type: Optional[str] = None) -> int:
+        """Exact count of activities matching the list filters"""
+        query = select(func.count(Activity.id)).where(*self._filter_conditions(date_filter, program_type))
+        return (await self.db.execute(query)).scalar_one()
+    
+    async def count_filtered_cached(self, date_filter: Optional[date] = None, program_type: Optional[str] = None) -> int:
+        """
+        Approximate count of activities matching the list filters
+        
+        Served from an in-process LRU cache for ACTIVITY_COUNT_CACHE_TTL_SECONDS
+        (or until a catalog change from another worker clears it).
+        """
+        key = (date_filter, program_type)
+        now = time_module.monotonic()
+        with _count_cache_lock:
+            cached = _count_cache.get(key)
+            if cached and cached[0] > now:
+                _count_cache.move_to_end(key)
+                return cached[1]
         
-        activity.current_participants += 1
-        self.db.commit()
+        count = await self.count_filtered(date_filter, program_type)
+        with _count_cache_lock:
+            _count_cache[key] = (now + settings.ACTIVITY_COUNT_CACHE_TTL_SECONDS, count)
+            _count_cache.move_to_end(key)
+            while len(_count_cache) > settings.ACTIVITY_COUNT_CACHE_MAX_SIZE:
+                _count_cache.popitem(last=False)
+        return count
+    
+    async def publish_catalog_change(self) -> None:
+        """Tell other workers the catalog changed (delivered when this transaction commits)"""
+        await get_invalidation_bus().publish(self.db, TOPIC_CATALOG)
+
+    async def publish_contact_change(self, staff_id: UUID) -> None:
+        """
+        Mark a staff member's activities changed after their contact details were written (no commit)
+
+        Activity payloads embed the creator as point_of_contact, so their
+        updated_at moves: ETags change and every worker's catalog snapshot
+        reloads. Call ``get_catalog_version().bump()`` after committing.
+        """
+        await self.db.execute(
+            update(Activity)
+            .where(Activity.created_by_staff_id == staff_id)
+            .values(updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.publish_catalog_change()
+
+    async def reserve_seat(self, activity_id: UUID) -> Optional[int]:
+        """
+        Atomically take one seat if the activity isn't full
+
+        A single conditional UPDATE ... RETURNING, so concurrent callers can't
+        overbook. Seats under an unexpired hold count as taken. Does not
+        commit; the caller commits with its own writes.
+
+        Returns:
+            New participant count, or None if the activity is full or missing
+        """
+        return (await self.db.execute(
+            update(Activity)
+            .where(
+                Activity.id == activity_id,
+                Activity.current_participants + Activity.held_seats < Activity.max_capacity
+            )
+            .values(current_participants=Activity.current_participants + 1, **SEAT_CHANGE)
+            .returning(Activity.current_participants)
+            .execution_options(synchronize_session="fetch")
+        )).scalar_one_or_none()
+
+    async def release_seat(self, activity_id: UUID) -> Optional[int]:
+        """
+        Atomically give back one seat (never below zero). Does not commit.
+
+        Returns:
+            New participant count, or None if there was nothing to release
+        """
+        return (await self.db.execute(
+            update(Activity)
+            .where(Activity.id == activity_id, Activity.current_participants > 0)
+            .values(current_participants=Activity.current_participants - 1, **SEAT_CHANGE)
+            .returning(Activity.current_participants)
+            .execution_options(synchronize_session="fetch")
+        )).scalar_one_or_none()
+
+    async def increment_participants(self, activity_id: UUID) -> bool:
+        """Take a seat and commit (False if the activity is full)"""
+        if await self.reserve_seat(activity_id) is None:
+            return False
+        await self.publish_catalog_change()
+        await self.db.commit()
+        get_catalog_version().bump()
         return True
     
-    def decrement_participants(self, activity_id: UUID) -> bool:
-        """Decrement participant count"""
-        activity = self.get_by_id(activity_id)
-        if not activity or activity.current_participants <= 0:
+    async def decrement_participants(self, activity_id: UUID) -> bool:
+        """Release a seat and commit"""
+        if await self.release_seat(activity_id) is None:
             return False
-        
-        activity.current_participants -= 1
-        self.db.commit()
+        await self.publish_catalog_change()
+        await self.db.commit()
+        get_catalog_version().bump()
         return True
     
-    def is_full(self, activity_id: UUID) -> bool:
+    async def is_full(self, activity_id: UUID) -> bool:
         """Check if activity is at capacity"""
-        activity = self.get_by_id(activity_id)
+        activity = await self.get_by_id(activity_id)
         if not activity:
             return True
         
-        return activity.current_participants >= activity.max_capacity
+        return activity.current_participants + activity.held_seats >= activity.max_capacity
@@ -1,7 +1,8 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, timedelta
 from typing import Dict, List
+from uuid import UUID
 
 from app.db.models import Activity, Registration, VolunteerMatch, User
 from app.core.enums import RegistrationStatus, Role
@@ -10,10 +11,14 @@ from app.core.enums import RegistrationStatus, Role
 class AnalyticsService:
     """Service for staff analytics and reporting"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_dashboard_metrics(self) -> Dict:
+    async def _count(self, query) -> int:
+        """Run a SELECT COUNT(...) statement and return the scalar"""
+        return (await self.db.execute(query)).scalar_one()
+    
+    async def get_dashboard_metrics(self) -> Dict:
         """
         Get key metrics for staff dashboard
         
@@ -22,32 +27,27 @@ class AnalyticsService:
         today = date.today()
         
         # Total counts
-        total_activities = self.db.query(Activity).count()
-        total_registrations = (
-            self.db.query(Registration)
-            .filter(Registration.status == RegistrationStatus.CONFIRMED)
-            .count()
+        total_activities = await self._count(select(func.count(Activity.id)))
+        total_registrations = await self._count(
+            select(func.count(Registration.id))
+            .where(Registration.status == RegistrationStatus.CONFIRMED)
         )
-        total_volunteers = (
-            self.db.query(User)
-            .filter(User.role == Role.VOLUNTEER)
-            .count()
+        total_volunteers = await self._count(
+            select(func.count(User.id))
+            .where(User.role == Role.VOLUNTEER)
         )
         
         # Upcoming activities
-        upcoming_activities = (
-            self.db.query(Activity)
-            .filter(Activity.date >= today)
-            .count()
+        upcoming_activities = await self._count(
+            select(func.count(Activity.id))
+            .where(Activity.date >= today)
         )
         
         # Volunteer coverage (activities with volunteer matches / total activities)
-        activities_with_volunteers = (
-            self.db.query(Activity.id)
+        activities_with_volunteers = await self._count(
+            select(func.count(func.distinct(Activity.id)))
             .join(VolunteerMatch)
-            .filter(Activity.date >= today)
-            .distinct()
-            .count()
+            .where(Activity.date >= today)
         )
         
         volunteer_coverage = (
@@ -64,7 +64,7 @@ class AnalyticsService:
             "volunteer_coverage": round(volunteer_coverage, 1)
         }
     
-    def get_weekly_trends(self, weeks: int = 4) -> List[Dict]:
+    async def get_weekly_trends(self, weeks: int = 4) -> List[Dict]:
         """
         Get registration trends over past N weeks
         
@@ -77,15 +77,14 @@ class AnalyticsService:
             week_start = today - timedelta(days=(i + 1) * 7)
             week_end = week_start + timedelta(days=6)
             
-            count = (
-                self.db.query(Registration)
+            count = await self._count(
+                select(func.count(Registration.id))
                 .join(Activity)
-                .filter(
+                .where(
                     Activity.date >= week_start,
                     Activity.date <= week_end,
                     Registration.status == RegistrationStatus.CONFIRMED
                 )
-                .count()
             )
             
             trends.append({
@@ -96,69 +95,65 @@ class AnalyticsService:
         
         return list(reversed(trends))
     
-    def get_program_breakdown(self) -> Dict[str, int]:
+    async def get_program_breakdown(self) -> Dict[str, int]:
         """
         Get breakdown of activities by program type
         
         Returns count per program type
         """
-        results = (
-            self.db.query(
+        results = (await self.db.execute(
+            select(
                 Activity.program_type,
                 func.count(Activity.id).label('count')
             )
             .group_by(Activity.program_type)
-            .all()
-        )
+        )).all()
         
         return {
             program_type or "Uncategorized": count
             for program_type, count in results
         }
     
-    def get_activities_in_range(self, start_date: date, end_date: date) -> int:
+    async def get_activities_in_range(self, start_date: date, end_date: date) -> int:
         """
         Count activities within a date range
 
         Returns count of activities where date is between start and end (inclusive)
         """
-        return (
-            self.db.query(Activity)
-            .filter(
+        return await self._count(
+            select(func.count(Activity.id))
+            .where(
                 Activity.date >= start_date,
                 Activity.date <= end_date
             )
-            .count()
         )
 
-    def get_registrations_in_range(self, start_date: date, end_date: date) -> Dict:
+    async def get_registrations_in_range(self, start_date: date, end_date: date) -> Dict:
         """
         Get participant and volunteer counts for activities in date range
 
         Returns {"participants": int, "volunteers": int}
         """
         # Count confirmed participant registrations for activities in range
-        participants = (
-            self.db.query(Registration)
+        participants = await self._count(
+            select(func.count(Registration.id))
             .join(Activity)
-            .filter(
+            .where(
                 Activity.date >= start_date,
                 Activity.date <= end_date,
                 Registration.status == RegistrationStatus.CONFIRMED
             )
-            .count()
         )
 
         # Count confirmed volunteer matches for activities in range
-        volunteers = (
-            self.db.query(VolunteerMatch)
+        volunteers = await self._count(
+            select(func.count(VolunteerMatch.id))
             .join(Activity)
-            .filter(
+            .where(
                 Activity.date >= start_date,
                 Activity.date <= end_date,
                 VolunteerMatch.status == RegistrationStatus.CONFIRMED
             )
-            .count()
         )
 
         return {
@@ -166,57 +161,54 @@ class AnalyticsService:
             "volunteers": volunteers
         }
 
-    def get_program_breakdown_in_range(self, start_date: date, end_date: date) -> Dict[str, int]:
+    async def get_program_breakdown_in_range(self, start_date: date, end_date: date) -> Dict[str, int]:
         """
         Get breakdown of activities by program type within date range
 
         Returns count per program type for activities in range
         """
-        results = (
-            self.db.query(
+        results = (await self.db.execute(
+            select(
                 Activity.program_type,
                 func.count(Activity.id).label('count')
             )
-            .filter(
+            .where(
                 Activity.date >= start_date,
                 Activity.date <= end_date
             )
             .group_by(Activity.program_type)
-            .all()
-        )
+        )).all()
 
         return {
             program_type or "Uncategorized": count
             for program_type, count in results
         }
 
-    def get_activity_attendance(self, activity_id: str) -> Dict:
+    async def get_activity_attendance(self, activity_id: UUID) -> Dict:
         """
         Get detailed attendance for a specific activity
         
         Returns participants and volunteers
         """
         # Get participants
-        participants = (
-            self.db.query(User)
-            .join(Registration)
-            .filter(
+        participants = (await self.db.execute(
+            select(User)
+            .join(Registration, Registration.user_id == User.id)
+            .where(
                 Registration.activity_id == activity_id,
                 Registration.status == RegistrationStatus.CONFIRMED
             )
-            .all()
-        )
+        )).scalars().all()
         
         # Get volunteers
-        volunteers = (
-            self.db.query(User)
-            .join(VolunteerMatch)
-            .filter(
+        volunteers = (await self.db.execute(
+            select(User)
+            .join(VolunteerMatch, VolunteerMatch.volunteer_id == User.id)
+            .where(
                 VolunteerMatch.activity_id == activity_id,
                 VolunteerMatch.status == RegistrationStatus.CONFIRMED
             )
-            .all()
-        )
+        )).scalars().all()
         
         return {
             "participants": [
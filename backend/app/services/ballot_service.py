@@ -0,0 +1,265 @@
+"""
+Ballot (lottery) allocation for oversubscribed activities.
+
+While an activity's ballot window is open, POST /registrations only appends a
+ballot entry, so a rush at publish time costs one insert per request and
+nobody wins on network speed. When the window closes the allocator draws
+seats for all pending entries in one transaction: entrants with a time
+conflict or at their weekly membership limit are dropped, the rest are
+shuffled, the first ``free seats`` are confirmed and everyone else joins the
+waitlist in draw order. Every entrant's outcome notification is queued in the
+outbox in the same transaction.
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import BallotStatus, NotificationKind, RegistrationStatus
+from app.db.models import Activity, BallotEntry, Registration, User
+from app.services.activity_service import ActivityService
+from app.services.catalog_version import SEAT_CHANGE, get_catalog_version
+from app.services.notification_outbox import NotificationOutbox
+from app.services.registration_service import MEMBERSHIP_LIMITS
+
+
+@dataclass
+class BallotResult:
+    """Outcome of one ballot draw (user ids)"""
+    activity_id: UUID
+    winners: List[UUID] = field(default_factory=list)
+    waitlisted: List[UUID] = field(default_factory=list)
+    ineligible: List[UUID] = field(default_factory=list)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class BallotService:
+    """Ballot entries and the batch seat allocator"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def is_open(activity: Activity, now: Optional[datetime] = None) -> bool:
+        """Whether registrations for this activity are currently ballot entries"""
+        if activity.ballot_closes_at is None:
+            return False
+        return (now or datetime.now(timezone.utc)) < _as_utc(activity.ballot_closes_at)
+
+    async def enter(self, user_id: UUID, activity_id: UUID) -> BallotEntry:
+        """Record a ballot entry (idempotent: one entry per user and activity)"""
+        entry = BallotEntry(activity_id=activity_id, user_id=user_id, status=BallotStatus.PENDING)
+        self.db.add(entry)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            entry = (await self.db.execute(
+                select(BallotEntry).where(
+                    BallotEntry.activity_id == activity_id,
+                    BallotEntry.user_id == user_id
+                )
+            )).scalar_one()
+        await self.db.refresh(entry)
+        return entry
+
+    async def due_activity_ids(self, now: Optional[datetime] = None) -> List[UUID]:
+        """Activities whose ballot has closed with entries still to draw"""
+        rows = await self.db.execute(
+            select(BallotEntry.activity_id)
+            .join(Activity, Activity.id == BallotEntry.activity_id)
+            .where(
+                BallotEntry.status == BallotStatus.PENDING,
+                Activity.ballot_closes_at <= (now or datetime.now(timezone.utc))
+            )
+            .distinct()
+        )
+        return [row[0] for row in rows]
+
+    async def allocate(
+        self,
+        activity_id: UUID,
+        rng: Optional[random.Random] = None,
+        close_now: bool = False
+    ) -> Optional[BallotResult]:
+        """
+        Draw seats for every pending entry and queue the outcome
+        notifications in one transaction
+
+        The activity row is locked for the draw, so concurrent allocators
+        (one per worker) can't double-allocate. Reads are batched for all
+        entrants, so the query count doesn't grow with the number of entries.
+
+        Args:
+            rng: Random source (defaults to the OS CSPRNG)
+            close_now: Also end the ballot window (staff closing early)
+
+        Returns:
+            BallotResult, or None if the activity doesn't exist
+        """
+        rng = rng or random.SystemRandom()
+        now = datetime.now(timezone.utc)
+
+        activity = (await self.db.execute(
+            select(Activity)
+            .where(Activity.id == activity_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )).scalar_one_or_none()
+        if activity is None:
+            return None
+
+        if close_now and self.is_open(activity, now):
+            activity.ballot_closes_at = now
+
+        entries = (await self.db.execute(
+            select(BallotEntry)
+            .where(BallotEntry.activity_id == activity_id, BallotEntry.status == BallotStatus.PENDING)
+            .order_by(BallotEntry.created_at)
+        )).scalars().all()
+
+        result = BallotResult(activity_id=activity_id)
+        if not entries:
+            await self.db.commit()
+            return result
+
+        eligible, ineligible = await self._screen(activity, entries)
+        rng.shuffle(eligible)
+        seats = max(activity.max_capacity - (activity.current_participants or 0) - activity.held_seats, 0)
+        won, rest = eligible[:seats], eligible[seats:]
+
+        await self._write_registrations(activity, won, rest)
+
+        for status, group in ((BallotStatus.WON, won), (BallotStatus.LOST, rest + ineligible)):
+            if group:
+                await self.db.execute(
+                    update(BallotEntry)
+                    .where(BallotEntry.id.in_([e.id for e in group]))
+                    .values(status=status, allocated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+
+        # Dedupe keys: a draw is final, so each entrant hears about it once
+        await NotificationOutbox(self.db).enqueue_many([
+            (kind, entry.user_id, activity_id, f"ballot:{activity_id}:{entry.user_id}")
+            for kind, group in (
+                (NotificationKind.BALLOT_WON, won),
+                (NotificationKind.BALLOT_WAITLISTED, rest),
+                (NotificationKind.BALLOT_INELIGIBLE, ineligible),
+            )
+            for entry in group
+        ])
+
+        activity_service = ActivityService(self.db)
+        if won:
+            await activity_service.publish_catalog_change()
+        await self.db.commit()
+        if won:
+            get_catalog_version().bump()
+
+        result.winners = [e.user_id for e in won]
+        result.waitlisted = [e.user_id for e in rest]
+        result.ineligible = [e.user_id for e in ineligible]
+        return result
+
+    async def _screen(self, activity: Activity, entries: List[BallotEntry]):
+        """
+        Split entries into eligible / ineligible with batched reads
+
+        Applies the registration rules: not already registered, no same-day
+        time overlap, weekly membership limit not reached.
+        """
+        user_ids = [e.user_id for e in entries]
+        week_start = activity.date - timedelta(days=activity.date.weekday())
+        week_end = week_start + timedelta(days=6)
+
+        booked = (await self.db.execute(
+            select(Registration.user_id, Registration.activity_id, Activity.date, Activity.start_time, Activity.end_time)
+            .join(Activity, Activity.id == Registration.activity_id)
+            .where(
+                Registration.user_id.in_(user_ids),
+                Registration.status == RegistrationStatus.CONFIRMED,
+                Activity.date >= week_start,
+                Activity.date <= week_end
+            )
+        )).all()
+        memberships = dict((await self.db.execute(
+            select(User.id, User.membership_type).where(User.id.in_(user_ids))
+        )).all())
+
+        by_user: Dict[UUID, list] = {}
+        for row in booked:
+            by_user.setdefault(row.user_id, []).append(row)
+
+        eligible, ineligible = [], []
+        for entry in entries:
+            rows = by_user.get(entry.user_id, [])
+            limit = MEMBERSHIP_LIMITS.get(memberships.get(entry.user_id))
+            already = any(r.activity_id == activity.id for r in rows)
+            overlaps = any(
+                r.date == activity.date
+                and r.start_time < activity.end_time
+                and activity.start_time < r.end_time
+                for r in rows
+            )
+            over_limit = limit is not None and len(rows) >= limit
+            (ineligible if already or overlaps or over_limit else eligible).append(entry)
+        return eligible, ineligible
+
+    async def _write_registrations(
+        self,
+        activity: Activity,
+        won: List[BallotEntry],
+        rest: List[BallotEntry]
+    ) -> None:
+        """Confirm winners and waitlist the rest in draw order (no commit)"""
+        if not won and not rest:
+            return
+
+        # Reuse earlier (cancelled or waitlisted) rows: one registration per user and activity
+        existing = {
+            reg.user_id: reg
+            for reg in (await self.db.execute(
+                select(Registration).where(
+                    Registration.activity_id == activity.id,
+                    Registration.user_id.in_([e.user_id for e in won + rest])
+                )
+            )).scalars()
+        }
+        next_position = (await self.db.execute(
+            select(func.coalesce(func.max(Registration.waitlist_position), 0)).where(
+                Registration.activity_id == activity.id,
+                Registration.status == RegistrationStatus.WAITLIST
+            )
+        )).scalar_one() + 1
+
+        won_ids = {e.id for e in won}
+        for entry in won + rest:
+            registration = existing.get(entry.user_id)
+            if registration is None:
+                registration = Registration(user_id=entry.user_id, activity_id=activity.id)
+                self.db.add(registration)
+            if entry.id in won_ids:
+                registration.status = RegistrationStatus.CONFIRMED
+                registration.waitlist_position = None
+            elif registration.status != RegistrationStatus.WAITLIST:
+                registration.status = RegistrationStatus.WAITLIST
+                registration.waitlist_position = next_position
+                next_position += 1
+
+        if won:
+            await self.db.execute(
+                update(Activity)
+                .where(Activity.id == activity.id)
+                .values(current_participants=Activity.current_participants + len(won), **SEAT_CHANGE)
+                .execution_options(synchronize_session="fetch")
+            )
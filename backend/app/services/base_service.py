@@ -1,5 +1,6 @@
 from typing import TypeVar, Generic, Type, Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.db.base import Base
@@ -14,29 +15,30 @@ class BaseService(Generic[ModelType]):
     Inherit from this class to get standard database operations
     """
     
-    def __init__(self, model: Type[ModelType], db: Session):
+    def __init__(self, model: Type[ModelType], db: AsyncSession):
         self.model = model
         self.db = db
     
-    def get_by_id(self, id: UUID) -> Optional[ModelType]:
+    async def get_by_id(self, id: UUID) -> Optional[ModelType]:
         """Get single record by ID"""
-        return self.db.query(self.model).filter(self.model.id == id).first()
+        return await self.db.get(self.model, id)
     
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
         """Get all records with pagination"""
-        return self.db.query(self.model).offset(skip).limit(limit).all()
+        result = await self.db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
     
-    def create(self, obj_in: dict) -> ModelType:
+    async def create(self, obj_in: dict) -> ModelType:
         """Create new record"""
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
-        self.db.commit()
-        self.db.refresh(db_obj)
+        await self.db.commit()
+        await self.db.refresh(db_obj)
         return db_obj
     
-    def update(self, id: UUID, obj_in: dict) -> Optional[ModelType]:
+    async def update(self, id: UUID, obj_in: dict) -> Optional[ModelType]:
         """Update existing record"""
-        db_obj = self.get_by_id(id)
+        db_obj = await self.get_by_id(id)
         if not db_obj:
             return None
         
@@ -44,20 +46,17 @@ class BaseService(Generic[ModelType]):
             if value is not None:
                 setattr(db_obj, field, value)
         
-        self.db.commit()
-        self.db.refresh(db_obj)
+        await self.db.commit()
+        await self.db.refresh(db_obj)
         return db_obj
     
-    def delete(self, id: UUID) -> bool:
-        """Delete record"""
-        db_obj = self.get_by_id(id)
-        if not db_obj:
-            return False
-        
-        self.db.delete(db_obj)
-        self.db.commit()
-        return True
+    async def delete(self, id: UUID) -> bool:
+        """Delete record (dependent rows are removed by ON DELETE CASCADE)"""
+        result = await self.db.execute(delete(self.model).where(self.model.id == id))
+        await self.db.commit()
+        return result.rowcount > 0
     
-    def count(self) -> int:
+    async def count(self) -> int:
         """Get total count of records"""
-        return self.db.query(self.model).count()
+        result = await self.db.execute(select(func.count()).select_from(self.model))
+        return result.scalar_one()
@@ -0,0 +1,183 @@
+"""
+Bulk notification sends as background jobs.
+
+``create_job`` runs in the request: recipients are loaded with one query and
+their notifications bulk-inserted as pending, tagged with the job. ``run``
+then sends them with bounded concurrency, updating statuses and the job's
+progress counters with one UPDATE per status per chunk.
+
+Each progress commit also records a heartbeat. ``claim_stale`` picks up jobs
+whose heartbeat stopped (the worker running them died) so they can be
+resumed: only notifications still pending are sent again, so at most the
+chunk in flight at the crash is repeated.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Notification, NotificationJob, User
+from app.services.notification_service import NotificationService
+from app.services.notification_writer import NotificationWriter
+
+logger = logging.getLogger(__name__)
+
+
+class BulkNotificationService:
+    """Create and run bulk notification jobs"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_job(
+        self,
+        user_ids: List[UUID],
+        message: str,
+        channel: str = 'sms',
+        created_by: Optional[UUID] = None
+    ) -> NotificationJob:
+        """
+        Record a bulk send and its pending notifications (commits)
+
+        Unknown users and users without a phone for the channel are counted
+        as failed straight away; nothing is sent here. A job with nobody to
+        send to is created already completed.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        recipients = (await self.db.execute(
+            select(User.id, User.phone, User.caregiver_phone).where(User.id.in_(user_ids))
+        )).all() if user_ids else []
+        reachable = [r.id for r in recipients if _phone_for(channel, r.phone, r.caregiver_phone)]
+
+        job = NotificationJob(
+            created_by=created_by,
+            message=message,
+            channel=channel,
+            status='queued' if reachable else 'completed',
+            total=len(user_ids),
+            successful=0,
+            failed=len(user_ids) - len(reachable),
+            completed_at=None if reachable else datetime.now(timezone.utc)
+        )
+        self.db.add(job)
+        await self.db.flush()
+
+        writer = NotificationWriter(self.db)
+        for user_id in reachable:
+            writer.add(user_id, message, channel, job_id=job.id)
+        await writer.flush()
+        await self.db.commit()
+        return job
+
+    async def run(self, job_id: UUID) -> NotificationJob:
+        """Send a job's pending notifications, committing progress per chunk"""
+        job = await self.db.get(NotificationJob, job_id)
+        if job.status in ('completed', 'failed'):
+            return job
+        now = datetime.now(timezone.utc)
+        job.status = 'running'
+        job.attempts = (job.attempts or 0) + 1
+        job.started_at = job.started_at or now
+        job.heartbeat_at = now
+        await self.db.commit()
+
+        pending = (await self.db.execute(
+            select(Notification.id, User.phone, User.caregiver_phone)
+            .join(User, User.id == Notification.user_id)
+            .where(Notification.job_id == job_id, Notification.status == 'pending')
+        )).all()
+
+        service = NotificationService(self.db)
+        semaphore = asyncio.Semaphore(settings.NOTIFICATION_BULK_CONCURRENCY)
+
+        async def send(row) -> Optional[str]:
+            phone = _phone_for(job.channel, row.phone, row.caregiver_phone)
+            if not phone:
+                return None
+            async with semaphore:
+                try:
+                    return await service.send_composed(job.channel, phone, job.message)
+                except Exception as e:
+                    logger.warning(f"Bulk notification {row.id} failed: {e}")
+                    return None
+
+        writer = NotificationWriter(self.db)
+        chunk_size = settings.NOTIFICATION_BULK_CHUNK_SIZE
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            sids = await asyncio.gather(*(send(row) for row in chunk))
+            for row, sid in zip(chunk, sids):
+                writer.mark(row.id, 'sent' if sid else 'failed')
+            await writer.flush()
+
+            sent = sum(1 for sid in sids if sid)
+            job.successful += sent
+            job.failed += len(chunk) - sent
+            job.heartbeat_at = datetime.now(timezone.utc)
+            await self.db.commit()
+
+        job.status = 'completed'
+        job.completed_at = datetime.now(timezone.utc)
+        await self.db.commit()
+        logger.info(f"Bulk notification job {job_id}: {job.successful}/{job.total} sent ({job.failed} failed)")
+        return job
+
+    async def claim_stale(self, now: Optional[datetime] = None) -> List[UUID]:
+        """
+        Take over jobs whose runner stopped making progress (commits)
+
+        A queued or running job is stale once its heartbeat (or creation,
+        if it never started) is older than NOTIFICATION_JOB_STALE_SECONDS.
+        Stale jobs that already had NOTIFICATION_JOB_MAX_ATTEMPTS runs are
+        failed along with their pending notifications; the rest get a fresh
+        heartbeat, so other workers' reapers skip them, and are returned
+        for the caller to resume.
+
+        Returns:
+            Ids of the claimed jobs
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=settings.NOTIFICATION_JOB_STALE_SECONDS)
+        stale = (
+            NotificationJob.status.in_(('queued', 'running')),
+            func.coalesce(NotificationJob.heartbeat_at, NotificationJob.created_at) < cutoff
+        )
+
+        exhausted = (await self.db.execute(
+            update(NotificationJob)
+            .where(*stale, NotificationJob.attempts >= settings.NOTIFICATION_JOB_MAX_ATTEMPTS)
+            .values(status='failed', failed=NotificationJob.total - NotificationJob.successful, completed_at=now)
+            .returning(NotificationJob.id)
+            .execution_options(synchronize_session=False)
+        )).scalars().all()
+        if exhausted:
+            await self.db.execute(
+                update(Notification)
+                .where(Notification.job_id.in_(exhausted), Notification.status == 'pending')
+                .values(status='failed')
+                .execution_options(synchronize_session=False)
+            )
+            logger.warning(f"Gave up on {len(exhausted)} stale bulk notification jobs: {exhausted}")
+
+        claimed = (await self.db.execute(
+            update(NotificationJob)
+            .where(*stale)
+            .values(heartbeat_at=now)
+            .returning(NotificationJob.id)
+            .execution_options(synchronize_session=False)
+        )).scalars().all()
+        await self.db.commit()
+        return list(claimed)
+
+
+def _phone_for(channel: str, phone: Optional[str], caregiver_phone: Optional[str]) -> Optional[str]:
+    """Same choice as NotificationService.send_notification: WhatsApp prefers the caregiver"""
+    if channel == 'whatsapp' and caregiver_phone:
+        return caregiver_phone
+    return phone
@@ -0,0 +1,94 @@
+"""
+Activity catalog version for conditional GETs.
+
+The version is a fingerprint of the activities table, so every worker
+derives the same value without coordination. It has two parts: content (row
+count, latest created_at/updated_at) and seats (latest seats_updated_at,
+total participants and holds). Seat-count UPDATEs pass ``SEAT_CHANGE`` so
+they move only the seats part; the catalog cache then patches counts
+instead of rebuilding its snapshot.
+
+It is cached in-process for a short TTL; writes in this worker call
+``bump()`` so the next read recomputes it immediately.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Activity
+
+# Extra values for UPDATEs that only move current_participants / held_seats
+SEAT_CHANGE = {"seats_updated_at": func.now(), "updated_at": Activity.updated_at}
+
+
+class CatalogVersion:
+    """Cached catalog fingerprint used to build ETags"""
+
+    def __init__(self, ttl_seconds: float = 5.0):
+        self.ttl_seconds = ttl_seconds
+        self._version: Optional[str] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> str:
+        """Current catalog version (one aggregate query per TTL at most)"""
+        if self._version is not None and time.monotonic() < self._expires_at:
+            return self._version
+
+        async with self._lock:
+            # Another request may have refreshed while we waited
+            if self._version is not None and time.monotonic() < self._expires_at:
+                return self._version
+
+            generation = self._generation
+            row = (await db.execute(
+                select(
+                    func.count(Activity.id),
+                    func.max(func.coalesce(Activity.updated_at, Activity.created_at)),
+                    func.max(Activity.seats_updated_at),
+                    func.coalesce(func.sum(Activity.current_participants + Activity.held_seats), 0)
+                )
+            )).one()
+            version = f"{row[0]}:{row[1] or '-'}|{row[2] or '-'}:{row[3]}"
+
+            # A bump() during the query means the result may predate the write
+            if generation == self._generation:
+                self._version = version
+                self._expires_at = time.monotonic() + self.ttl_seconds
+            return version
+
+    def bump(self) -> None:
+        """Invalidate after an activity write or participant-count change"""
+        self._generation += 1
+        self._version = None
+        self._expires_at = 0.0
+
+    @staticmethod
+    def content_part(version: str) -> str:
+        """The version without its seats part (changes only on activity edits)"""
+        return version.split("|", 1)[0]
+
+    @staticmethod
+    def etag(version: str, *parts: Any) -> str:
+        """Strong ETag for a response derived from the version and request parts"""
+        digest = hashlib.sha256("|".join([version, *map(str, parts)]).encode("utf-8")).hexdigest()
+        return f'"{digest[:32]}"'
+
+
+# Singleton instance for reuse
+_catalog_version_instance: Optional[CatalogVersion] = None
+
+
+def get_catalog_version() -> CatalogVersion:
+    """Get or create the catalog version singleton."""
+    global _catalog_version_instance
+    if _catalog_version_instance is None:
+        _catalog_version_instance = CatalogVersion(ttl_seconds=settings.CATALOG_VERSION_TTL_SECONDS)
+    return _catalog_version_instance
@@ -0,0 +1,301 @@
+"""
+Transactional outbox for notifications.
+
+Registration and match changes add an outbox row in the same transaction
+instead of calling Twilio after commit, so API latency no longer includes
+SMS delivery and a notification can't be lost (or sent for a rolled-back
+change). The dispatcher drains due rows in batches:
+
+- rows are claimed with a lease (FOR UPDATE SKIP LOCKED, then committed),
+  so several workers can dispatch without sending anything twice;
+- repeats of the same notification for a user and activity in a batch are
+  sent once (only consecutive repeats: a later state change is kept);
+- new rows wait NOTIFICATION_DIGEST_WINDOW_SECONDS, and when the first one
+  for a user falls due the rest of that user's burst is claimed with it;
+  messages to the same number are then merged into one digest, so a
+  caregiver signing someone up for five activities gets one WhatsApp;
+- users and activities for the batch are loaded with two IN queries, and
+  the transaction is committed before sending: no connection sits idle in
+  transaction while Twilio answers, and outcomes are written in a second
+  short transaction;
+- sends are capped at SEND_BUDGET_SECONDS, well inside the claim lease, so
+  the lease can't lapse (and another worker re-send) mid-batch;
+- every message sent is recorded in ``notifications``, in one batched INSERT;
+- failures are retried with exponential backoff, skipping channels that
+  already went out, until NOTIFICATION_OUTBOX_MAX_ATTEMPTS.
+"""
+
+import asyncio
+import logging
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import NotificationKind
+from app.db.models import Activity, OutboxMessage, User
+from app.services.notification_service import NotificationService
+from app.services.notification_templates import get_notification_templates
+from app.services.notification_writer import NotificationWriter
+
+logger = logging.getLogger(__name__)
+
+# Claimed rows become due again after this long if their worker dies mid-send
+CLAIM_LEASE_SECONDS = 120
+
+# Sends not done by then are abandoned and retried, leaving time to record outcomes within the lease
+SEND_BUDGET_SECONDS = 90
+
+
+class NotificationOutbox:
+    """Enqueue notifications transactionally and dispatch them in batches"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(
+        self,
+        kind: NotificationKind,
+        user_id: UUID,
+        activity_id: Optional[UUID] = None,
+        dedupe_key: Optional[str] = None
+    ) -> None:
+        """
+        Add a notification to the caller's transaction (no commit)
+
+        With a dedupe_key the row is only inserted if no row with that key
+        exists (ON CONFLICT DO NOTHING, so the caller's transaction survives).
+        """
+        await self.enqueue_many([(kind, user_id, activity_id, dedupe_key)])
+
+    async def enqueue_many(
+        self,
+        messages: List[Tuple[NotificationKind, UUID, Optional[UUID], Optional[str]]]
+    ) -> None:
+        """
+        Add several notifications as (kind, user_id, activity_id, dedupe_key) (no commit)
+
+        New rows are due after NOTIFICATION_DIGEST_WINDOW_SECONDS, so a burst
+        for one recipient can be sent as a single digest.
+        """
+        due_at = datetime.now(timezone.utc) + timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW_SECONDS)
+        keyed = []
+        for kind, user_id, activity_id, dedupe_key in messages:
+            # Client-side created_at orders state changes made in separate transactions
+            row = dict(
+                kind=kind.value,
+                user_id=user_id,
+                activity_id=activity_id,
+                next_attempt_at=due_at,
+                created_at=datetime.now(timezone.utc)
+            )
+            if dedupe_key is None:
+                self.db.add(OutboxMessage(**row))
+            else:
+                keyed.append({**row, "dedupe_key": dedupe_key})
+
+        if keyed:
+            insert = pg_insert if self.db.bind.dialect.name == "postgresql" else sqlite_insert
+            await self.db.execute(
+                insert(OutboxMessage).on_conflict_do_nothing(index_elements=["dedupe_key"]),
+                keyed
+            )
+
+    async def dispatch_batch(self, batch_size: Optional[int] = None) -> int:
+        """
+        Send up to ``batch_size`` due notifications
+
+        Returns:
+            Number of outbox rows processed
+        """
+        batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+        now = datetime.now(timezone.utc)
+
+        # Due rows, plus fresh rows for the same users still inside their
+        # digest window: the first message's deadline flushes the whole burst
+        due_users = select(OutboxMessage.user_id).where(
+            OutboxMessage.status == 'pending', OutboxMessage.next_attempt_at <= now
+        )
+        claimed = (await self.db.execute(
+            select(OutboxMessage)
+            .where(
+                OutboxMessage.status == 'pending',
+                or_(
+                    OutboxMessage.next_attempt_at <= now,
+                    and_(OutboxMessage.attempts == 0, OutboxMessage.user_id.in_(due_users))
+                )
+            )
+            .order_by(OutboxMessage.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+        if not claimed:
+            await self.db.commit()
+            return 0
+
+        await self.db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_([m.id for m in claimed]))
+            .values(
+                attempts=OutboxMessage.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS)
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        await self.db.commit()
+
+        users = await self._load(User, {m.user_id for m in claimed})
+        activities = await self._load(Activity, {m.activity_id for m in claimed if m.activity_id})
+
+        # In enqueue order, a row repeating the previous kind for the same
+        # (user, activity) is a duplicate; confirm -> cancel -> confirm keeps all three
+        primary: List[OutboxMessage] = []
+        last_kind: Dict[Tuple[UUID, Optional[UUID]], str] = {}
+        for message in sorted(claimed, key=lambda m: m.created_at or m.next_attempt_at):
+            key = (message.user_id, message.activity_id)
+            if last_kind.get(key) == message.kind:
+                message.status = 'duplicate'
+                message.processed_at = now
+            else:
+                primary.append(message)
+                last_kind[key] = message.kind
+
+        # Everything headed to the same number goes out as one digest
+        service = NotificationService(self.db)
+        digests: Dict[Tuple[str, str], List[Tuple[OutboxMessage, str]]] = defaultdict(list)
+        for message in primary:
+            for channel, phone, text in self._compose(service, message, users, activities):
+                digests[(channel, phone)].append((message, text))
+
+        # Release the connection for the sends (loaded rows stay usable: expire_on_commit=False)
+        await self.db.commit()
+
+        semaphore = asyncio.Semaphore(settings.NOTIFICATION_OUTBOX_CONCURRENCY)
+        writer = NotificationWriter(self.db)
+        deadline = asyncio.get_running_loop().time() + SEND_BUDGET_SECONDS
+        outcomes = await asyncio.gather(*(
+            self._send(
+                service, writer, semaphore, deadline, channel, phone, entries,
+                users[entries[0][0].user_id].preferred_language
+            )
+            for (channel, phone), entries in digests.items()
+        ))
+
+        errors: Dict[UUID, List[str]] = defaultdict(list)
+        delivered: Dict[UUID, set] = {}
+        for ((channel, _phone), entries), error in zip(digests.items(), outcomes):
+            for message, _text in entries:
+                channels = delivered.setdefault(message.id, set(filter(None, message.delivered_channels.split(","))))
+                if error:
+                    errors[message.id].append(f"{channel}: {error}")
+                else:
+                    channels.add(channel)
+
+        for message in primary:
+            if message.id in delivered:
+                self._record_outcome(message, delivered[message.id], errors.get(message.id))
+
+        # Second, short transaction: notification rows and outbox outcomes
+        await writer.flush()
+        await self.db.commit()
+        return len(claimed)
+
+    async def _load(self, model, ids) -> dict:
+        if not ids:
+            return {}
+        rows = (await self.db.execute(select(model).where(model.id.in_(list(ids))))).scalars().all()
+        return {row.id: row for row in rows}
+
+    def _compose(
+        self,
+        service: NotificationService,
+        message: OutboxMessage,
+        users: dict,
+        activities: dict
+    ) -> List[Tuple[str, str, str]]:
+        """Messages still to send for an outbox row; finishes rows with nothing to send"""
+        now = datetime.now(timezone.utc)
+        user, activity = users.get(message.user_id), activities.get(message.activity_id)
+        if user is None or activity is None:
+            message.status = 'failed'
+            message.last_error = "User or activity no longer exists"
+            message.processed_at = now
+            return []
+
+        delivered = set(filter(None, message.delivered_channels.split(",")))
+        try:
+            pending = [m for m in service.compose(NotificationKind(message.kind), user, activity) if m[0] not in delivered]
+        except ValueError as e:
+            message.status = 'failed'
+            message.last_error = str(e)
+            message.processed_at = now
+            return []
+        if not pending:
+            message.status = 'sent' if delivered else 'skipped'  # Skipped: no phone numbers on file
+            message.processed_at = now
+        return pending
+
+    async def _send(
+        self,
+        service: NotificationService,
+        writer: NotificationWriter,
+        semaphore: asyncio.Semaphore,
+        deadline: float,
+        channel: str,
+        phone: str,
+        entries: List[Tuple[OutboxMessage, str]],
+        language: Optional[str]
+    ) -> Optional[str]:
+        """Send one message (or a digest of several) to a number; returns an error or None"""
+        text = digest([t for _, t in entries], language)
+        async with semaphore:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return "send budget exhausted"  # Not attempted; nothing to record
+            try:
+                sid = await asyncio.wait_for(service.send_composed(channel, phone, text), remaining)
+                error = None if sid else "send failed"
+            except asyncio.TimeoutError:
+                sid, error = None, "send budget exhausted"
+            except Exception as e:
+                sid, error = None, str(e)
+
+        for user_id in dict.fromkeys(message.user_id for message, _ in entries):
+            writer.add(user_id, text, channel, status='sent' if sid else 'failed')
+        return error
+
+    def _record_outcome(self, message: OutboxMessage, delivered: set, errors: Optional[List[str]]) -> None:
+        message.delivered_channels = ",".join(sorted(delivered))
+        if not errors:
+            message.status = 'sent'
+            message.processed_at = datetime.now(timezone.utc)
+            message.last_error = None
+        elif message.attempts >= settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS:
+            message.status = 'failed'
+            message.last_error = "; ".join(errors)
+            message.processed_at = datetime.now(timezone.utc)
+            logger.warning(f"Giving up on notification {message.id} after {message.attempts} attempts: {message.last_error}")
+        else:
+            message.last_error = "; ".join(errors)
+            message.next_attempt_at = datetime.now(timezone.utc) + self.backoff(message.attempts)
+
+    @staticmethod
+    def backoff(attempts: int) -> timedelta:
+        """Exponential backoff with full jitter for the next retry"""
+        ceiling = settings.NOTIFICATION_OUTBOX_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+        return timedelta(seconds=random.uniform(ceiling / 2, ceiling))
+
+
+def digest(texts: List[str], language: Optional[str] = None) -> str:
+    """Merge several messages for one recipient into a single message"""
+    if len(texts) == 1:
+        return texts[0]
+    numbered = "\n\n".join(f"{i}) {text}" for i, text in enumerate(texts, 1))
+    return get_notification_templates().render("digest", language, count=len(texts), messages=numbered)
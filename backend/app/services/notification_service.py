@@ -1,29 +1,33 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime
 import logging
 
+from app.core.enums import NotificationKind
 from app.db.models import User, Activity, Notification
-from app.services.twilio_client import get_twilio_client
+from app.integrations.messaging import get_messaging_transport
+from app.services.notification_templates import activity_fields, get_notification_templates
+from app.services.notification_writer import NotificationWriter
 
 logger = logging.getLogger(__name__)
 
 
 class NotificationService:
     """
-    Service for orchestrating notifications via Twilio
+    Service for orchestrating SMS and WhatsApp notifications
 
-    Handles SMS and WhatsApp notifications for:
-    - Registration confirmations
-    - Volunteer match confirmations
-    - Activity reminders
-    - Caregiver notifications
+    Sends ad-hoc staff messages and composes the templated ones
+    (registration and match confirmations, waitlist promotions, reminders,
+    ballot results, caregiver copies). Templated notifications are only
+    delivered through the outbox (NotificationOutbox.enqueue), which adds
+    dedupe, digests and retries.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.twilio = get_twilio_client()
+        self.messaging = get_messaging_transport()
 
     async def send_notification(
         self,
@@ -45,7 +49,7 @@ class NotificationService:
         Raises:
             ValueError: If user not found or has no phone number
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = await self.db.get(User, user_id)
 
         if not user:
             raise ValueError(f"User not found: {user_id}")
@@ -57,160 +61,73 @@ class NotificationService:
         if not phone:
             raise ValueError(f"User {user_id} has no phone number for {channel}")
 
-        # Create notification record
-        notification = Notification(
-            user_id=user_id,
-            message=message,
-            channel=channel,
-            status='pending'
-        )
-        self.db.add(notification)
-
-        # Send via Twilio
-        if channel == 'whatsapp':
-            sid = self.twilio.send_whatsapp(phone, message)
-        else:
-            sid = self.twilio.send_sms(phone, message)
-
-        # Update status
-        if sid:
-            notification.status = 'sent'
-            notification.sent_at = datetime.utcnow()
-        else:
-            notification.status = 'failed'
+        sid = await self.send_composed(channel, phone, message)
 
-        self.db.commit()
-        self.db.refresh(notification)
+        # One INSERT with the final status; id and created_at are set client-side
+        writer = NotificationWriter(self.db)
+        notification = writer.add(user_id, message, channel, status='sent' if sid else 'failed')
+        await writer.flush()
+        await self.db.commit()
 
         logger.info(f"Notification {notification.id} {notification.status} to {user_id} via {channel}")
         return notification
 
-    def get_user_notifications(self, user_id: UUID) -> List[Notification]:
+    async def get_user_notifications(
+        self,
+        user_id: UUID,
+        limit: int = 50,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> Tuple[List[Notification], bool]:
         """
-        Get all notifications for a user.
+        Get one page of a user's notifications.
 
         Args:
             user_id: Target user UUID
+            limit: Maximum number of records to return
+            after: (created_at, id) of the last row on the previous page
 
         Returns:
-            List of Notification records ordered by created_at desc
+            Tuple of (Notification records ordered by created_at desc, has_more)
         """
-        return (
-            self.db.query(Notification)
-            .filter(Notification.user_id == user_id)
-            .order_by(Notification.created_at.desc())
-            .all()
-        )
-
-    async def send_registration_confirmation(
-        self,
-        user_id: UUID,
-        activity_id: UUID
-    ) -> None:
-        """
-        Send registration confirmation to participant
-
-        Also notifies caregiver via WhatsApp if phone number provided
-        """
-        user = self.db.query(User).filter(User.id == user_id).first()
-        activity = self.db.query(Activity).filter(Activity.id == activity_id).first()
-
-        if not user or not activity:
-            logger.warning(f"Cannot send confirmation: user={user_id}, activity={activity_id}")
-            return
-
-        # Format message
-        message = (
-            f"Registration Confirmed!\n\n"
-            f"Activity: {activity.title}\n"
-            f"Date: {activity.date}\n"
-            f"Time: {activity.start_time} - {activity.end_time}\n"
-            f"Location: {activity.location}"
-        )
-
-        # Send SMS to participant
-        if user.phone:
-            self.twilio.send_sms(user.phone, message)
-
-        # Send WhatsApp to caregiver
-        if user.caregiver_phone:
-            caregiver_message = f"MINDS Update: {user.full_name or 'Participant'} registered for activity.\n\n{message}"
-            self.twilio.send_whatsapp(user.caregiver_phone, caregiver_message)
-
-    async def send_volunteer_match_confirmation(
-        self,
-        volunteer_id: UUID,
-        activity_id: UUID
-    ) -> None:
-        """Send match confirmation to volunteer"""
-        volunteer = self.db.query(User).filter(User.id == volunteer_id).first()
-        activity = self.db.query(Activity).filter(Activity.id == activity_id).first()
-
-        if not volunteer or not activity:
-            logger.warning(f"Cannot send match confirmation: volunteer={volunteer_id}, activity={activity_id}")
-            return
-
-        message = (
-            f"You're Matched!\n\n"
-            f"Activity: {activity.title}\n"
-            f"Date: {activity.date}\n"
-            f"Time: {activity.start_time} - {activity.end_time}\n"
-            f"Location: {activity.location}\n\n"
-            f"Thank you for volunteering!"
+        query = select(Notification).where(Notification.user_id == user_id)
+        if after:
+            query = query.where(tuple_(Notification.created_at, Notification.id) < tuple_(*after))
+        result = await self.db.execute(
+            query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1)
         )
+        notifications = list(result.scalars().all())
+        return notifications[:limit], len(notifications) > limit
 
-        if volunteer.phone:
-            self.twilio.send_sms(volunteer.phone, message)
-
-    async def send_activity_reminder(
-        self,
-        user_id: UUID,
-        activity_id: UUID,
-        hours_before: int = 24
-    ) -> None:
+    def compose(self, kind: NotificationKind, user: User, activity: Activity) -> List[Tuple[str, str, str]]:
         """
-        Send activity reminder
+        Build the messages for one notification
 
-        Typically sent 24 hours before activity
+        Returns:
+            (channel, phone, message) for the user and, where the kind
+            includes them, their caregiver via WhatsApp, in the user's
+            preferred language
         """
-        user = self.db.query(User).filter(User.id == user_id).first()
-        activity = self.db.query(Activity).filter(Activity.id == activity_id).first()
-
-        if not user or not activity:
-            logger.warning(f"Cannot send reminder: user={user_id}, activity={activity_id}")
-            return
-
-        message = (
-            f"Reminder: Activity Tomorrow!\n\n"
-            f"{activity.title}\n"
-            f"Date: {activity.date}\n"
-            f"Time: {activity.start_time}\n"
-            f"Location: {activity.location}\n\n"
-            f"See you there!"
-        )
+        templates = get_notification_templates()
+        if not templates.has(kind.value):
+            raise ValueError(f"Unknown notification kind: {kind}")
 
-        if user.phone:
-            self.twilio.send_sms(user.phone, message)
-
-    async def send_cancellation_notification(
-        self,
-        user_id: UUID,
-        activity_id: UUID
-    ) -> None:
-        """Send notification when registration is cancelled"""
-        user = self.db.query(User).filter(User.id == user_id).first()
-        activity = self.db.query(Activity).filter(Activity.id == activity_id).first()
-
-        if not user or not activity:
-            logger.warning(f"Cannot send cancellation: user={user_id}, activity={activity_id}")
-            return
-
-        message = (
-            f"Cancellation Confirmed\n\n"
-            f"Activity: {activity.title}\n"
-            f"Date: {activity.date}\n\n"
-            f"You have been removed from this activity."
-        )
+        language = user.preferred_language
+        message = templates.render(kind.value, language, **activity_fields(activity, language))
 
+        messages = []
         if user.phone:
-            self.twilio.send_sms(user.phone, message)
+            messages.append(('sms', user.phone, message))
+        caregiver = f"{kind.value}.caregiver"
+        if user.caregiver_phone and templates.has(caregiver):
+            messages.append((
+                'whatsapp',
+                user.caregiver_phone,
+                templates.render(caregiver, language, participant=user.full_name or 'Participant', message=message)
+            ))
+        return messages
+
+    async def send_composed(self, channel: str, phone: str, message: str) -> Optional[str]:
+        """Send one composed message; returns the SID or None"""
+        if channel == 'whatsapp':
+            return await self.messaging.send_whatsapp(phone, message)
+        return await self.messaging.send_sms(phone, message)
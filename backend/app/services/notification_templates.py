@@ -0,0 +1,201 @@
+"""
+Localized notification templates.
+
+Templates are written once in English and compiled for every supported
+language: the fixed text between ``{fields}`` is translated (at most one API
+call per distinct phrase and language, cached for the life of the process)
+and the result stored as literal/field parts. Rendering only joins strings,
+so sending 1,000 reminders in Tamil costs no translation calls. Activity
+titles come from the pre-translated ``title_zh/ms/ta`` columns.
+
+Without translation credentials (mock mode) the other languages fall back
+to the English text, still with localized titles. A language whose
+translation failed is compiled in English and retried later by
+``retry_failed`` (called from the outbox dispatcher).
+"""
+
+import logging
+import time
+from string import Formatter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.enums import Language, NotificationKind
+from app.integrations.google_translate import get_google_translate_client
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = tuple(language.value for language in Language)
+
+# Minimum wait before recompiling a language whose translation failed
+RETRY_FAILED_SECONDS = 300.0
+
+_DETAILS = (
+    "Activity: {title}\n"
+    "Date: {date}\n"
+    "Time: {start_time} - {end_time}\n"
+    "Location: {location}"
+)
+
+_BALLOT_DETAILS = (
+    "Activity: {title}\n"
+    "Date: {date}\n"
+    "Time: {start_time} - {end_time}"
+)
+
+TEMPLATES: Dict[str, str] = {
+    NotificationKind.REGISTRATION_CONFIRMATION.value: "Registration Confirmed!\n\n" + _DETAILS,
+    NotificationKind.WAITLIST_PROMOTION.value: "A spot opened up - you're in!\n\n" + _DETAILS,
+    NotificationKind.MATCH_CONFIRMATION.value: "You're Matched!\n\n" + _DETAILS + "\n\nThank you for volunteering!",
+    # Sent REMINDER_LEAD_HOURS ahead, so no "tomorrow": the date and time say when
+    NotificationKind.ACTIVITY_REMINDER.value: (
+        "Reminder: Upcoming Activity\n\n"
+        "{title}\n"
+        "Date: {date}\n"
+        "Time: {start_time}\n"
+        "Location: {location}\n\n"
+        "See you there!"
+    ),
+    NotificationKind.CANCELLATION.value: (
+        "Cancellation Confirmed\n\n"
+        "Activity: {title}\n"
+        "Date: {date}\n\n"
+        "You have been removed from this activity."
+    ),
+    NotificationKind.BALLOT_WON.value: "Ballot result: you got a spot!\n\n" + _BALLOT_DETAILS,
+    NotificationKind.BALLOT_WAITLISTED.value: (
+        "Ballot result: you're on the waitlist. We'll message you if a spot opens.\n\n" + _BALLOT_DETAILS
+    ),
+    NotificationKind.BALLOT_INELIGIBLE.value: (
+        "Ballot result: we couldn't include your entry (time clash or weekly limit reached).\n\n" + _BALLOT_DETAILS
+    ),
+    # Caregiver copies via WhatsApp; {message} is the participant's message
+    f"{NotificationKind.REGISTRATION_CONFIRMATION.value}.caregiver":
+        "MINDS Update: {participant} registered for activity.\n\n{message}",
+    f"{NotificationKind.WAITLIST_PROMOTION.value}.caregiver":
+        "MINDS Update: {participant} got a spot from the waitlist.\n\n{message}",
+    f"{NotificationKind.BALLOT_WON.value}.caregiver":
+        "MINDS Update: {participant} got a spot in the ballot.\n\n{message}",
+    "digest": "MINDS: {count} updates\n\n{messages}",
+}
+
+
+class CompiledTemplate:
+    """Template text pre-split into (literal, field) parts"""
+
+    def __init__(self, parts: List[Tuple[str, Optional[str]]]):
+        self.parts = parts
+
+    def render(self, values: Dict[str, Any]) -> str:
+        return "".join(
+            literal if field is None else literal + str(values[field])
+            for literal, field in self.parts
+        )
+
+
+class TemplateTranslator:
+    """Translates template phrases from English, caching every result"""
+
+    def __init__(self, client=None):
+        self._client = client
+        self._cache: Dict[Tuple[str, str], str] = {}
+        self.api_calls = 0
+        self.failed: Set[str] = set()  # Languages with a phrase left in English
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_google_translate_client()
+        return self._client
+
+    def translate(self, text: str, language: str) -> str:
+        """Translate one phrase, keeping its surrounding whitespace"""
+        phrase = text.strip()
+        if language == Language.ENGLISH.value or not phrase or self.client.is_mock_mode:
+            return text
+
+        key = (phrase, language)
+        if key not in self._cache:
+            self.api_calls += 1
+            translated = self.client.translate(phrase, "en", language)
+            if translated.startswith(f"[{language.upper()}] "):
+                # The client's error fallback; use English until retry_failed recompiles
+                self.failed.add(language)
+                return text
+            self._cache[key] = translated
+
+        leading = text[:len(text) - len(text.lstrip())]
+        trailing = text[len(text.rstrip()):]
+        return f"{leading}{self._cache[key]}{trailing}"
+
+
+class NotificationTemplates:
+    """Every template compiled for every language"""
+
+    def __init__(self, translator: Optional[TemplateTranslator] = None):
+        self.translator = translator or TemplateTranslator()
+        self._compiled: Dict[Tuple[str, str], CompiledTemplate] = {}
+        self._retry_at = 0.0
+        self.compile()
+
+    def compile(self, languages: Tuple[str, ...] = LANGUAGES) -> None:
+        """(Re)build templates for these languages; phrases already translated are not sent again"""
+        compiled = dict(self._compiled)
+        for language in languages:
+            self.translator.failed.discard(language)
+            for name, text in TEMPLATES.items():
+                compiled[(name, language)] = CompiledTemplate([
+                    (self.translator.translate(literal, language) if literal else "", field)
+                    for literal, field, _spec, _conversion in Formatter().parse(text)
+                ])
+        self._compiled = compiled
+        self._retry_at = time.monotonic() + RETRY_FAILED_SECONDS
+        if self.translator.failed:
+            logger.warning(f"Notification templates left in English for: {sorted(self.translator.failed)}")
+        logger.info(f"Compiled notification templates for {len(languages)} languages")
+
+    def retry_failed(self) -> bool:
+        """
+        Recompile languages whose translation failed (blocking; at most once
+        per RETRY_FAILED_SECONDS)
+
+        Returns:
+            True if a recompile was attempted
+        """
+        if not self.translator.failed or time.monotonic() < self._retry_at:
+            return False
+        self.compile(tuple(sorted(self.translator.failed)))
+        return True
+
+    def render(self, name: str, language: Optional[str], **values: Any) -> str:
+        """Render a template in the given language (English if unsupported)"""
+        if language not in LANGUAGES:
+            language = Language.ENGLISH.value
+        return self._compiled[(name, language)].render(values)
+
+    def has(self, name: str) -> bool:
+        return (name, Language.ENGLISH.value) in self._compiled
+
+
+def activity_fields(activity: Any, language: Optional[str]) -> Dict[str, Any]:
+    """Template fields for an activity, with its pre-translated title"""
+    title = activity.title
+    if language in LANGUAGES and language != Language.ENGLISH.value:
+        title = getattr(activity, f"title_{language}", None) or activity.title
+    return {
+        "title": title,
+        "date": activity.date,
+        "start_time": activity.start_time,
+        "end_time": activity.end_time,
+        "location": activity.location,
+    }
+
+
+_notification_templates_instance: Optional[NotificationTemplates] = None
+
+
+def get_notification_templates() -> NotificationTemplates:
+    """Get the compiled template set (compiled on first use / at startup)"""
+    global _notification_templates_instance
+    if _notification_templates_instance is None:
+        _notification_templates_instance = NotificationTemplates()
+    return _notification_templates_instance
@@ -0,0 +1,76 @@
+"""
+Batched writes of Notification history rows.
+
+Senders append rows and status changes to a ``NotificationWriter`` as they
+go; ``flush`` writes everything buffered with one executemany INSERT and
+one UPDATE per status, inside the caller's transaction. Ids and created_at
+are assigned here, so callers never need a refresh to read them back.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Notification
+
+
+class NotificationWriter:
+    """Append buffer for Notification inserts and status updates"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._rows: List[dict] = []
+        self._statuses: Dict[str, List[UUID]] = {}
+
+    def add(
+        self,
+        user_id: UUID,
+        message: str,
+        channel: str,
+        status: str = 'pending',
+        job_id: Optional[UUID] = None
+    ) -> Notification:
+        """Buffer a new row; returns it as a (detached) Notification"""
+        now = datetime.now(timezone.utc)
+        row = dict(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            message=message,
+            channel=channel,
+            status=status,
+            sent_at=now if status == 'sent' else None,
+            created_at=now,
+            job_id=job_id
+        )
+        self._rows.append(row)
+        return Notification(**row)
+
+    def mark(self, notification_id: UUID, status: str) -> None:
+        """Buffer a status change for an existing row"""
+        self._statuses.setdefault(status, []).append(notification_id)
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows) + sum(len(ids) for ids in self._statuses.values())
+
+    async def flush(self) -> None:
+        """Write buffered rows and status changes (does not commit)"""
+        rows, self._rows = self._rows, []
+        statuses, self._statuses = self._statuses, {}
+
+        if rows:
+            await self.db.execute(insert(Notification), rows)
+        for status, ids in statuses.items():
+            values = {"status": status}
+            if status == 'sent':
+                values["sent_at"] = datetime.now(timezone.utc)
+            await self.db.execute(
+                update(Notification)
+                .where(Notification.id.in_(ids))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
@@ -1,10 +1,19 @@
-from sqlalchemy.orm import Session
+from dataclasses import dataclass
+from functools import lru_cache
+from sqlalchemy import select, func, and_, bindparam, true
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from datetime import date, timedelta, time as dt_time
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 
+from app.db.functions import week_start
 from app.db.models import Registration, Activity, User
-from app.core.enums import MembershipType, RegistrationStatus
+from app.core.enums import MembershipType, NotificationKind, RegistrationStatus
+from app.services.activity_service import ActivityService
+from app.services.notification_outbox import NotificationOutbox
+from app.services.catalog_version import get_catalog_version
 
 
 class ConflictError(Exception):
@@ -12,6 +21,114 @@ class ConflictError(Exception):
     pass
 
 
+# Weekly registration limits per membership type
+MEMBERSHIP_LIMITS = {
+    MembershipType.ONCE_WEEKLY: 1,
+    MembershipType.TWICE_WEEKLY: 2,
+    MembershipType.THREE_PLUS: 3
+}
+
+# Waitlisted registrations considered per promotion (ineligible ones are skipped)
+WAITLIST_PROMOTION_SCAN = 20
+
+
+@dataclass(frozen=True)
+class RegistrationCheck:
+    """Every input to the registration rules, fetched in one query"""
+    activity_date: date
+    is_full: bool
+    existing_id: Optional[UUID]
+    existing_status: Optional[RegistrationStatus]
+    conflict_title: Optional[str]
+    conflict_start: Optional[dt_time]
+    conflict_end: Optional[dt_time]
+    weekly_count: int
+    membership_type: Optional[MembershipType]
+
+    def raise_for_conflict(self, check_capacity: bool = True) -> None:
+        """Raise the first failing rule, in the same order and wording as the individual checks"""
+        if check_capacity and self.is_full:
+            raise ConflictError("Activity is full. No spots available.")
+        if self.existing_status == RegistrationStatus.CONFIRMED:
+            raise ConflictError("You are already registered for this activity")
+        if self.conflict_title is not None:
+            raise ConflictError(
+                f"Time conflict detected with activity: {self.conflict_title} "
+                f"({self.conflict_start} - {self.conflict_end})"
+            )
+        max_registrations = MEMBERSHIP_LIMITS.get(self.membership_type)
+        if max_registrations and self.weekly_count >= max_registrations:
+            raise ConflictError(
+                f"Weekly registration limit exceeded. Your {self.membership_type.value} "
+                f"membership allows {max_registrations} activities per week."
+            )
+
+
+@lru_cache(maxsize=1)
+def _registration_check_query():
+    """
+    The validation query, built once with bind parameters
+
+    One row per existing activity: the activity itself, the user's row for it
+    (if any), the first same-day overlap among their confirmed registrations,
+    their confirmed count for that Monday-Sunday week and their membership.
+    """
+    user_id = bindparam("check_user_id", type_=User.id.type)
+    activity_id = bindparam("check_activity_id", type_=Activity.id.type)
+
+    target = select(
+        Activity.id, Activity.date, Activity.start_time, Activity.end_time,
+        Activity.current_participants, Activity.held_seats, Activity.max_capacity
+    ).where(Activity.id == activity_id).cte("target")
+
+    # The user's confirmed registrations with their activities
+    booked = aliased(Activity, name="booked")
+    mine = (
+        select(Registration.activity_id)
+        .join(booked, booked.id == Registration.activity_id)
+        .where(Registration.user_id == user_id, Registration.status == RegistrationStatus.CONFIRMED)
+    )
+
+    conflict = (
+        mine.add_columns(booked.title, booked.start_time, booked.end_time)
+        .where(
+            booked.date == target.c.date,
+            booked.start_time < target.c.end_time,
+            target.c.start_time < booked.end_time
+        )
+        .order_by(booked.start_time)
+        .limit(1)
+        .cte("conflict")
+    )
+    weekly = (
+        select(func.count().label("n"))
+        .select_from(mine.where(week_start(booked.date) == week_start(target.c.date)).subquery())
+        .cte("weekly")
+    )
+
+    return (
+        select(
+            target.c.date,
+            (target.c.current_participants + target.c.held_seats >= target.c.max_capacity).label("is_full"),
+            Registration.id.label("existing_id"),
+            Registration.status.label("existing_status"),
+            conflict.c.title,
+            conflict.c.start_time,
+            conflict.c.end_time,
+            weekly.c.n,
+            User.membership_type
+        )
+        .select_from(target)
+        .join(weekly, true())
+        .outerjoin(conflict, true())
+        .outerjoin(Registration, and_(
+            Registration.activity_id == target.c.id,
+            Registration.user_id == user_id
+        ))
+        .outerjoin(User, User.id == user_id)
+    )
+
+
 class RegistrationService:
     """
     Service for registration validation and operations
@@ -19,17 +136,17 @@ class RegistrationService:
     Used by both participants and volunteers for registration logic
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def validate_membership_limit(self, user_id: UUID, activity_date: date) -> None:
+    async def validate_membership_limit(self, user_id: UUID, activity_date: date) -> None:
         """
         Check if user has exceeded their weekly registration limit
         
         Raises ConflictError if limit exceeded
         """
         # Get user
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = await self.db.get(User, user_id)
         if not user or not user.membership_type:
             return  # No limit for users without membership type
         
@@ -38,59 +155,49 @@ class RegistrationService:
         week_end = week_start + timedelta(days=6)
         
         # Count registrations in the same week
-        registration_count = (
-            self.db.query(Registration)
+        registration_count = (await self.db.execute(
+            select(func.count(Registration.id))
             .join(Activity)
-            .filter(
+            .where(
                 Registration.user_id == user_id,
                 Registration.status == RegistrationStatus.CONFIRMED,
                 Activity.date >= week_start,
                 Activity.date <= week_end
             )
-            .count()
-        )
+        )).scalar_one()
         
         # Check limits based on membership type
-        limits = {
-            MembershipType.ONCE_WEEKLY: 1,
-            MembershipType.TWICE_WEEKLY: 2,
-            MembershipType.THREE_PLUS: 3
-        }
-        
-        max_registrations = limits.get(user.membership_type)
+        max_registrations = MEMBERSHIP_LIMITS.get(user.membership_type)
         if max_registrations and registration_count >= max_registrations:
             raise ConflictError(
                 f"Weekly registration limit exceeded. Your {user.membership_type.value} "
                 f"membership allows {max_registrations} activities per week."
             )
     
-    def check_time_conflict(self, user_id: UUID, activity_id: UUID) -> None:
+    async def check_time_conflict(self, user_id: UUID, activity_id: UUID) -> None:
         """
         Check if user has time conflict with existing registrations
         
         Raises ConflictError if conflict detected
         """
         # Get the activity we're trying to register for
-        new_activity = self.db.query(Activity).filter(Activity.id == activity_id).first()
+        new_activity = await self.db.get(Activity, activity_id)
         if not new_activity:
             raise ConflictError("Activity not found")
         
-        # Get all confirmed registrations for user on same date
-        existing_registrations = (
-            self.db.query(Registration)
-            .join(Activity)
-            .filter(
+        # Get activities of all confirmed registrations for user on same date
+        existing_activities = (await self.db.execute(
+            select(Activity)
+            .join(Registration)
+            .where(
                 Registration.user_id == user_id,
                 Registration.status == RegistrationStatus.CONFIRMED,
                 Activity.date == new_activity.date
             )
-            .all()
-        )
+        )).scalars().all()
         
         # Check for time overlaps
-        for reg in existing_registrations:
-            existing_activity = reg.activity
-            
+        for existing_activity in existing_activities:
             if self._time_overlaps(
                 new_activity.start_time, new_activity.end_time,
                 existing_activity.start_time, existing_activity.end_time
@@ -108,50 +215,222 @@ class RegistrationService:
         """Check if two time ranges overlap"""
         return start1 < end2 and start2 < end1
     
-    def check_existing_registration(self, user_id: UUID, activity_id: UUID) -> None:
+    async def check_existing_registration(self, user_id: UUID, activity_id: UUID) -> None:
         """
         Check if user already registered for activity
         
         Raises ConflictError if already registered
         """
-        existing = (
-            self.db.query(Registration)
-            .filter(
+        existing = (await self.db.execute(
+            select(Registration.id)
+            .where(
                 Registration.user_id == user_id,
                 Registration.activity_id == activity_id,
                 Registration.status == RegistrationStatus.CONFIRMED
             )
-            .first()
-        )
+            .limit(1)
+        )).first()
         
         if existing:
             raise ConflictError("You are already registered for this activity")
     
-    def check_activity_capacity(self, activity_id: UUID) -> None:
+    async def check_activity_capacity(self, activity_id: UUID) -> None:
         """
         Check if activity has available capacity
         
         Raises ConflictError if full
         """
-        activity = self.db.query(Activity).filter(Activity.id == activity_id).first()
+        activity = await self.db.get(Activity, activity_id)
         if not activity:
             raise ConflictError("Activity not found")
         
-        if activity.current_participants >= activity.max_capacity:
+        if activity.current_participants + activity.held_seats >= activity.max_capacity:
             raise ConflictError("Activity is full. No spots available.")
     
-    def validate_all(self, user_id: UUID, activity_id: UUID) -> None:
+    async def check(self, user_id: UUID, activity_id: UUID) -> Optional[RegistrationCheck]:
+        """
+        Gather capacity, existing registration, time conflict and weekly
+        count for a registration in a single CTE query
+
+        Returns:
+            RegistrationCheck, or None if the activity doesn't exist
         """
-        Run all validations for registration
+        row = (await self.db.execute(
+            _registration_check_query(),
+            {"check_user_id": user_id, "check_activity_id": activity_id}
+        )).first()
+
+        if row is None:
+            return None
+        return RegistrationCheck(
+            activity_date=row.date,
+            is_full=bool(row.is_full),
+            existing_id=row.existing_id,
+            existing_status=row.existing_status,
+            conflict_title=row.title,
+            conflict_start=row.start_time,
+            conflict_end=row.end_time,
+            weekly_count=row.n,
+            membership_type=row.membership_type
+        )
+
+    async def validate_all(self, user_id: UUID, activity_id: UUID) -> RegistrationCheck:
+        """
+        Run all validations for registration (one query)
         
         Raises ConflictError if any validation fails
         """
-        activity = self.db.query(Activity).filter(Activity.id == activity_id).first()
-        if not activity:
+        result = await self.check(user_id, activity_id)
+        if result is None:
             raise ConflictError("Activity not found")
-        
-        # Run all validation checks
-        self.check_activity_capacity(activity_id)
-        self.check_existing_registration(user_id, activity_id)
-        self.check_time_conflict(user_id, activity_id)
-        self.validate_membership_limit(user_id, activity.date)
+        result.raise_for_conflict()
+        return result
+    
+    async def register(self, user_id: UUID, activity_id: UUID) -> Registration:
+        """
+        Validate and register in a single transaction
+
+        The seat is claimed with a conditional UPDATE ... RETURNING, and the
+        registration insert commits together with it, so concurrent sign-ups
+        can never overbook. When the activity is full the user joins its
+        waitlist instead. A previously cancelled registration is reused (one
+        row per user and activity).
+
+        Returns:
+            The registration, with status confirmed or waitlist
+
+        Raises ConflictError if any other validation fails
+        """
+        result = await self.check(user_id, activity_id)
+        if result is None:
+            raise ConflictError("Activity not found")
+        result.raise_for_conflict(check_capacity=False)
+        if result.is_full and result.existing_status == RegistrationStatus.WAITLIST:
+            raise ConflictError("You are already on the waitlist for this activity")
+
+        activity_service = ActivityService(self.db)
+        try:
+            # Capacity from the check is only an early exit; the UPDATE is authoritative
+            seat = None if result.is_full else await activity_service.reserve_seat(activity_id)
+            registration = await self.registration_row(result, user_id, activity_id)
+
+            if seat is not None:
+                registration.status = RegistrationStatus.CONFIRMED
+                registration.waitlist_position = None
+                await NotificationOutbox(self.db).enqueue(NotificationKind.REGISTRATION_CONFIRMATION, user_id, activity_id)
+                await activity_service.publish_catalog_change()
+            elif registration.status != RegistrationStatus.WAITLIST:
+                registration.status = RegistrationStatus.WAITLIST
+                registration.waitlist_position = await self._next_waitlist_position(activity_id)
+
+            await self.db.commit()
+        except IntegrityError:
+            # A parallel request from the same user inserted first
+            await self.db.rollback()
+            raise ConflictError("You are already registered for this activity")
+
+        if seat is not None:
+            get_catalog_version().bump()
+        return registration
+
+    async def cancel(self, registration: Registration) -> Optional[Registration]:
+        """
+        Cancel a registration in a single transaction
+
+        Cancelling a confirmed registration releases its seat and promotes
+        the head of the waitlist into it; cancelling a waitlisted one just
+        leaves the queue. Notifications for both go into the outbox.
+
+        Returns:
+            The promoted registration, if any
+        """
+        was_confirmed = registration.status == RegistrationStatus.CONFIRMED
+        registration.status = RegistrationStatus.CANCELLED
+        registration.waitlist_position = None
+        await NotificationOutbox(self.db).enqueue(
+            NotificationKind.CANCELLATION, registration.user_id, registration.activity_id
+        )
+
+        promoted = None
+        if was_confirmed:
+            activity_service = ActivityService(self.db)
+            await activity_service.release_seat(registration.activity_id)
+            promoted = await self.promote_next(registration.activity_id)
+            await activity_service.publish_catalog_change()
+
+        await self.db.commit()
+        if was_confirmed:
+            get_catalog_version().bump()
+        return promoted
+
+    async def registration_row(self, result: RegistrationCheck, user_id: UUID, activity_id: UUID) -> Registration:
+        """The user's existing row for the activity, or a new pending one (no commit)"""
+        if result.existing_id:
+            return await self.db.get(Registration, result.existing_id)
+        registration = Registration(user_id=user_id, activity_id=activity_id)
+        self.db.add(registration)
+        return registration
+
+    async def waitlist_rank(self, registration: Registration) -> Optional[int]:
+        """1-based place in the activity's waitlist (None if not waitlisted)"""
+        if registration.status != RegistrationStatus.WAITLIST:
+            return None
+
+        ahead = (await self.db.execute(
+            select(func.count(Registration.id)).where(
+                Registration.activity_id == registration.activity_id,
+                Registration.status == RegistrationStatus.WAITLIST,
+                Registration.waitlist_position < registration.waitlist_position
+            )
+        )).scalar_one()
+        return ahead + 1
+
+    async def _next_waitlist_position(self, activity_id: UUID) -> int:
+        """Next place in the queue; locks the activity row so concurrent waitlisters don't tie"""
+        # NO KEY UPDATE: doesn't conflict with the key-share lock the registration insert's FK takes
+        await self.db.execute(
+            select(Activity.id).where(Activity.id == activity_id).with_for_update(key_share=True)
+        )
+        return (await self.db.execute(
+            select(func.coalesce(func.max(Registration.waitlist_position), 0) + 1).where(
+                Registration.activity_id == activity_id,
+                Registration.status == RegistrationStatus.WAITLIST
+            )
+        )).scalar_one()
+
+    async def promote_next(self, activity_id: UUID) -> Optional[Registration]:
+        """
+        Move the first eligible waitlisted user into a free seat (no commit)
+
+        Users who have since picked up a time conflict or hit their weekly
+        limit are skipped but keep their place. The promoted user's
+        notification is queued in the outbox.
+        """
+        candidates = (await self.db.execute(
+            select(Registration)
+            .where(
+                Registration.activity_id == activity_id,
+                Registration.status == RegistrationStatus.WAITLIST
+            )
+            .order_by(Registration.waitlist_position, Registration.created_at)
+            .limit(WAITLIST_PROMOTION_SCAN)
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+
+        activity_service = ActivityService(self.db)
+        for candidate in candidates:
+            result = await self.check(candidate.user_id, activity_id)
+            try:
+                result.raise_for_conflict(check_capacity=False)
+            except ConflictError:
+                continue
+
+            if await activity_service.reserve_seat(activity_id) is None:
+                return None
+            candidate.status = RegistrationStatus.CONFIRMED
+            candidate.waitlist_position = None
+            await NotificationOutbox(self.db).enqueue(
+                NotificationKind.WAITLIST_PROMOTION, candidate.user_id, activity_id
+            )
+            return candidate
+        return None
@@ -0,0 +1,96 @@
+"""
+Activity reminders, queued through the notification outbox.
+
+Each run claims the activities starting within REMINDER_LEAD_HOURS that have
+not been reminded yet (one conditional UPDATE over the (date, start_time)
+index), loads their confirmed participants and volunteers in one query and
+enqueues the reminders in bulk, all in one transaction. The claim is the
+sent-marker: a second worker's UPDATE finds nothing to claim, and the
+per-recipient dedupe key stops a repeat even if an activity is claimed again.
+Rescheduling an activity clears the marker; the dedupe key includes the
+schedule, so the new time gets its own reminder.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, or_, select, union, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import NotificationKind, RegistrationStatus
+from app.db.models import Activity, Registration, VolunteerMatch
+from app.services.notification_outbox import NotificationOutbox
+
+
+def _starts_after(moment: datetime):
+    return or_(
+        Activity.date > moment.date(),
+        and_(Activity.date == moment.date(), Activity.start_time > moment.time())
+    )
+
+
+def _starts_by(moment: datetime):
+    return or_(
+        Activity.date < moment.date(),
+        and_(Activity.date == moment.date(), Activity.start_time <= moment.time())
+    )
+
+
+class ReminderService:
+    """Queue reminders for activities that are about to start"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue_due(self, now: Optional[datetime] = None) -> int:
+        """
+        Claim activities entering the reminder window and queue their reminders
+
+        ``now`` is local time, like activity dates and start times.
+
+        Returns:
+            Number of reminders queued
+        """
+        now = now or datetime.now()
+        window_end = now + timedelta(hours=settings.REMINDER_LEAD_HOURS)
+
+        claimed = (await self.db.execute(
+            update(Activity)
+            .where(
+                Activity.reminder_sent_at.is_(None),
+                Activity.date.between(now.date(), window_end.date()),
+                _starts_after(now),
+                _starts_by(window_end)
+            )
+            # Keep updated_at: the marker isn't an edit and mustn't move the catalog version
+            .values(reminder_sent_at=datetime.now(timezone.utc), updated_at=Activity.updated_at)
+            .returning(Activity.id, Activity.date, Activity.start_time)
+            .execution_options(synchronize_session=False)
+        )).all()
+        if not claimed:
+            await self.db.commit()
+            return 0
+        # Part of the dedupe key, so a rescheduled activity is reminded again
+        schedules = {row.id: f"{row.date}T{row.start_time}" for row in claimed}
+
+        recipients = (await self.db.execute(union(
+            select(Registration.user_id, Registration.activity_id).where(
+                Registration.activity_id.in_(schedules),
+                Registration.status == RegistrationStatus.CONFIRMED
+            ),
+            select(VolunteerMatch.volunteer_id, VolunteerMatch.activity_id).where(
+                VolunteerMatch.activity_id.in_(schedules),
+                VolunteerMatch.status == RegistrationStatus.CONFIRMED
+            )
+        ))).all()
+
+        await NotificationOutbox(self.db).enqueue_many([
+            (
+                NotificationKind.ACTIVITY_REMINDER, user_id, activity_id,
+                f"reminder:{activity_id}:{schedules[activity_id]}:{user_id}"
+            )
+            for user_id, activity_id in recipients
+        ])
+        await self.db.commit()
+        return len(recipients)
@@ -0,0 +1,244 @@
+"""
+Short-lived seat holds for the participant swiper.
+
+A hold takes a seat for SEAT_HOLD_TTL_SECONDS while the participant decides,
+so the confirm step can't lose the seat to someone else. Held seats are
+tracked in ``activities.held_seats`` (always the number of seat_holds rows
+for the activity) and count against max_capacity everywhere availability is
+checked. Confirming moves the seat from held to taken in one UPDATE; expired
+holds are deleted in bulk by the sweeper rather than on each request.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import NotificationKind, RegistrationStatus
+from app.db.models import Activity, Registration, SeatHold
+from app.services.activity_service import ActivityService
+from app.services.catalog_version import SEAT_CHANGE, get_catalog_version
+from app.services.notification_outbox import NotificationOutbox
+from app.services.registration_service import ConflictError, RegistrationService
+
+
+class HoldExpiredError(ConflictError):
+    """The hold lapsed (or was already used) before it was confirmed"""
+    pass
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class SeatHoldService:
+    """Create, confirm, release and sweep seat holds"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def hold(self, user_id: UUID, activity_id: UUID) -> SeatHold:
+        """
+        Hold a seat for the user (or extend their existing hold)
+
+        Runs the registration rules first so a hold is only given to someone
+        who could register. The seat is taken with a conditional UPDATE, so
+        holds can't oversubscribe an activity either.
+
+        Raises ConflictError if the user can't register or the activity is full
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.SEAT_HOLD_TTL_SECONDS)
+
+        result = await RegistrationService(self.db).check(user_id, activity_id)
+        if result is None:
+            raise ConflictError("Activity not found")
+        result.raise_for_conflict(check_capacity=False)
+
+        # Re-swiping the same card keeps the seat already held
+        extended = (await self.db.execute(
+            update(SeatHold)
+            .where(SeatHold.activity_id == activity_id, SeatHold.user_id == user_id)
+            .values(expires_at=expires_at)
+            .returning(SeatHold)
+            .execution_options(populate_existing=True)
+        )).scalar_one_or_none()
+        if extended is not None:
+            await self.db.commit()
+            return extended
+
+        activity_service = ActivityService(self.db)
+        held = (await self.db.execute(
+            update(Activity)
+            .where(
+                Activity.id == activity_id,
+                Activity.current_participants + Activity.held_seats < Activity.max_capacity
+            )
+            .values(held_seats=Activity.held_seats + 1, **SEAT_CHANGE)
+            .returning(Activity.held_seats)
+            .execution_options(synchronize_session="fetch")
+        )).scalar_one_or_none()
+        if held is None:
+            raise ConflictError("Activity is full. No spots available.")
+
+        hold = SeatHold(activity_id=activity_id, user_id=user_id, expires_at=expires_at)
+        self.db.add(hold)
+        await activity_service.publish_catalog_change()
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # A parallel request from the same user created the hold first
+            await self.db.rollback()
+            return (await self.db.execute(
+                select(SeatHold).where(SeatHold.activity_id == activity_id, SeatHold.user_id == user_id)
+            )).scalar_one()
+
+        get_catalog_version().bump()
+        return hold
+
+    async def confirm(self, hold: SeatHold) -> Registration:
+        """
+        Turn a hold into a confirmed registration in one transaction
+
+        The hold row is deleted and the seat moved from held_seats to
+        current_participants with a single UPDATE; the activity is never
+        re-checked for capacity, since the seat is already ours.
+
+        Raises HoldExpiredError if the hold lapsed, ConflictError if the user
+        picked up a time conflict or hit their weekly limit since holding (the
+        hold is released first, so the seat doesn't wait for the sweeper)
+        """
+        if _as_utc(hold.expires_at) <= datetime.now(timezone.utc):
+            raise HoldExpiredError("Seat hold has expired")
+
+        user_id, activity_id = hold.user_id, hold.activity_id
+        registrations = RegistrationService(self.db)
+        result = await registrations.check(user_id, activity_id)
+        if result is None:
+            raise ConflictError("Activity not found")
+        try:
+            result.raise_for_conflict(check_capacity=False)
+        except ConflictError:
+            await self.release(hold)
+            raise
+
+        # Claim the hold; losing the race to the sweeper or a second confirm ends here
+        claimed = (await self.db.execute(
+            delete(SeatHold)
+            .where(SeatHold.id == hold.id, SeatHold.expires_at > datetime.now(timezone.utc))
+            .returning(SeatHold.id)
+            .execution_options(synchronize_session="fetch")
+        )).scalar_one_or_none()
+        if claimed is None:
+            raise HoldExpiredError("Seat hold has expired")
+
+        await self.db.execute(
+            update(Activity)
+            .where(Activity.id == activity_id)
+            .values(
+                held_seats=Activity.held_seats - 1,
+                current_participants=Activity.current_participants + 1,
+                **SEAT_CHANGE
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+        registration = await registrations.registration_row(result, user_id, activity_id)
+        registration.status = RegistrationStatus.CONFIRMED
+        registration.waitlist_position = None
+        await NotificationOutbox(self.db).enqueue(NotificationKind.REGISTRATION_CONFIRMATION, user_id, activity_id)
+
+        await ActivityService(self.db).publish_catalog_change()
+        await self.db.commit()
+        get_catalog_version().bump()
+        return registration
+
+    async def release(self, hold: SeatHold) -> Optional[Registration]:
+        """
+        Give a held seat back (participant swiped left)
+
+        Returns:
+            The waitlisted registration promoted into the seat, if any
+        """
+        released = (await self.db.execute(
+            delete(SeatHold).where(SeatHold.id == hold.id).returning(SeatHold.activity_id)
+        )).scalars().all()
+        _, promoted = await self._return_seats(released)
+        await self.db.commit()
+        if released:
+            get_catalog_version().bump()
+        return promoted[0] if promoted else None
+
+    async def release_expired(
+        self,
+        now: Optional[datetime] = None,
+        batch_size: Optional[int] = None
+    ) -> Tuple[int, List[Registration]]:
+        """
+        Delete up to ``batch_size`` expired holds and return their seats
+
+        One DELETE for the batch and one UPDATE for all affected activities.
+        Rows locked by another worker's sweep are skipped, so sweepers in
+        several workers don't block each other.
+
+        Returns:
+            (holds released, waitlisted registrations promoted into the seats)
+        """
+        now = now or datetime.now(timezone.utc)
+        expired = (
+            select(SeatHold.id)
+            .where(SeatHold.expires_at <= now)
+            .limit(batch_size or settings.SEAT_HOLD_SWEEP_BATCH)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        released = (await self.db.execute(
+            delete(SeatHold)
+            .where(SeatHold.id.in_(expired))
+            .returning(SeatHold.activity_id)
+            .execution_options(synchronize_session=False)
+        )).scalars().all()
+
+        count, promoted = await self._return_seats(released)
+        await self.db.commit()
+        if count:
+            get_catalog_version().bump()
+        return count, promoted
+
+    async def _return_seats(self, activity_ids: List[UUID]) -> Tuple[int, List[Registration]]:
+        """
+        Decrement held_seats for released holds (one id per hold) and promote
+        waitlisted users into the freed seats (no commit)
+        """
+        if not activity_ids:
+            return 0, []
+
+        freed = Counter(activity_ids)
+        await self.db.execute(
+            update(Activity)
+            .where(Activity.id.in_(freed))
+            .values(held_seats=Activity.held_seats - case(freed, value=Activity.id, else_=0), **SEAT_CHANGE)
+            .execution_options(synchronize_session="fetch")
+        )
+
+        # A full activity may have a queue that the held seats were keeping out
+        queued = (await self.db.execute(
+            select(Registration.activity_id)
+            .where(Registration.activity_id.in_(freed), Registration.status == RegistrationStatus.WAITLIST)
+            .distinct()
+        )).scalars().all()
+
+        registrations = RegistrationService(self.db)
+        promoted = []
+        for activity_id in queued:
+            for _ in range(freed[activity_id]):
+                registration = await registrations.promote_next(activity_id)
+                if registration is None:
+                    break
+                promoted.append(registration)
+
+        await ActivityService(self.db).publish_catalog_change()
+        return len(activity_ids), promoted
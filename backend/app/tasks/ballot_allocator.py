@@ -0,0 +1,35 @@
+"""
+Draws ballots whose window has closed (outcomes are notified via the outbox).
+"""
+
+import logging
+
+from app.db.session import AsyncSessionLocal
+from app.services.ballot_service import BallotService
+
+logger = logging.getLogger(__name__)
+
+
+async def allocate_due_ballots(sessionmaker=AsyncSessionLocal) -> int:
+    """
+    Allocate every closed ballot with pending entries
+
+    Each activity is drawn in its own transaction, which also queues the
+    outcome notifications.
+
+    Returns:
+        Number of activities drawn
+    """
+    async with sessionmaker() as db:
+        due = await BallotService(db).due_activity_ids()
+
+    for activity_id in due:
+        async with sessionmaker() as db:
+            result = await BallotService(db).allocate(activity_id)
+            if result is None:
+                continue
+            logger.info(
+                f"Ballot for {activity_id}: {len(result.winners)} won, "
+                f"{len(result.waitlisted)} waitlisted, {len(result.ineligible)} ineligible"
+            )
+    return len(due)
@@ -0,0 +1,45 @@
+"""
+Runs bulk notification jobs after the send-bulk request has returned, and
+resumes jobs a crashed worker left unfinished.
+"""
+
+import logging
+from uuid import UUID
+
+from sqlalchemy import update
+
+from app.db.models import NotificationJob
+from app.db.session import AsyncSessionLocal
+from app.services.bulk_notification_service import BulkNotificationService
+
+logger = logging.getLogger(__name__)
+
+
+async def run_notification_job(job_id: UUID, sessionmaker=AsyncSessionLocal) -> None:
+    """Run a bulk notification job, marking it failed if it crashes"""
+    try:
+        async with sessionmaker() as db:
+            await BulkNotificationService(db).run(job_id)
+    except Exception as e:
+        logger.error(f"Bulk notification job {job_id} failed: {e}")
+        async with sessionmaker() as db:
+            await db.execute(update(NotificationJob).where(NotificationJob.id == job_id).values(status='failed'))
+            await db.commit()
+
+
+async def resume_stale_jobs(sessionmaker=AsyncSessionLocal) -> int:
+    """
+    Resume bulk jobs whose runner died (stale ones out of attempts are failed)
+
+    Claimed jobs are run here one after another; their heartbeats keep other
+    workers from claiming them meanwhile.
+
+    Returns:
+        Number of jobs resumed
+    """
+    async with sessionmaker() as db:
+        job_ids = await BulkNotificationService(db).claim_stale()
+    for job_id in job_ids:
+        logger.warning(f"Resuming stale bulk notification job {job_id}")
+        await run_notification_job(job_id, sessionmaker=sessionmaker)
+    return len(job_ids)
@@ -0,0 +1,35 @@
+"""
+Drains the notification outbox.
+"""
+
+import logging
+
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.notification_outbox import NotificationOutbox
+from app.services.notification_templates import get_notification_templates
+
+logger = logging.getLogger(__name__)
+
+
+async def dispatch_notifications(sessionmaker=AsyncSessionLocal) -> int:
+    """
+    Send due outbox notifications in batches until a batch comes back short
+
+    Returns:
+        Number of outbox rows processed
+    """
+    # Languages whose template translation failed at startup get another try
+    await run_blocking(get_notification_templates().retry_failed)
+
+    total = 0
+    while True:
+        async with sessionmaker() as db:
+            processed = await NotificationOutbox(db).dispatch_batch()
+        total += processed
+        if processed < settings.NOTIFICATION_OUTBOX_BATCH_SIZE:
+            break
+    if total:
+        logger.info(f"Dispatched {total} outbox notifications")
+    return total
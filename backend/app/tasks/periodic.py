@@ -0,0 +1,52 @@
+"""
+In-process periodic jobs started from the application lifespan.
+
+Every worker runs its own copy of each job, so jobs must be safe to run
+concurrently (row locks / conditional updates) rather than relying on a
+single scheduler.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs an async job every ``interval_seconds`` until stopped"""
+
+    def __init__(self, name: str, job: Callable[[], Awaitable[object]], interval_seconds: float):
+        self.name = name
+        self.job = job
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+
+    async def run_once(self) -> None:
+        """Run the job, logging (not raising) failures"""
+        self.runs += 1
+        try:
+            await self.job()
+        except Exception:
+            self.failures += 1
+            logger.exception("Periodic task %s failed", self.name)
+
+    async def _loop(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,42 @@
+"""
+Queues activity reminders ahead of each activity.
+
+Runs in the application lifespan (REMINDER_SCHEDULER_ENABLED), or on its own
+with ``python -m app.tasks.reminder_scheduler`` when API workers have it
+disabled.
+"""
+
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.reminder_service import ReminderService
+from app.tasks.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+async def schedule_reminders(sessionmaker=AsyncSessionLocal) -> int:
+    """
+    Queue reminders for activities entering the reminder window
+
+    Returns:
+        Number of reminders queued
+    """
+    async with sessionmaker() as db:
+        queued = await ReminderService(db).enqueue_due()
+    if queued:
+        logger.info(f"Queued {queued} activity reminders")
+    return queued
+
+
+async def _run_forever() -> None:
+    task = PeriodicTask("reminder-scheduler", schedule_reminders, settings.REMINDER_SCHEDULER_INTERVAL_SECONDS)
+    task.start()
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_forever())
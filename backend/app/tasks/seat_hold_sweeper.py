@@ -0,0 +1,30 @@
+"""
+Returns seats from expired swiper holds (promotion notifications go through the outbox).
+"""
+
+import logging
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.seat_hold_service import SeatHoldService
+
+logger = logging.getLogger(__name__)
+
+
+async def sweep_expired_holds(sessionmaker=AsyncSessionLocal) -> int:
+    """
+    Release expired holds in batches until none are left
+
+    Returns:
+        Number of holds released
+    """
+    total = 0
+    while True:
+        async with sessionmaker() as db:
+            released, _promoted = await SeatHoldService(db).release_expired()
+        total += released
+        if released < settings.SEAT_HOLD_SWEEP_BATCH:
+            break
+    if total:
+        logger.info(f"Released {total} expired seat holds")
+    return total
@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from typing import Any, Callable, List, Sequence
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded"""
+    pass
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode keyset values into an opaque, URL-safe cursor token
+
+    Args:
+        values: Sort-key values of the last row on the page
+            (dates, times, datetimes and UUIDs are stored as strings)
+
+    Returns:
+        Base64 token without padding
+    """
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str, parsers: Sequence[Callable[[str], Any]]) -> List[Any]:
+    """
+    Decode a cursor token back into typed keyset values
+
+    Args:
+        token: Cursor from a previous page
+        parsers: One parser per value, e.g. (date.fromisoformat, UUID)
+
+    Raises:
+        InvalidCursorError: If the token is malformed or doesn't match parsers
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise InvalidCursorError("Invalid cursor")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
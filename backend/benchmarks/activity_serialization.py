@@ -0,0 +1,118 @@
+"""
+Benchmark: serializing a 1,000-activity list response.
+
+Compares the previous path (build ActivityResponse models, then FastAPI
+response_model validation + JSONResponse encoding) with the fast path
+(trusted dicts from ActivityResponseBuilder encoded by FastJSONResponse).
+
+Run from backend/:
+    python -m benchmarks.activity_serialization [--items 1000] [--rounds 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+for key, value in {
+    "DATABASE_URL": "sqlite:///benchmark.db",
+    "SUPABASE_URL": "https://benchmark.supabase.co",
+    "SUPABASE_ANON_KEY": "benchmark",
+    "JWT_SECRET_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.core.responses import FastJSONResponse  # noqa: E402
+from app.models.activity import ActivityListResponse, ActivityResponse, StaffContactInfo  # noqa: E402
+from app.services.activity_response_builder import ActivityResponseBuilder  # noqa: E402
+
+
+def make_activities(n: int):
+    """Activity-like rows with every response field populated"""
+    staff_id = uuid.uuid4()
+    contact = {"id": staff_id, "full_name": "Staff Member", "email": "staff@minds.org", "phone": "+6590000000"}
+    rows = []
+    for i in range(n):
+        rows.append(SimpleNamespace(
+            id=uuid.uuid4(),
+            title=f"Activity {i}",
+            description="Weekly art jam with guided painting and music." * 2,
+            date=date.today() + timedelta(days=i % 60),
+            start_time=dtime(9 + i % 8, 0),
+            end_time=dtime(10 + i % 8, 30),
+            location="MINDS Hall",
+            max_capacity=20,
+            current_participants=i % 20,
+            held_seats=0,
+            program_type="arts",
+            wheelchair_accessible=True,
+            payment_required=False,
+            created_by_staff_id=staff_id,
+            ballot_closes_at=None,
+            created_at=datetime.now(timezone.utc),
+            title_zh=f"活动 {i}", title_ms=f"Aktiviti {i}", title_ta=f"செயல்பாடு {i}",
+            description_zh="每周艺术活动", description_ms="Sesi seni mingguan", description_ta="வாராந்திர கலை",
+        ))
+    return rows, contact
+
+
+async def before(rows, contact, field) -> bytes:
+    """Previous path: Pydantic models + response_model validation + json encoding"""
+    responses = []
+    for row in rows:
+        data = ActivityResponseBuilder._to_payload(row, None)
+        data["point_of_contact"] = StaffContactInfo(**contact)
+        responses.append(ActivityResponse(**data))
+    content = ActivityListResponse(activities=responses, total=len(responses))
+    serialized = await serialize_response(field=field, response_content=content)
+    return JSONResponse(serialized).body
+
+
+async def after(rows, contact, field) -> bytes:
+    """Fast path: trusted dicts encoded once with orjson"""
+    payload = [ActivityResponseBuilder._to_payload(row, contact) for row in rows]
+    return FastJSONResponse({"activities": payload, "total": len(payload)}).body
+
+
+async def measure(fn, rows, contact, field, rounds: int):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = await fn(rows, contact, field)
+        timings.append(time.perf_counter() - start)
+    return timings, len(body)
+
+
+async def main(items: int, rounds: int):
+    rows, contact = make_activities(items)
+    field = create_response_field(name="Response_get_activities", type_=ActivityListResponse, mode="serialization")
+
+    print(f"{items} activities, {rounds} rounds\n")
+    results = {}
+    for name, fn in (("before", before), ("after", after)):
+        await fn(rows, contact, field)  # warm-up
+        timings, size = await measure(fn, rows, contact, field, rounds)
+        median = statistics.median(timings)
+        results[name] = median
+        print(f"{name:>6}: {median * 1000:8.2f} ms/payload  "
+              f"{median / items * 1e6:7.2f} us/item  ({size} bytes)")
+
+    print(f"\nspeed-up: {results['before'] / results['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.rounds))
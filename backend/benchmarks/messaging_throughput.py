@@ -0,0 +1,110 @@
+"""
+Benchmark: notification send throughput against the messaging stand-in.
+
+Starts the local Twilio stand-in (app/integrations/messaging_standin.py) on a
+free port and sends the same batch of SMS two ways: the previous path (one
+blocking HTTP call at a time, as the old TwilioClient did) and the async
+MessagingTransport with pooled connections and bounded concurrency. Set
+--rate to see the per-sender limit cap throughput, --failure-rate to see
+retries.
+
+Run from backend/:
+    python -m benchmarks.messaging_throughput [--messages 200] [--latency-ms 50] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+for key, value in {
+    "DATABASE_URL": "sqlite:///benchmark.db",
+    "SUPABASE_URL": "https://benchmark.supabase.co",
+    "SUPABASE_ANON_KEY": "benchmark",
+    "JWT_SECRET_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app.integrations.messaging import MessagingTransport, TwilioBackend  # noqa: E402
+from app.integrations.messaging_standin import create_standin_app  # noqa: E402
+
+ACCOUNT = "ACbenchmark"
+
+
+def start_standin(latency_seconds: float, failure_rate: float) -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(
+        create_standin_app(latency_seconds, failure_rate), host="127.0.0.1", port=port, log_level="warning"
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+def before(base_url: str, messages: int) -> int:
+    """One blocking request per message, in sequence"""
+    sent = 0
+    with httpx.Client(base_url=f"{base_url}/2010-04-01/Accounts/{ACCOUNT}", auth=(ACCOUNT, "x")) as client:
+        for i in range(messages):
+            response = client.post("/Messages.json", data={"From": "MINDS", "To": f"+6590{i:06d}", "Body": "Reminder"})
+            sent += response.status_code == 201
+    return sent
+
+
+async def after(base_url: str, messages: int, concurrency: int, rate: float) -> tuple:
+    transport = MessagingTransport(
+        TwilioBackend(ACCOUNT, "x", base_url=base_url, max_connections=concurrency),
+        rate_per_second=rate,
+        retry_base_seconds=0.05
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i):
+        async with semaphore:
+            return await transport.send_sms(f"+6590{i:06d}", "Reminder")
+
+    sids = await asyncio.gather(*(send(i) for i in range(messages)))
+    await transport.aclose()
+    return sum(1 for sid in sids if sid), transport.stats()["retried"]
+
+
+def main(messages: int, latency_ms: float, concurrency: int, rate: float, failure_rate: float):
+    base_url = start_standin(latency_ms / 1000, failure_rate)
+    print(f"{messages} SMS, stand-in latency {latency_ms:.0f} ms, failure rate {failure_rate:.0%}\n")
+
+    start = time.perf_counter()
+    sent = before(base_url, messages)
+    elapsed = time.perf_counter() - start
+    before_rate = messages / elapsed
+    print(f"before: {sent}/{messages} sent in {elapsed:6.2f} s  ({before_rate:7.1f} msg/s, sequential, no retries)")
+
+    start = time.perf_counter()
+    sent, retried = asyncio.run(after(base_url, messages, concurrency, rate))
+    elapsed = time.perf_counter() - start
+    after_rate = messages / elapsed
+    limit = f"{rate:g}/s limit" if rate > 0 else "no rate limit"
+    print(f" after: {sent}/{messages} sent in {elapsed:6.2f} s  ({after_rate:7.1f} msg/s, "
+          f"{concurrency} concurrent, {limit}, {retried} retries)")
+
+    print(f"\nthroughput: {after_rate / before_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=0.0, help="Per-sender messages/second (0 = unlimited)")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    main(args.messages, args.latency_ms, args.concurrency, args.rate, args.failure_rate)
@@ -0,0 +1,145 @@
+"""
+Benchmark: validating a registration.
+
+Compares the previous path (check_activity_capacity, check_existing_registration,
+check_time_conflict and validate_membership_limit in sequence) with the single
+CTE query behind RegistrationService.validate_all. Reports queries per
+registration and median / p95 latency against a throwaway SQLite database;
+expect larger gaps on Postgres, where every query is a network round-trip.
+
+Run from backend/:
+    python -m benchmarks.registration_validation [--users 200] [--rounds 500]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+for key, value in {
+    "DATABASE_URL": "sqlite:///benchmark.db",
+    "SUPABASE_URL": "https://benchmark.supabase.co",
+    "SUPABASE_ANON_KEY": "benchmark",
+    "JWT_SECRET_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.dialects.postgresql import UUID as PGUUID  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+from app.core.enums import MembershipType, RegistrationStatus, Role  # noqa: E402
+from app.db import models  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.services.registration_service import ConflictError, RegistrationService  # noqa: E402
+
+
+@compiles(PGUUID, "sqlite")
+def _compile_uuid(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+async def seed(sessionmaker, users: int):
+    """Users with a few confirmed registrations each, across two weeks of activities"""
+    today = date.today()
+    activities = [
+        models.Activity(
+            id=uuid.uuid4(), title=f"Activity {i}",
+            date=today + timedelta(days=i % 14), start_time=dtime(9 + i % 6, 0), end_time=dtime(10 + i % 6, 0),
+            max_capacity=1000, current_participants=0,
+        )
+        for i in range(100)
+    ]
+    people = [
+        models.User(
+            id=uuid.uuid4(), email=f"user{i}@example.com", hashed_password="x",
+            role=Role.PARTICIPANT, membership_type=MembershipType.THREE_PLUS,
+        )
+        for i in range(users)
+    ]
+    registrations = [
+        models.Registration(user_id=user.id, activity_id=activity.id, status=RegistrationStatus.CONFIRMED)
+        for user in people
+        for activity in random.sample(activities, 3)
+    ]
+    async with sessionmaker() as db:
+        db.add_all(activities + people + registrations)
+        await db.commit()
+    return [u.id for u in people], [a.id for a in activities]
+
+
+async def before(service: RegistrationService, user_id, activity_id):
+    """Previous validate_all: four checks, each with its own queries"""
+    activity = await service.db.get(models.Activity, activity_id)
+    await service.check_activity_capacity(activity_id)
+    await service.check_existing_registration(user_id, activity_id)
+    await service.check_time_conflict(user_id, activity_id)
+    await service.validate_membership_limit(user_id, activity.date)
+
+
+async def after(service: RegistrationService, user_id, activity_id):
+    """Single CTE query"""
+    await service.validate_all(user_id, activity_id)
+
+
+async def measure(fn, sessionmaker, engine, user_ids, activity_ids, rounds: int):
+    queries = {"count": 0}
+
+    def _count(*args, **kwargs):
+        queries["count"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    timings = []
+    try:
+        for _ in range(rounds):
+            user_id, activity_id = random.choice(user_ids), random.choice(activity_ids)
+            # Fresh session per registration, as per request
+            async with sessionmaker() as db:
+                start = time.perf_counter()
+                try:
+                    await fn(RegistrationService(db), user_id, activity_id)
+                except ConflictError:
+                    pass
+                timings.append(time.perf_counter() - start)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _count)
+    return timings, queries["count"] / rounds
+
+
+async def main(users: int, rounds: int):
+    random.seed(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        user_ids, activity_ids = await seed(sessionmaker, users)
+
+        print(f"{users} users, {len(activity_ids)} activities, {rounds} validations\n")
+        results = {}
+        for name, fn in (("before", before), ("after", after)):
+            await measure(fn, sessionmaker, engine, user_ids, activity_ids, 20)  # warm-up
+            timings, per_call = await measure(fn, sessionmaker, engine, user_ids, activity_ids, rounds)
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            results[name] = p95
+            print(f"{name:>6}: {per_call:4.1f} queries/registration  "
+                  f"median {statistics.median(timings) * 1000:6.2f} ms  p95 {p95 * 1000:6.2f} ms")
+
+        print(f"\np95 speed-up: {results['before'] / results['after']:.1f}x")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.rounds))
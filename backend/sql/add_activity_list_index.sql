@@ -0,0 +1,5 @@
+-- Migration: Composite index for keyset pagination of GET /api/activities
+-- Matches ORDER BY date DESC, start_time DESC, id DESC (scanned backwards)
+-- and the (date, start_time, id) < (...) cursor predicate.
+
+CREATE INDEX IF NOT EXISTS idx_activities_date_start_id ON activities(date, start_time, id);
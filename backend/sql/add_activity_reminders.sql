@@ -0,0 +1,12 @@
+-- Migration: Scheduled activity reminders
+-- The reminder scheduler claims each activity once by setting
+-- reminder_sent_at (conditional UPDATE), then queues one outbox message per
+-- confirmed participant / volunteer.
+
+ALTER TABLE activities
+ADD COLUMN IF NOT EXISTS reminder_sent_at TIMESTAMP WITH TIME ZONE;
+
+-- The scheduler's window scan only touches activities not yet reminded
+CREATE INDEX IF NOT EXISTS idx_activities_reminder_due
+ON activities(date, start_time)
+WHERE reminder_sent_at IS NULL;
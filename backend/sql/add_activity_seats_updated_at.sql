@@ -0,0 +1,7 @@
+-- Migration: Track seat-count changes apart from activity edits
+-- Register / cancel / hold UPDATEs set seats_updated_at instead of
+-- updated_at, so the catalog cache patches counts in place and only
+-- rebuilds its snapshot when an activity itself is added or edited.
+
+ALTER TABLE activities
+ADD COLUMN IF NOT EXISTS seats_updated_at TIMESTAMP WITH TIME ZONE;
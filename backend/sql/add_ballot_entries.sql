@@ -0,0 +1,21 @@
+-- Migration: Ballot (lottery) window for oversubscribed activities
+-- While NOW() < ballot_closes_at, POST /api/registrations only records an
+-- entry; at close the allocator draws seats in one transaction.
+
+ALTER TABLE activities
+ADD COLUMN IF NOT EXISTS ballot_closes_at TIMESTAMP WITH TIME ZONE;
+
+CREATE TABLE IF NOT EXISTS ballot_entries (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    activity_id UUID NOT NULL REFERENCES activities(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'won', 'lost')),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    allocated_at TIMESTAMP WITH TIME ZONE,
+    UNIQUE(activity_id, user_id)
+);
+
+-- The allocator only looks for activities with undrawn entries
+CREATE INDEX IF NOT EXISTS idx_ballot_entries_pending
+ON ballot_entries(activity_id)
+WHERE status = 'pending';
@@ -0,0 +1,17 @@
+-- Migration: Idempotency-Key support for retried POSTs
+-- One row per (caller, endpoint, key). status_code is NULL while the first
+-- attempt is running; afterwards the response is replayed to retries until
+-- expires_at.
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key VARCHAR(64) PRIMARY KEY,
+    request_hash VARCHAR(64) NOT NULL,
+    status_code INTEGER,
+    content_type VARCHAR(100),
+    body BYTEA,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Hourly purge of expired records
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON idempotency_keys(expires_at);
@@ -0,0 +1,6 @@
+-- Migration: Composite index for keyset pagination of GET /api/notifications/user/{id}
+-- Matches ORDER BY created_at DESC, id DESC for one user (scanned backwards)
+-- and the (created_at, id) < (...) cursor predicate, so a page costs the
+-- same however long the user's history is.
+
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created_id ON notifications(user_id, created_at, id);
@@ -0,0 +1,16 @@
+-- Migration: Resume bulk notification jobs after a crash
+-- Jobs run as in-process background tasks, so a restart mid-send used to
+-- leave them 'running' forever. The runner now records a heartbeat on every
+-- progress commit; a periodic reaper resumes jobs whose heartbeat went stale
+-- and fails them after NOTIFICATION_JOB_MAX_ATTEMPTS runs.
+
+ALTER TABLE notification_jobs
+ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE notification_jobs
+ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITH TIME ZONE;
+
+-- The reaper scans unfinished jobs only
+CREATE INDEX IF NOT EXISTS idx_notification_jobs_unfinished
+ON notification_jobs(status)
+WHERE status IN ('queued', 'running');
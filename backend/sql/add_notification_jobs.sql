@@ -0,0 +1,26 @@
+-- Migration: Background jobs for bulk notification sends
+-- POST /api/notifications/send-bulk now writes the job and its pending
+-- notifications in one transaction and returns 202; the job sends them with
+-- bounded concurrency and records progress on the job row.
+
+CREATE TABLE IF NOT EXISTS notification_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    created_by UUID,
+    message TEXT NOT NULL,
+    channel VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+    total INTEGER NOT NULL DEFAULT 0,
+    successful INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
+ALTER TABLE notifications
+ADD COLUMN IF NOT EXISTS job_id UUID REFERENCES notification_jobs(id) ON DELETE SET NULL;
+
+-- The job runner fetches its own pending notifications
+CREATE INDEX IF NOT EXISTS idx_notifications_job
+ON notifications(job_id)
+WHERE job_id IS NOT NULL;
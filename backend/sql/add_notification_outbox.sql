@@ -0,0 +1,24 @@
+-- Migration: Transactional outbox for registration and match notifications
+-- Rows are inserted in the same transaction as the registration / match
+-- change; the dispatcher drains pending rows in batches, so API requests
+-- never wait on Twilio.
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind VARCHAR(40) NOT NULL,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    activity_id UUID REFERENCES activities(id) ON DELETE CASCADE,
+    dedupe_key VARCHAR(200) UNIQUE,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed', 'duplicate', 'skipped')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    delivered_channels VARCHAR(50) NOT NULL DEFAULT '',
+    last_error TEXT,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    processed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- The dispatcher only scans due, pending rows
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+ON notification_outbox(next_attempt_at)
+WHERE status = 'pending';
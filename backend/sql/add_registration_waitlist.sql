@@ -0,0 +1,11 @@
+-- Migration: Waitlist for full activities
+-- waitlist_position orders the queue per activity (lowest is promoted first);
+-- it is cleared when a registration is promoted or cancelled.
+
+ALTER TABLE registrations
+ADD COLUMN IF NOT EXISTS waitlist_position INTEGER;
+
+-- Queue head and "how many ahead of me" lookups only touch waiting rows
+CREATE INDEX IF NOT EXISTS idx_registrations_waitlist
+ON registrations(activity_id, waitlist_position)
+WHERE status = 'waitlist';
@@ -0,0 +1,18 @@
+-- Migration: Temporary seat holds for the participant swiper
+-- A hold takes a seat for a few minutes (held_seats counts against
+-- max_capacity) until it is confirmed, released or reaped by the sweeper.
+
+ALTER TABLE activities
+ADD COLUMN IF NOT EXISTS held_seats INTEGER NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS seat_holds (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    activity_id UUID NOT NULL REFERENCES activities(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(activity_id, user_id)
+);
+
+-- The sweeper deletes by expiry
+CREATE INDEX IF NOT EXISTS idx_seat_holds_expires ON seat_holds(expires_at);
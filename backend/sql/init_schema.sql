@@ -29,10 +29,14 @@ CREATE TABLE IF NOT EXISTS activities (
     location VARCHAR(255),
     max_capacity INTEGER NOT NULL,
     current_participants INTEGER DEFAULT 0,
+    held_seats INTEGER NOT NULL DEFAULT 0,
+    seats_updated_at TIMESTAMP WITH TIME ZONE,
     program_type VARCHAR(50),
     wheelchair_accessible BOOLEAN DEFAULT TRUE,
     payment_required BOOLEAN DEFAULT FALSE,
     created_by_staff_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    ballot_closes_at TIMESTAMP WITH TIME ZONE,
+    reminder_sent_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE
 );
@@ -43,6 +47,7 @@ CREATE TABLE IF NOT EXISTS registrations (
     user_id UUID REFERENCES users(id) ON DELETE CASCADE,
     activity_id UUID REFERENCES activities(id) ON DELETE CASCADE,
     status VARCHAR(20) DEFAULT 'confirmed' CHECK (status IN ('confirmed', 'cancelled', 'waitlist')),
+    waitlist_position INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE,
     UNIQUE(user_id, activity_id)
@@ -59,14 +64,86 @@ CREATE TABLE IF NOT EXISTS volunteer_matches (
     UNIQUE(volunteer_id, activity_id)
 );
 
+-- Ballot entries (lottery registrations for oversubscribed activities)
+CREATE TABLE IF NOT EXISTS ballot_entries (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    activity_id UUID NOT NULL REFERENCES activities(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'won', 'lost')),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    allocated_at TIMESTAMP WITH TIME ZONE,
+    UNIQUE(activity_id, user_id)
+);
+
+-- Seat holds (short-lived reservations from the swiper, counted in held_seats)
+CREATE TABLE IF NOT EXISTS seat_holds (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    activity_id UUID NOT NULL REFERENCES activities(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(activity_id, user_id)
+);
+
+-- Notifications to send, written in the same transaction as the change they announce
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind VARCHAR(40) NOT NULL,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    activity_id UUID REFERENCES activities(id) ON DELETE CASCADE,
+    dedupe_key VARCHAR(200) UNIQUE,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed', 'duplicate', 'skipped')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    delivered_channels VARCHAR(50) NOT NULL DEFAULT '',
+    last_error TEXT,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    processed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Bulk notification sends, run in the background and polled for progress
+CREATE TABLE IF NOT EXISTS notification_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    created_by UUID,
+    message TEXT NOT NULL,
+    channel VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+    total INTEGER NOT NULL DEFAULT 0,
+    successful INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    heartbeat_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Stored responses for Idempotency-Key retries
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key VARCHAR(64) PRIMARY KEY,
+    request_hash VARCHAR(64) NOT NULL,
+    status_code INTEGER,
+    content_type VARCHAR(100),
+    body BYTEA,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
 CREATE INDEX IF NOT EXISTS idx_activities_date ON activities(date);
+CREATE INDEX IF NOT EXISTS idx_activities_date_start_id ON activities(date, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_activities_reminder_due ON activities(date, start_time) WHERE reminder_sent_at IS NULL;
 CREATE INDEX IF NOT EXISTS idx_activities_program_type ON activities(program_type);
 CREATE INDEX IF NOT EXISTS idx_activities_created_by ON activities(created_by_staff_id);
 CREATE INDEX IF NOT EXISTS idx_registrations_user ON registrations(user_id);
 CREATE INDEX IF NOT EXISTS idx_registrations_activity ON registrations(activity_id);
+CREATE INDEX IF NOT EXISTS idx_registrations_waitlist ON registrations(activity_id, waitlist_position) WHERE status = 'waitlist';
+CREATE INDEX IF NOT EXISTS idx_ballot_entries_pending ON ballot_entries(activity_id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_seat_holds_expires ON seat_holds(expires_at);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON idempotency_keys(expires_at);
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox(next_attempt_at) WHERE status = 'pending';
 CREATE INDEX IF NOT EXISTS idx_volunteer_matches_volunteer ON volunteer_matches(volunteer_id);
 CREATE INDEX IF NOT EXISTS idx_volunteer_matches_activity ON volunteer_matches(activity_id);
 
@@ -44,3 +44,56 @@ def mock_staff_user():
         email='staff@example.com',
         role='staff'
     )
+
+
+@pytest.fixture
+async def sqlite_sessionmaker(tmp_path):
+    """
+    Async sessionmaker bound to a throwaway SQLite database with the full schema.
+
+    Postgres UUID columns are rendered as CHAR(32) so the models work on SQLite.
+    """
+    from sqlalchemy.dialects.postgresql import UUID as PGUUID
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from sqlalchemy.ext.compiler import compiles
+
+    @compiles(PGUUID, 'sqlite')
+    def _compile_uuid(type_, compiler, **kw):
+        return 'CHAR(32)'
+
+    from app.db.base import Base
+    from app.db import models  # noqa: F401  (register tables)
+
+    # Generous busy timeout so concurrency tests queue on SQLite's write lock
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+        connect_args={"timeout": 30}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    await engine.dispose()
+
+
+@pytest.fixture
+def query_counter():
+    """Count SQL statements executed on an engine: ``with query_counter(engine) as counter``."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _count(engine):
+        counter = {"count": 0}
+
+        def _before_execute(*args, **kwargs):
+            counter["count"] += 1
+
+        event.listen(engine, "before_cursor_execute", _before_execute)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, "before_cursor_execute", _before_execute)
+
+    return _count
@@ -0,0 +1,233 @@
+"""
+Unit tests for ActivityCatalogCache.
+
+Tests:
+- Cached pages match the database path (ordering, totals, cursors),
+  including pages topped up with past activities
+- Pages starting among past activities are left to the database
+- Concurrent misses share a single load
+- Participant-count changes patch counts without reloading; edits reload,
+  and so do edits to a point of contact's details
+- Swiper filters (past, excluded, wheelchair, capacity)
+"""
+
+import asyncio
+import json
+import pytest
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import uuid4
+
+from app.core.enums import Role
+from app.db.models import Activity, User
+from app.services import activity_catalog_cache, catalog_version
+from app.services.activity_catalog_cache import ActivityCatalogCache
+from app.services.activity_response_builder import ActivityResponseBuilder
+from app.services.activity_service import ActivityService
+
+
+@pytest.fixture(autouse=True)
+def fresh_singletons(monkeypatch):
+    """Each test gets its own catalog version (its lock binds to the test's loop)"""
+    monkeypatch.setattr(catalog_version, "_catalog_version_instance", None)
+    monkeypatch.setattr(activity_catalog_cache, "_catalog_cache_instance", None)
+
+
+async def _seed(db, n=12):
+    today = date.today()
+    activities = [
+        Activity(
+            id=uuid4(),
+            title=f"Activity {i}",
+            title_zh=f"活动 {i}" if i % 2 else None,
+            date=today + timedelta(days=(i % 5) - 1),
+            start_time=time(9 + i % 2, 0),
+            end_time=time(12, 0),
+            max_capacity=3,
+            current_participants=3 if i == 4 else 0,
+            program_type="arts" if i % 3 else "sports",
+            wheelchair_accessible=i % 4 != 0,
+        )
+        for i in range(n)
+    ]
+    db.add_all(activities)
+    await db.commit()
+    return activities
+
+
+class TestActivityCatalogCache:
+    """Tests for ActivityCatalogCache."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kwargs", [
+        {"limit": 3},
+        {"program_type": "arts", "limit": 3},
+        {"limit": 3, "skip": 3},
+        {"date_filter": date.today(), "lang": "zh"},
+        {},
+        {"limit": 4, "skip": 7, "lang": "zh"},
+        {"limit": 3, "skip": 10},
+        {"program_type": "sports", "limit": 2, "skip": 2},
+    ])
+    async def test_page_matches_database_path(self, sqlite_sessionmaker, kwargs):
+        lang = kwargs.pop("lang", None)
+        async with sqlite_sessionmaker() as db:
+            await _seed(db)
+            body, total, last = await ActivityCatalogCache().list_page(db, lang=lang, **kwargs)
+
+            activities, db_total, has_more = await ActivityService(db).get_page(**kwargs)
+            expected = await ActivityResponseBuilder(db, lang).build_many(activities)
+
+        cached = json.loads(body)
+        assert [a["id"] for a in cached] == [str(a.id) for a in activities]
+        assert [a["title"] for a in cached] == [a["title"] for a in expected]
+        assert total == db_total
+        assert (last is not None) == has_more
+        if last:
+            assert last == (activities[-1].date, activities[-1].start_time, activities[-1].id)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kwargs", [
+        {"date_filter": date.today() - timedelta(days=1)},
+        {"after": (date.today() - timedelta(days=1), time(23, 0), uuid4())},
+    ])
+    async def test_pages_starting_among_past_activities_use_database(self, sqlite_sessionmaker, kwargs):
+        async with sqlite_sessionmaker() as db:
+            await _seed(db)
+
+            assert await ActivityCatalogCache().list_page(db, **kwargs) is None
+
+    @pytest.mark.asyncio
+    async def test_keyset_walk_hands_off_to_database(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            seeded = await _seed(db)
+            cache = ActivityCatalogCache()
+
+            # The cache serves pages (topped up with past activities) until the
+            # cursor lands among past activities; the database does the rest
+            seen, after = [], None
+            while (page := await cache.list_page(db, limit=4, after=after)) is not None:
+                body, _, after = page
+                seen.extend(a["id"] for a in json.loads(body))
+                if after is None:
+                    break
+            while after is not None:
+                activities, _, has_more = await ActivityService(db).get_page(limit=4, after=after)
+                seen.extend(str(a.id) for a in activities)
+                if not has_more:
+                    break
+                after = (activities[-1].date, activities[-1].start_time, activities[-1].id)
+
+        assert sorted(seen) == sorted(str(a.id) for a in seeded)
+        assert len(seen) == len(set(seen))
+        assert cache.loads == 1
+        assert cache.stats()["activities"] == sum(1 for a in seeded if a.date >= date.today())
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            await _seed(db)
+        cache = ActivityCatalogCache()
+
+        async def read():
+            async with sqlite_sessionmaker() as db:
+                return await cache.list_available(db)
+
+        results = await asyncio.gather(*(read() for _ in range(10)))
+
+        assert cache.loads == 1
+        assert len(set(results)) == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hits"] == 9
+
+    @pytest.mark.asyncio
+    async def test_participant_change_patches_counts(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activities = await _seed(db)
+            cache = ActivityCatalogCache()
+            target = activities[1]
+
+            before = json.loads(await cache.list_available(db, lang="zh"))
+            await ActivityService(db).increment_participants(target.id)
+            after = json.loads(await cache.list_available(db, lang="zh"))
+            full = json.loads(await cache.list_available(db))
+
+        count = lambda payload: next(a["current_participants"] for a in payload if a["id"] == str(target.id))
+        assert count(after) == count(before) + 1
+        assert count(full) == count(before) + 1
+        assert [a for a in after if a["id"] != str(target.id)] == [a for a in before if a["id"] != str(target.id)]
+        assert (cache.loads, cache.count_refreshes) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_activity_edit_reloads(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activities = await _seed(db)
+            cache = ActivityCatalogCache()
+            await cache.list_available(db)
+
+            activities[1].title = "Renamed"
+            activities[1].updated_at = datetime(2030, 1, 1, tzinfo=timezone.utc)  # SQLite now() has 1 s resolution
+            await db.commit()
+            catalog_version.get_catalog_version().bump()
+            titles = [a["title"] for a in json.loads(await cache.list_available(db))]
+
+        assert "Renamed" in titles
+        assert (cache.loads, cache.count_refreshes) == (2, 0)
+
+    @pytest.mark.asyncio
+    async def test_contact_change_reloads(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            staff = User(id=uuid4(), email="s@example.com", hashed_password="x", role=Role.STAFF, phone="+6590000001")
+            db.add(staff)
+            activities = await _seed(db)
+            activities[1].created_by_staff_id = staff.id
+            for activity in activities:
+                # SQLite now() has 1 s resolution
+                activity.created_at = activity.updated_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
+            await db.commit()
+            cache = ActivityCatalogCache()
+            await cache.list_available(db)
+
+            staff.phone = "+6590000002"
+            await ActivityService(db).publish_contact_change(staff.id)
+            await db.commit()
+            catalog_version.get_catalog_version().bump()
+            available = json.loads(await cache.list_available(db))
+
+        [contact] = [a["point_of_contact"] for a in available if a["id"] == str(activities[1].id)]
+        assert contact["phone"] == "+6590000002"
+        assert cache.loads == 2
+
+    @pytest.mark.asyncio
+    async def test_available_filters(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activities = await _seed(db)
+            cache = ActivityCatalogCache()
+            excluded = activities[2].id
+
+            available = json.loads(await cache.list_available(
+                db, exclude_ids={excluded}, wheelchair_only=True, require_spots=True, lang="en"
+            ))
+
+        by_id = {str(a.id): a for a in activities}
+        ids = [a["id"] for a in available]
+        assert str(excluded) not in ids
+        assert str(activities[4].id) not in ids  # full
+        for activity_id in ids:
+            activity = by_id[activity_id]
+            assert activity.date >= date.today()
+            assert activity.wheelchair_accessible
+        assert ids == sorted(ids, key=lambda i: (by_id[i].date, by_id[i].start_time, by_id[i].id))
+        assert all(a["language"] == "en" for a in available)
+
+    @pytest.mark.asyncio
+    async def test_stats_report_footprint(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            await _seed(db)
+            cache = ActivityCatalogCache()
+            await cache.list_available(db)
+            await cache.list_available(db, lang="zh")
+
+        stats = cache.stats()
+        assert stats["activities"] == 9  # upcoming only
+        assert stats["languages"] == ["*", "zh"]
+        assert stats["encoded_bytes"] > 0
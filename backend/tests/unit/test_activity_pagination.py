@@ -0,0 +1,184 @@
+"""
+Unit tests for ActivityService keyset pagination.
+
+Tests:
+- Walking pages by keyset returns every row once, in offset order
+- Window-function total matches the filtered count on every page
+- Offset pagination still works
+- Cached approximate count (bounded, cleared by catalog invalidation)
+- Column projection keeps untouched translation columns out of the SELECT
+"""
+
+import pytest
+from datetime import date, time, timedelta
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.invalidation import InvalidationBus, TOPIC_CATALOG
+from app.db.models import Activity
+from app.services import activity_service
+from app.services.activity_service import ActivityService
+from app.services.activity_response_builder import activity_columns
+
+
+async def _seed(db, n=23):
+    base = date.today()
+    activities = [
+        Activity(
+            id=uuid4(),
+            title=f"Activity {i}",
+            # Several activities share a date and start time to exercise the id tie-breaker
+            date=base + timedelta(days=i % 4),
+            start_time=time(9 + i % 3, 0),
+            end_time=time(12, 0),
+            max_capacity=10,
+            current_participants=0,
+            program_type="arts" if i % 2 else "sports",
+        )
+        for i in range(n)
+    ]
+    db.add_all(activities)
+    await db.commit()
+    return activities
+
+
+class TestActivityPagination:
+    """Tests for ActivityService.get_page."""
+
+    @pytest.mark.asyncio
+    async def test_keyset_walk_matches_offset_order(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            await _seed(db)
+            service = ActivityService(db)
+            expected = [a.id for a in await service.get_with_filters(limit=100)]
+
+            seen, after, totals = [], None, set()
+            while True:
+                page, total, has_more = await service.get_page(limit=5, after=after)
+                seen.extend(a.id for a in page)
+                totals.add(total)
+                if not has_more:
+                    break
+                last = page[-1]
+                after = (last.date, last.start_time, last.id)
+
+        assert seen == expected
+        assert len(seen) == 23
+        assert totals == {23}
+
+    @pytest.mark.asyncio
+    async def test_filtered_total_and_has_more(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            await _seed(db)
+            service = ActivityService(db)
+
+            page, total, has_more = await service.get_page(program_type="arts", limit=100)
+
+        assert total == 11
+        assert len(page) == 11
+        assert has_more is False
+        assert all(a.program_type == "arts" for a in page)
+
+    @pytest.mark.asyncio
+    async def test_without_total(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            await _seed(db)
+
+            page, total, has_more = await ActivityService(db).get_page(limit=10, with_total=False)
+
+        assert total is None
+        assert len(page) == 10
+        assert has_more is True
+
+    @pytest.mark.asyncio
+    async def test_offset_pagination_still_supported(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            await _seed(db)
+            service = ActivityService(db)
+            expected = [a.id for a in await service.get_with_filters(limit=100)]
+
+            page, total, _ = await service.get_page(limit=5, skip=20)
+
+        assert [a.id for a in page] == expected[20:]
+        assert total == 23
+
+    @pytest.mark.asyncio
+    async def test_total_past_end_of_results(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            await _seed(db)
+
+            page, total, has_more = await ActivityService(db).get_page(limit=5, skip=100)
+
+        assert page == []
+        assert total == 23
+        assert has_more is False
+
+    @pytest.mark.asyncio
+    async def test_approximate_count_is_cached(self, sqlite_sessionmaker):
+        activity_service._count_cache.clear()
+        async with sqlite_sessionmaker() as db:
+            await _seed(db, n=4)
+            service = ActivityService(db)
+
+            first = await service.count_filtered_cached()
+            await _seed(db, n=2)
+            cached = await service.count_filtered_cached()
+            exact = await service.count_filtered()
+
+        activity_service._count_cache.clear()
+        assert first == cached == 4
+        assert exact == 6
+
+    @pytest.mark.asyncio
+    async def test_approximate_count_cache_is_bounded(self, sqlite_sessionmaker, monkeypatch):
+        monkeypatch.setattr(settings, "ACTIVITY_COUNT_CACHE_MAX_SIZE", 2)
+        activity_service._count_cache.clear()
+        async with sqlite_sessionmaker() as db:
+            service = ActivityService(db)
+            for program_type in ("arts", "sports", "music"):
+                await service.count_filtered_cached(program_type=program_type)
+
+        keys = list(activity_service._count_cache)
+        activity_service._count_cache.clear()
+        assert keys == [(None, "sports"), (None, "music")]
+
+    @pytest.mark.asyncio
+    async def test_catalog_invalidation_clears_counts(self, sqlite_sessionmaker):
+        activity_service._count_cache.clear()
+        async with sqlite_sessionmaker() as db:
+            await _seed(db, n=4)
+            service = ActivityService(db)
+
+            await service.count_filtered_cached()
+            await _seed(db, n=2)
+            bus = InvalidationBus("postgresql://unused")
+            bus.subscribe(TOPIC_CATALOG, activity_service.clear_count_cache)
+            bus.handle_payload('{"t":"catalog","o":"other-worker"}')
+            refreshed = await service.count_filtered_cached()
+
+        activity_service._count_cache.clear()
+        assert refreshed == 6
+
+    @pytest.mark.asyncio
+    async def test_projected_columns_narrow_the_select(self, sqlite_sessionmaker):
+        from sqlalchemy import event
+
+        async with sqlite_sessionmaker() as db:
+            await _seed(db, n=3)
+            db.expunge_all()
+            statements = []
+
+            def capture(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            engine = db.bind.sync_engine
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                page, total, _ = await ActivityService(db).get_page(limit=5, columns=activity_columns("zh"))
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+
+        assert total == 3
+        assert "title_zh" in statements[0]
+        assert "title_ms" not in statements[0]
+        assert "description_ta" not in statements[0]
@@ -0,0 +1,188 @@
+"""
+Unit tests for ActivityResponseBuilder.
+
+Tests:
+- Point of contact attached from the creating staff member
+- Whole batch resolves contacts with a single query
+- Activities without a staff id get no contact
+- Fast payloads match the Pydantic response schemas byte-for-byte
+- Language projection and language resolution
+"""
+
+import json
+import pytest
+from unittest.mock import MagicMock
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import uuid4
+
+from app.core.enums import Role, RegistrationStatus
+from app.core.responses import dumps
+from app.db.models import Activity, Registration, User
+from app.models.activity import ActivityResponse
+from app.models.registration import RegistrationWithActivity
+from app.services.activity_response_builder import (
+    ActivityResponseBuilder,
+    activity_columns,
+    resolve_language,
+)
+
+
+def _activity(staff_id=None, **overrides):
+    data = dict(
+        id=uuid4(),
+        title="Art Jam",
+        description="Painting session",
+        date=date.today() + timedelta(days=1),
+        start_time=time(10, 0),
+        end_time=time(11, 0),
+        location="Hall",
+        max_capacity=10,
+        current_participants=0,
+        created_by_staff_id=staff_id,
+    )
+    data.update(overrides)
+    return Activity(**data)
+
+
+def _staff(name):
+    return User(
+        id=uuid4(),
+        email=f"{name}@minds.org",
+        hashed_password="x",
+        role=Role.STAFF,
+        full_name=name.title(),
+        phone="+6590000000",
+    )
+
+
+class TestActivityResponseBuilder:
+    """Tests for ActivityResponseBuilder."""
+
+    @pytest.mark.asyncio
+    async def test_build_attaches_point_of_contact(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            staff = _staff("alice")
+            activity = _activity(staff.id)
+            db.add_all([staff, activity])
+            await db.commit()
+
+            response = await ActivityResponseBuilder(db).build(activity)
+
+        assert response["id"] == activity.id
+        assert response["point_of_contact"]["full_name"] == "Alice"
+        assert response["point_of_contact"]["email"] == "alice@minds.org"
+
+    @pytest.mark.asyncio
+    async def test_build_many_uses_one_contact_query(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            staff = [_staff("alice"), _staff("bob"), _staff("carol")]
+            activities = [_activity(staff[i % 3].id, title=f"Activity {i}") for i in range(30)]
+            db.add_all(staff + activities)
+            await db.commit()
+
+            with query_counter(db.bind.sync_engine) as counter:
+                responses = await ActivityResponseBuilder(db).build_many(activities)
+
+        assert counter["count"] == 1
+        assert [r["title"] for r in responses] == [a.title for a in activities]
+        assert {r["point_of_contact"]["full_name"] for r in responses} == {"Alice", "Bob", "Carol"}
+
+    @pytest.mark.asyncio
+    async def test_build_many_without_staff_skips_query(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            activity = _activity()
+            db.add(activity)
+            await db.commit()
+
+            with query_counter(db.bind.sync_engine) as counter:
+                responses = await ActivityResponseBuilder(db).build_many([activity])
+
+        assert counter["count"] == 0
+        assert responses[0]["point_of_contact"] is None
+
+    @pytest.mark.asyncio
+    async def test_payload_matches_pydantic_serialization(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            staff = _staff("alice")
+            activity = _activity(
+                staff.id,
+                title_zh="艺术",
+                created_at=datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc),
+            )
+            db.add_all([staff, activity])
+            await db.commit()
+
+            payload = await ActivityResponseBuilder(db).build(activity)
+
+        expected = ActivityResponse.model_validate(payload).model_dump_json()
+        assert json.loads(dumps(payload)) == json.loads(expected)
+
+    @pytest.mark.asyncio
+    async def test_registration_payload_matches_schema(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            staff = _staff("alice")
+            activity = _activity(staff.id)
+            participant = _staff("pat")
+            participant.role = Role.PARTICIPANT
+            registration = Registration(
+                id=uuid4(),
+                user_id=participant.id,
+                activity=activity,
+                status=RegistrationStatus.CONFIRMED,
+                created_at=datetime(2025, 1, 2, tzinfo=timezone.utc),
+            )
+            db.add_all([staff, participant, activity, registration])
+            await db.commit()
+
+            payloads = await ActivityResponseBuilder(db).build_registrations([registration])
+
+        expected = RegistrationWithActivity.model_validate(payloads[0]).model_dump_json()
+        assert json.loads(dumps(payloads[0])) == json.loads(expected)
+
+    @pytest.mark.asyncio
+    async def test_projected_payload_localizes_and_falls_back(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            translated = _activity(title_zh="艺术", description_zh="绘画")
+            untranslated = _activity(title="Bowling", description="Lanes")
+            db.add_all([translated, untranslated])
+            await db.commit()
+
+            payloads = await ActivityResponseBuilder(db, "zh").build_many([translated, untranslated])
+
+        assert payloads[0]["title"] == "艺术"
+        assert payloads[0]["description"] == "绘画"
+        assert payloads[1]["title"] == "Bowling"
+        assert payloads[1]["description"] == "Lanes"
+        assert all(p["language"] == "zh" for p in payloads)
+        assert not any(key.startswith("title_") for p in payloads for key in p)
+        ActivityResponse.model_validate(payloads[0])
+
+    def test_activity_columns_projection(self):
+        zh = {c.key for c in activity_columns("zh")}
+        en = {c.key for c in activity_columns("en")}
+        full = {c.key for c in activity_columns(None)}
+
+        assert {"title_zh", "description_zh"} <= zh
+        assert "title_ms" not in zh
+        assert not any(key.startswith("title_") for key in en)
+        assert {"title_zh", "title_ms", "title_ta"} <= full
+
+
+class TestResolveLanguage:
+    """Tests for resolve_language."""
+
+    def _user(self, **metadata):
+        return MagicMock(user_metadata=metadata)
+
+    def test_explicit_lang_wins(self):
+        assert resolve_language("ms", self._user(preferred_language="zh")) == "ms"
+
+    def test_defaults_to_preferred_language(self):
+        assert resolve_language(None, self._user(role="participant", preferred_language="ta")) == "ta"
+
+    def test_unknown_preference_gets_full_payload(self):
+        assert resolve_language(None, self._user(preferred_language="fr")) is None
+
+    def test_staff_and_anonymous_get_full_payload(self):
+        assert resolve_language(None, self._user(role="staff", preferred_language="zh")) is None
+        assert resolve_language(None, None) is None
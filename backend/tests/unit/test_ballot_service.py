@@ -0,0 +1,206 @@
+"""
+Unit tests for BallotService.
+
+Tests:
+- Entries are idempotent and only recorded while the window is open
+- The draw fills free seats, waitlists the rest in draw order and skips
+  entrants with time conflicts or at their weekly limit
+- The draw is a single pass with a bounded number of queries
+- Every entrant's outcome is queued in the outbox with the draw
+"""
+
+import random
+import pytest
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import func, select
+
+from app.core.enums import BallotStatus, MembershipType, NotificationKind, RegistrationStatus, Role
+from app.db.models import Activity, BallotEntry, OutboxMessage, Registration, User
+from app.services import catalog_version
+from app.services.ballot_service import BallotService
+from app.services.registration_service import RegistrationService
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog_version(monkeypatch):
+    monkeypatch.setattr(catalog_version, "_catalog_version_instance", None)
+
+
+def _monday():
+    return date.today() + timedelta(days=7 - date.today().weekday())
+
+
+async def _activity(db, **overrides):
+    data = dict(
+        id=uuid4(),
+        title="Swimming Lessons",
+        date=_monday() + timedelta(days=2),
+        start_time=time(10, 0),
+        end_time=time(12, 0),
+        max_capacity=10,
+        current_participants=0,
+        ballot_closes_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+    )
+    data.update(overrides)
+    activity = Activity(**data)
+    db.add(activity)
+    await db.commit()
+    return activity
+
+
+async def _users(db, n, **overrides):
+    users = [
+        User(id=uuid4(), email=f"{uuid4().hex}@example.com", hashed_password="x",
+             role=Role.PARTICIPANT, **overrides)
+        for _ in range(n)
+    ]
+    db.add_all(users)
+    await db.commit()
+    return users
+
+
+class TestBallotEntries:
+    """Tests for entering a ballot."""
+
+    def test_is_open(self):
+        now = datetime.now(timezone.utc)
+        assert BallotService.is_open(Activity(ballot_closes_at=now + timedelta(hours=1)))
+        assert not BallotService.is_open(Activity(ballot_closes_at=now - timedelta(hours=1)))
+        assert not BallotService.is_open(Activity(ballot_closes_at=None))
+
+    @pytest.mark.asyncio
+    async def test_enter_is_idempotent(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db)
+            user_id = uuid4()
+            service = BallotService(db)
+
+            first = await service.enter(user_id, activity.id)
+            second = await service.enter(user_id, activity.id)
+
+            assert first.id == second.id
+            assert first.status == BallotStatus.PENDING
+
+    @pytest.mark.asyncio
+    async def test_due_only_after_close(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            closed = await _activity(db)
+            still_open = await _activity(db, ballot_closes_at=datetime.now(timezone.utc) + timedelta(hours=1))
+            service = BallotService(db)
+            await service.enter(uuid4(), closed.id)
+            await service.enter(uuid4(), still_open.id)
+
+            assert await service.due_activity_ids() == [closed.id]
+
+
+class TestBallotAllocation:
+    """Tests for BallotService.allocate."""
+
+    @pytest.mark.asyncio
+    async def test_draw_fills_seats_and_waitlists_rest(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=10, current_participants=2)
+            entrants = await _users(db, 30)
+            service = BallotService(db)
+            for user in entrants:
+                await service.enter(user.id, activity.id)
+
+            with query_counter(db.bind.sync_engine) as counter:
+                result = await service.allocate(activity.id, rng=random.Random(7))
+
+            assert len(result.winners) == 8
+            assert len(result.waitlisted) == 22
+            assert result.ineligible == []
+            # Batched: independent of the number of entrants
+            assert counter["count"] <= 11
+
+            refreshed = await db.get(Activity, activity.id)
+            assert refreshed.current_participants == 10
+
+            waitlist = (await db.execute(
+                select(Registration.user_id)
+                .where(Registration.activity_id == activity.id, Registration.status == RegistrationStatus.WAITLIST)
+                .order_by(Registration.waitlist_position)
+            )).scalars().all()
+            assert waitlist == result.waitlisted
+
+            pending = (await db.execute(
+                select(func.count(BallotEntry.id)).where(BallotEntry.status == BallotStatus.PENDING)
+            )).scalar_one()
+            assert pending == 0
+
+    @pytest.mark.asyncio
+    async def test_respects_time_conflicts_and_weekly_limits(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db)
+            clash = await _activity(db, start_time=time(11, 0), end_time=time(13, 0), ballot_closes_at=None)
+            earlier = await _activity(db, date=_monday(), ballot_closes_at=None)
+            busy, = await _users(db, 1)
+            limited, = await _users(db, 1, membership_type=MembershipType.ONCE_WEEKLY)
+            free, = await _users(db, 1)
+
+            registrations = RegistrationService(db)
+            await registrations.register(busy.id, clash.id)
+            await registrations.register(limited.id, earlier.id)
+
+            service = BallotService(db)
+            for user in (busy, limited, free):
+                await service.enter(user.id, activity.id)
+
+            result = await service.allocate(activity.id)
+
+            assert result.winners == [free.id]
+            assert sorted(map(str, result.ineligible)) == sorted([str(busy.id), str(limited.id)])
+
+    @pytest.mark.asyncio
+    async def test_outcomes_are_queued_in_outbox(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=2)
+            clash = await _activity(db, start_time=time(11, 0), end_time=time(13, 0), ballot_closes_at=None)
+            entrants = await _users(db, 4)
+            await RegistrationService(db).register(entrants[0].id, clash.id)
+            service = BallotService(db)
+            for user in entrants:
+                await service.enter(user.id, activity.id)
+
+            result = await service.allocate(activity.id, rng=random.Random(3))
+            await service.allocate(activity.id)
+
+            queued = dict((await db.execute(
+                select(OutboxMessage.user_id, OutboxMessage.kind)
+                .where(OutboxMessage.activity_id == activity.id)
+            )).all())
+            assert queued == {
+                **{user_id: NotificationKind.BALLOT_WON.value for user_id in result.winners},
+                **{user_id: NotificationKind.BALLOT_WAITLISTED.value for user_id in result.waitlisted},
+                entrants[0].id: NotificationKind.BALLOT_INELIGIBLE.value,
+            }
+            assert len(result.winners) == 2
+
+    @pytest.mark.asyncio
+    async def test_second_draw_is_noop(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db)
+            service = BallotService(db)
+            await service.enter(uuid4(), activity.id)
+
+            first = await service.allocate(activity.id)
+            second = await service.allocate(activity.id)
+
+            assert len(first.winners) == 1
+            assert second.winners == second.waitlisted == second.ineligible == []
+            assert (await db.get(Activity, activity.id)).current_participants == 1
+
+    @pytest.mark.asyncio
+    async def test_close_now_ends_window(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, ballot_closes_at=datetime.now(timezone.utc) + timedelta(days=1))
+            service = BallotService(db)
+            await service.enter(uuid4(), activity.id)
+
+            result = await service.allocate(activity.id, close_now=True)
+
+            assert len(result.winners) == 1
+            assert not BallotService.is_open(await db.get(Activity, activity.id))
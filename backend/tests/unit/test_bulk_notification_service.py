@@ -0,0 +1,211 @@
+"""
+Unit tests for BulkNotificationService.
+
+Tests:
+- Jobs load recipients in one query and bulk-insert pending notifications
+- Unreachable recipients are counted as failed up front
+- Running a job sends with bounded concurrency and records progress
+- Jobs left queued/running by a dead worker are resumed, or failed once
+  out of attempts
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.enums import Role
+from app.db.models import Notification, NotificationJob, User
+from app.services.bulk_notification_service import BulkNotificationService
+from app.tasks.notification_jobs import resume_stale_jobs, run_notification_job
+
+
+@pytest.fixture
+def messaging():
+    client = MagicMock()
+    client.send_sms = AsyncMock(return_value="sms_sid")
+    client.send_whatsapp = AsyncMock(return_value="whatsapp_sid")
+    with patch("app.services.notification_service.get_messaging_transport", return_value=client):
+        yield client
+
+
+async def _users(db, count, **overrides):
+    users = [
+        User(
+            id=uuid4(),
+            email=f"{uuid4()}@example.com",
+            hashed_password="x",
+            role=Role.PARTICIPANT,
+            phone=overrides.get("phone", f"+659{i:07d}"),
+            caregiver_phone=overrides.get("caregiver_phone"),
+        )
+        for i in range(count)
+    ]
+    db.add_all(users)
+    await db.commit()
+    return users
+
+
+async def _statuses(db, job_id):
+    return sorted((await db.execute(
+        select(Notification.status).where(Notification.job_id == job_id)
+    )).scalars().all())
+
+
+class TestCreateJob:
+    """Tests for BulkNotificationService.create_job."""
+
+    @pytest.mark.asyncio
+    async def test_recipients_loaded_and_inserted_in_bulk(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            users = await _users(db, 50)
+            no_phone = await _users(db, 2, phone=None)
+            user_ids = [u.id for u in users + no_phone] + [uuid4(), users[0].id]
+
+            with query_counter(db.bind.sync_engine) as counter:
+                job = await BulkNotificationService(db).create_job(user_ids, "Centre closed today")
+
+            # recipient SELECT, job INSERT, one executemany INSERT for the notifications
+            assert counter["count"] == 3
+            assert (job.status, job.total, job.successful, job.failed) == ("queued", 53, 0, 3)
+            assert await _statuses(db, job.id) == ["pending"] * 50
+
+    @pytest.mark.asyncio
+    async def test_nobody_to_send_to_completes_immediately(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            job = await BulkNotificationService(db).create_job([uuid4()], "Hello")
+
+            assert (job.status, job.failed) == ("completed", 1)
+
+
+class TestRunJob:
+    """Tests for BulkNotificationService.run."""
+
+    @pytest.mark.asyncio
+    async def test_sends_with_bounded_concurrency(self, sqlite_sessionmaker, messaging, monkeypatch):
+        monkeypatch.setattr(settings, "NOTIFICATION_BULK_CONCURRENCY", 4)
+        monkeypatch.setattr(settings, "NOTIFICATION_BULK_CHUNK_SIZE", 10)
+        in_flight = {"now": 0, "max": 0}
+
+        async def slow_send(phone, message):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return None if phone.endswith("3") else "sid"
+
+        messaging.send_sms.side_effect = slow_send
+        async with sqlite_sessionmaker() as db:
+            users = await _users(db, 25)
+            job = await BulkNotificationService(db).create_job([u.id for u in users], "Reminder")
+
+        await run_notification_job(job.id, sessionmaker=sqlite_sessionmaker)
+
+        async with sqlite_sessionmaker() as db:
+            job = await db.get(NotificationJob, job.id)
+            assert (job.status, job.successful, job.failed) == ("completed", 22, 3)
+            assert job.completed_at is not None
+            assert await _statuses(db, job.id) == ["failed"] * 3 + ["sent"] * 22
+        assert messaging.send_sms.call_count == 25
+        assert in_flight["max"] == 4
+
+    @pytest.mark.asyncio
+    async def test_whatsapp_goes_to_caregiver(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            [user] = await _users(db, 1, caregiver_phone="+6598765432")
+            service = BulkNotificationService(db)
+            job = await service.create_job([user.id], "Update", channel="whatsapp")
+
+            await service.run(job.id)
+
+        messaging.send_whatsapp.assert_called_once_with("+6598765432", "Update")
+        messaging.send_sms.assert_not_called()
+
+
+async def _stale_job(db, users, sent=0, **values):
+    """A job whose runner died after ``sent`` notifications, 10 minutes ago"""
+    job = await BulkNotificationService(db).create_job([u.id for u in users], "Centre closed today")
+    ten_minutes_ago = datetime.now(timezone.utc) - timedelta(minutes=10)
+    pending = (await db.execute(
+        select(Notification.id).where(Notification.job_id == job.id).order_by(Notification.id)
+    )).scalars().all()
+    if sent:
+        await db.execute(update(Notification).where(Notification.id.in_(pending[:sent])).values(status='sent'))
+    values = {"created_at": ten_minutes_ago, "heartbeat_at": ten_minutes_ago, **values}
+    await db.execute(
+        update(NotificationJob).where(NotificationJob.id == job.id).values(successful=sent, **values)
+    )
+    await db.commit()
+    return job.id
+
+
+class TestResumeStaleJobs:
+    """Tests for resume_stale_jobs / BulkNotificationService.claim_stale."""
+
+    @pytest.mark.asyncio
+    async def test_crashed_job_resumes_pending_only(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            users = await _users(db, 5)
+            job_id = await _stale_job(db, users, sent=2, status='running', attempts=1)
+
+        assert await resume_stale_jobs(sessionmaker=sqlite_sessionmaker) == 1
+
+        async with sqlite_sessionmaker() as db:
+            job = await db.get(NotificationJob, job_id)
+            assert (job.status, job.successful, job.failed, job.attempts) == ("completed", 5, 0, 2)
+            assert await _statuses(db, job_id) == ["sent"] * 5
+        assert messaging.send_sms.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_never_started_job_is_run(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            users = await _users(db, 2)
+            job_id = await _stale_job(db, users, heartbeat_at=None)
+
+        assert await resume_stale_jobs(sessionmaker=sqlite_sessionmaker) == 1
+
+        async with sqlite_sessionmaker() as db:
+            assert (await db.get(NotificationJob, job_id)).status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_live_job_is_left_alone(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            users = await _users(db, 2)
+            job_id = await _stale_job(
+                db, users, status='running', attempts=1, heartbeat_at=datetime.now(timezone.utc)
+            )
+
+            assert await BulkNotificationService(db).claim_stale() == []
+            assert (await db.get(NotificationJob, job_id)).status == "running"
+        messaging.send_sms.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_claimed_once_across_workers(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            users = await _users(db, 2)
+            job_id = await _stale_job(db, users, status='running', attempts=1)
+
+        async with sqlite_sessionmaker() as first, sqlite_sessionmaker() as second:
+            assert await BulkNotificationService(first).claim_stale() == [job_id]
+            assert await BulkNotificationService(second).claim_stale() == []
+
+    @pytest.mark.asyncio
+    async def test_out_of_attempts_is_failed(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            users = await _users(db, 4)
+            job_id = await _stale_job(
+                db, users, sent=1, status='running', attempts=settings.NOTIFICATION_JOB_MAX_ATTEMPTS
+            )
+
+        assert await resume_stale_jobs(sessionmaker=sqlite_sessionmaker) == 0
+
+        async with sqlite_sessionmaker() as db:
+            job = await db.get(NotificationJob, job_id)
+            assert (job.status, job.successful, job.failed) == ("failed", 1, 3)
+            assert job.completed_at is not None
+            assert await _statuses(db, job_id) == ["failed"] * 3 + ["sent"]
+        messaging.send_sms.assert_not_called()
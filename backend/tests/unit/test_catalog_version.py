@@ -0,0 +1,91 @@
+"""
+Unit tests for CatalogVersion and the conditional GET helpers.
+"""
+
+import pytest
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import uuid4
+
+from app.core.responses import etag_matches, http_date
+from app.db.models import Activity
+from app.services.catalog_version import CatalogVersion
+
+
+def _activity(**overrides):
+    data = dict(
+        id=uuid4(),
+        title="Art Jam",
+        date=date.today() + timedelta(days=1),
+        start_time=time(10, 0),
+        end_time=time(11, 0),
+        max_capacity=10,
+        current_participants=0,
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+    )
+    data.update(overrides)
+    return Activity(**data)
+
+
+class TestCatalogVersion:
+    """Tests for CatalogVersion."""
+
+    @pytest.mark.asyncio
+    async def test_version_cached_within_ttl(self, sqlite_sessionmaker, query_counter):
+        catalog = CatalogVersion(ttl_seconds=60)
+        async with sqlite_sessionmaker() as db:
+            db.add(_activity())
+            await db.commit()
+
+            with query_counter(db.bind.sync_engine) as counter:
+                first = await catalog.get(db)
+                second = await catalog.get(db)
+
+        assert first == second
+        assert counter["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bump_picks_up_writes(self, sqlite_sessionmaker):
+        catalog = CatalogVersion(ttl_seconds=60)
+        async with sqlite_sessionmaker() as db:
+            activity = _activity()
+            db.add(activity)
+            await db.commit()
+            before = await catalog.get(db)
+
+            activity.updated_at = datetime(2025, 2, 1, tzinfo=timezone.utc)
+            await db.commit()
+            stale = await catalog.get(db)
+            catalog.bump()
+            after_update = await catalog.get(db)
+
+            db.add(_activity())
+            await db.commit()
+            catalog.bump()
+            after_insert = await catalog.get(db)
+
+        assert stale == before
+        assert len({before, after_update, after_insert}) == 3
+
+    def test_etag_depends_on_parts(self):
+        assert CatalogVersion.etag("v1", "list", 10) == CatalogVersion.etag("v1", "list", 10)
+        assert CatalogVersion.etag("v1", "list", 10) != CatalogVersion.etag("v1", "list", 20)
+        assert CatalogVersion.etag("v1", "list") != CatalogVersion.etag("v2", "list")
+        assert CatalogVersion.etag("v1").startswith('"')
+
+
+class TestConditionalHelpers:
+    """Tests for etag_matches / http_date."""
+
+    @pytest.mark.parametrize("header,expected", [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ('"xyz"', False),
+        ("*", True),
+    ])
+    def test_etag_matches(self, header, expected):
+        assert etag_matches(header, '"abc"') is expected
+
+    def test_http_date_naive_is_utc(self):
+        assert http_date(datetime(2025, 1, 2, 3, 4, 5)) == "Thu, 02 Jan 2025 03:04:05 GMT"
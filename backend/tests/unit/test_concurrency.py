@@ -0,0 +1,37 @@
+"""
+Unit tests for the off-event-loop execution helpers.
+"""
+
+import threading
+import pytest
+import bcrypt
+
+from app.core.concurrency import run_blocking, run_in_bcrypt_pool, get_bcrypt_executor
+
+
+class TestConcurrencyHelpers:
+    """Tests for run_blocking and run_in_bcrypt_pool."""
+
+    @pytest.mark.asyncio
+    async def test_bcrypt_runs_in_dedicated_pool(self):
+        """Password hashing should run on a bcrypt pool thread."""
+        thread_name = await run_in_bcrypt_pool(lambda: threading.current_thread().name)
+        assert thread_name.startswith("bcrypt")
+
+    @pytest.mark.asyncio
+    async def test_bcrypt_pool_returns_result(self):
+        """Hashes produced in the pool should verify normally."""
+        hashed = await run_in_bcrypt_pool(bcrypt.hashpw, b"secret", bcrypt.gensalt(rounds=4))
+        assert bcrypt.checkpw(b"secret", hashed)
+
+    def test_bcrypt_pool_is_bounded(self):
+        """Pool size should come from settings."""
+        from app.core.config import settings
+        assert get_bcrypt_executor()._max_workers == settings.BCRYPT_POOL_SIZE
+
+    @pytest.mark.asyncio
+    async def test_run_blocking_off_loop(self):
+        """Blocking calls should not run on the event loop thread."""
+        loop_thread = threading.current_thread().name
+        worker_thread = await run_blocking(lambda: threading.current_thread().name)
+        assert worker_thread != loop_thread
@@ -0,0 +1,38 @@
+"""
+Unit tests for pagination cursor helpers.
+"""
+
+import pytest
+from datetime import date, datetime, time, timezone
+from uuid import UUID, uuid4
+
+from app.utils.cursors import encode_cursor, decode_cursor, InvalidCursorError
+
+
+class TestCursors:
+    """Tests for encode_cursor / decode_cursor."""
+
+    def test_round_trip_typed_values(self):
+        values = (date(2025, 3, 1), time(9, 30), uuid4())
+
+        token = encode_cursor(values)
+
+        assert decode_cursor(token, (date.fromisoformat, time.fromisoformat, UUID)) == list(values)
+
+    def test_round_trip_datetime(self):
+        values = (datetime(2025, 3, 1, 9, 30, 15, 1234, tzinfo=timezone.utc), uuid4())
+
+        token = encode_cursor(values)
+
+        assert decode_cursor(token, (datetime.fromisoformat, UUID)) == list(values)
+
+    def test_token_is_url_safe(self):
+        token = encode_cursor((date(2025, 3, 1), "a/b+c?"))
+
+        assert "=" not in token
+        assert all(c.isalnum() or c in "-_" for c in token)
+
+    @pytest.mark.parametrize("token", ["not-base64!!", "e30", encode_cursor(("x",)), encode_cursor(("bad-date", "09:00", "x"))])
+    def test_malformed_cursor_raises(self, token):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(token, (date.fromisoformat, time.fromisoformat, UUID))
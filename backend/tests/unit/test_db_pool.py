@@ -0,0 +1,113 @@
+"""
+Unit tests for connection pool profiles and metrics.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.pool import (
+    InstrumentedAsyncQueuePool,
+    attach_metrics,
+    build_engine_options,
+    pool_status,
+)
+
+
+PG_URL = make_url("postgresql+asyncpg://user:pw@db.example.supabase.co:6543/postgres")
+
+
+class TestBuildEngineOptions:
+    """Tests for profile -> create_async_engine kwargs"""
+
+    def test_direct_profile_keeps_prepared_statements(self):
+        options = build_engine_options(PG_URL, "direct")
+
+        assert options["poolclass"] is InstrumentedAsyncQueuePool
+        assert options["pool_pre_ping"] is True
+        assert options["pool_recycle"] == 1800
+        assert "connect_args" not in options
+
+    def test_pgbouncer_profile_disables_statement_caches(self):
+        options = build_engine_options(PG_URL, "pgbouncer_transaction")
+
+        connect_args = options["connect_args"]
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+
+    def test_serverless_profile_uses_null_pool(self):
+        options = build_engine_options(PG_URL, "serverless")
+
+        assert options["poolclass"] is NullPool
+        assert "pool_size" not in options
+        assert options["connect_args"]["statement_cache_size"] == 0
+
+    def test_overrides_replace_profile_values(self):
+        options = build_engine_options(PG_URL, "direct", {"pool_size": 20, "pool_timeout": None})
+
+        assert options["pool_size"] == 20
+        assert options["pool_timeout"] == 30
+
+    def test_non_asyncpg_driver_gets_no_asyncpg_args(self):
+        options = build_engine_options(make_url("sqlite+aiosqlite:///x.db"), "pgbouncer_transaction")
+
+        assert "connect_args" not in options
+
+    def test_unknown_profile_raises(self):
+        with pytest.raises(ValueError):
+            build_engine_options(PG_URL, "bogus")
+
+
+class TestPoolMetrics:
+    """Tests for checkout wait and saturation metrics"""
+
+    @pytest.fixture
+    async def engine(self, tmp_path):
+        url = make_url(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+        options = build_engine_options(url, "direct", {"pool_size": 1, "max_overflow": 0, "pool_timeout": 1})
+        engine = create_async_engine(url, **options)
+        attach_metrics(engine.sync_engine.pool)
+        yield engine
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_saturation_and_wait_recorded(self, engine):
+        pool = engine.sync_engine.pool
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            status = pool_status(pool, "direct")
+            assert status["checked_out"] == 1
+            assert status["saturation"] == 1.0
+
+            async def second_checkout():
+                async with engine.connect() as other:
+                    await other.execute(text("SELECT 1"))
+
+            waiter = asyncio.create_task(second_checkout())
+            await asyncio.sleep(0.05)
+        await waiter
+
+        status = pool_status(pool, "direct")
+        assert status["checkouts"] >= 2
+        assert status["wait_ms_max"] >= 40
+        assert status["saturation"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_checkout_timeout_counted(self, engine):
+        pool = engine.sync_engine.pool
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+
+        assert pool_status(pool, "direct")["timeouts"] == 1
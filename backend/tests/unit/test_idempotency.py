@@ -0,0 +1,187 @@
+"""
+Unit tests for Idempotency-Key handling.
+
+Tests:
+- Retries replay the stored response without re-running the endpoint
+- Concurrent duplicates wait for the in-flight attempt (same and other worker)
+- Key reuse with a different body is rejected; 5xx responses aren't stored
+- Keys are scoped per verified caller (surviving a token refresh) and
+  expired records are taken over
+- Requests with an invalid token pass through untouched
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app.core.idempotency import IdempotencyMiddleware, IdempotencyStore
+from app.db.models import IdempotencyRecord
+
+
+async def _principal(token):
+    """Fake verifier: "<user>.<n>" is token n issued to user"""
+    if "." not in token:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return token.split(".")[0]
+
+
+def _app(store, calls, delay=0.0, fail_first=False):
+    app = FastAPI()
+
+    @app.post("/api/notifications/send", status_code=201)
+    async def send(payload: dict):
+        calls.append(payload)
+        await asyncio.sleep(delay)
+        if fail_first and len(calls) == 1:
+            raise HTTPException(status_code=503, detail="Twilio unavailable")
+        return {"sent": len(calls), **payload}
+
+    @app.post("/api/other")
+    async def other():
+        calls.append(None)
+        return {"ok": True}
+
+    app.add_middleware(IdempotencyMiddleware, paths=["/api/notifications/send"], principal=_principal, store=store)
+    return app
+
+
+def _headers(key, token="alice.1"):
+    return {"Idempotency-Key": key, "Authorization": f"Bearer {token}"}
+
+
+class TestIdempotency:
+    """Tests for IdempotencyMiddleware with IdempotencyStore."""
+
+    @pytest.mark.asyncio
+    async def test_retry_replays_stored_response(self, sqlite_sessionmaker):
+        calls = []
+        store = IdempotencyStore(sqlite_sessionmaker)
+        async with AsyncClient(app=_app(store, calls), base_url="http://test") as client:
+            first = await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+            store.clear()  # Force the table path for the first retry
+            second = await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+            third = await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+
+        assert len(calls) == 1
+        assert first.status_code == second.status_code == third.status_code == 201
+        assert first.json() == second.json() == third.json() == {"sent": 1, "to": "x"}
+        assert "idempotent-replayed" not in first.headers
+        assert second.headers["idempotent-replayed"] == "true"
+        assert store.stats()["replayed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_without_key_or_on_other_routes_runs_every_time(self, sqlite_sessionmaker):
+        calls = []
+        store = IdempotencyStore(sqlite_sessionmaker)
+        async with AsyncClient(app=_app(store, calls), base_url="http://test") as client:
+            await client.post("/api/notifications/send", json={"to": "x"})
+            await client.post("/api/notifications/send", json={"to": "x"})
+            await client.post("/api/other", headers=_headers("k1"))
+            await client.post("/api/other", headers=_headers("k1"))
+
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_execute_once(self, sqlite_sessionmaker):
+        calls = []
+        store = IdempotencyStore(sqlite_sessionmaker)
+        async with AsyncClient(app=_app(store, calls, delay=0.2), base_url="http://test") as client:
+            responses = await asyncio.gather(*(
+                client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+                for _ in range(5)
+            ))
+
+        assert len(calls) == 1
+        assert {r.status_code for r in responses} == {201}
+        assert store.stats()["waited"] == 4
+
+    @pytest.mark.asyncio
+    async def test_duplicate_in_other_worker_waits_for_result(self, sqlite_sessionmaker):
+        calls = []
+        worker_a = _app(IdempotencyStore(sqlite_sessionmaker), calls, delay=0.3)
+        worker_b = _app(IdempotencyStore(sqlite_sessionmaker), calls)
+        async with AsyncClient(app=worker_a, base_url="http://test") as a, \
+                AsyncClient(app=worker_b, base_url="http://test") as b:
+            first = asyncio.create_task(a.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1")))
+            await asyncio.sleep(0.1)
+            second = await b.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+            first = await first
+
+        assert len(calls) == 1
+        assert second.json() == first.json()
+
+    @pytest.mark.asyncio
+    async def test_key_reused_with_different_body(self, sqlite_sessionmaker):
+        calls = []
+        store = IdempotencyStore(sqlite_sessionmaker)
+        async with AsyncClient(app=_app(store, calls), base_url="http://test") as client:
+            await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+            response = await client.post("/api/notifications/send", json={"to": "y"}, headers=_headers("k1"))
+
+        assert response.status_code == 422
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_server_errors_are_not_stored(self, sqlite_sessionmaker):
+        calls = []
+        store = IdempotencyStore(sqlite_sessionmaker)
+        async with AsyncClient(app=_app(store, calls, fail_first=True), base_url="http://test") as client:
+            first = await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+            second = await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+
+        assert (first.status_code, second.status_code) == (503, 201)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_per_caller(self, sqlite_sessionmaker):
+        calls = []
+        store = IdempotencyStore(sqlite_sessionmaker)
+        async with AsyncClient(app=_app(store, calls), base_url="http://test") as client:
+            await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1", "alice.1"))
+            await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1", "bob.1"))
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_retry_after_token_refresh_is_replayed(self, sqlite_sessionmaker):
+        calls = []
+        store = IdempotencyStore(sqlite_sessionmaker)
+        async with AsyncClient(app=_app(store, calls), base_url="http://test") as client:
+            first = await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1", "alice.1"))
+            retry = await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1", "alice.2"))
+
+        assert len(calls) == 1
+        assert retry.json() == first.json()
+        assert retry.headers["idempotent-replayed"] == "true"
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_passes_through(self, sqlite_sessionmaker):
+        calls = []
+        store = IdempotencyStore(sqlite_sessionmaker)
+        async with AsyncClient(app=_app(store, calls), base_url="http://test") as client:
+            for token in ("expired", "expired"):
+                await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1", token))
+
+        assert len(calls) == 2
+        assert store.stats()["executed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_expired_record_is_taken_over(self, sqlite_sessionmaker):
+        calls = []
+        store = IdempotencyStore(sqlite_sessionmaker)
+        async with AsyncClient(app=_app(store, calls), base_url="http://test") as client:
+            await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+            async with sqlite_sessionmaker() as db:
+                await db.execute(update(IdempotencyRecord).values(
+                    expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+                ))
+                await db.commit()
+            store.clear()
+            response = await client.post("/api/notifications/send", json={"to": "x"}, headers=_headers("k1"))
+
+        assert response.json()["sent"] == 2
+        assert await store.purge_expired() == 0
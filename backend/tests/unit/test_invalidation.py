@@ -0,0 +1,92 @@
+"""
+Unit tests for the cross-worker invalidation bus.
+"""
+
+import json
+import pytest
+
+from app.core.invalidation import InvalidationBus, listener_dsn, TOPIC_CATALOG, TOPIC_PRINCIPAL
+
+
+def _bus():
+    return InvalidationBus(dsn="postgresql://user:pw@localhost/db")
+
+
+class TestInvalidationBus:
+    """Tests for InvalidationBus."""
+
+    def test_payload_is_compact(self):
+        bus = _bus()
+        event = json.loads(bus.encode(TOPIC_PRINCIPAL, "abc"))
+        assert event == {"t": TOPIC_PRINCIPAL, "o": bus.origin, "k": "abc"}
+        assert " " not in bus.encode(TOPIC_CATALOG)
+
+    def test_dispatches_events_from_other_workers(self):
+        bus, other = _bus(), _bus()
+        seen = []
+        bus.subscribe(TOPIC_PRINCIPAL, seen.append)
+
+        bus.handle_payload(other.encode(TOPIC_PRINCIPAL, "fp1"))
+        bus.handle_payload(other.encode(TOPIC_CATALOG))
+
+        assert seen == ["fp1"]
+        assert bus.received == 2
+
+    def test_ignores_own_events(self):
+        bus = _bus()
+        seen = []
+        bus.subscribe(TOPIC_CATALOG, seen.append)
+
+        bus.handle_payload(bus.encode(TOPIC_CATALOG))
+
+        assert seen == []
+        assert bus.received == 0
+
+    @pytest.mark.parametrize("payload", ["not json", "{}", "[1, 2]", "null"])
+    def test_malformed_payload_ignored(self, payload):
+        bus = _bus()
+        seen = []
+        bus.subscribe(TOPIC_CATALOG, seen.append)
+
+        bus.handle_payload(payload)
+
+        assert seen == []
+
+    def test_failing_handler_does_not_block_others(self):
+        bus, other = _bus(), _bus()
+        seen = []
+
+        def broken(_key):
+            raise RuntimeError("boom")
+
+        bus.subscribe(TOPIC_CATALOG, broken)
+        bus.subscribe(TOPIC_CATALOG, seen.append)
+
+        bus.handle_payload(other.encode(TOPIC_CATALOG))
+
+        assert seen == [None]
+
+    def test_reset_all_clears_every_topic(self):
+        bus = _bus()
+        seen = []
+        bus.subscribe(TOPIC_CATALOG, lambda key: seen.append((TOPIC_CATALOG, key)))
+        bus.subscribe(TOPIC_PRINCIPAL, lambda key: seen.append((TOPIC_PRINCIPAL, key)))
+
+        bus.reset_all()
+
+        assert sorted(seen) == [(TOPIC_CATALOG, None), (TOPIC_PRINCIPAL, None)]
+
+    @pytest.mark.asyncio
+    async def test_publish_is_noop_off_postgres(self, sqlite_sessionmaker):
+        bus = _bus()
+        async with sqlite_sessionmaker() as db:
+            await bus.publish(db, TOPIC_CATALOG)
+        assert bus.published == 0
+
+    def test_disabled_without_postgres_dsn(self):
+        assert listener_dsn("sqlite+aiosqlite:///./test.db") is None
+        assert InvalidationBus(dsn=None).enabled is False
+
+    def test_listener_dsn_strips_driver_and_pgbouncer(self):
+        dsn = listener_dsn("postgresql+asyncpg://u:p@host:6543/db?pgbouncer=true")
+        assert dsn == "postgresql://u:p@host:6543/db"
@@ -0,0 +1,134 @@
+"""
+Unit tests for local Supabase JWT verification.
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+from jose import jwt
+
+from app.core.jwt_verifier import (
+    SupabaseJWTVerifier,
+    AuthenticatedUser,
+    TokenVerificationError
+)
+
+SECRET = "test-supabase-jwt-secret"
+
+
+def make_token(secret=SECRET, **overrides):
+    """Build a Supabase-style access token."""
+    claims = {
+        "sub": "11111111-1111-4111-a111-111111111111",
+        "email": "participant@example.com",
+        "aud": "authenticated",
+        "role": "authenticated",
+        "exp": int(time.time()) + 3600,
+        "user_metadata": {"role": "participant", "wheelchair_required": True},
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+class TestSupabaseJWTVerifier:
+    """Tests for SupabaseJWTVerifier with HS256 tokens."""
+
+    @pytest.fixture
+    def verifier(self):
+        return SupabaseJWTVerifier(jwt_secret=SECRET, audience="authenticated")
+
+    def test_valid_token_builds_user(self, verifier):
+        """A valid token should produce the user shape endpoints expect."""
+        user = verifier.verify(make_token())
+
+        assert isinstance(user, AuthenticatedUser)
+        assert str(user.id) == "11111111-1111-4111-a111-111111111111"
+        assert user.email == "participant@example.com"
+        assert user.user_metadata.get("role") == "participant"
+        assert user.user_metadata.get("wheelchair_required") is True
+        assert user.expires_at is not None
+
+    def test_expired_token_rejected(self, verifier):
+        """Expired tokens should fail verification."""
+        with pytest.raises(TokenVerificationError):
+            verifier.verify(make_token(exp=int(time.time()) - 10))
+
+    def test_wrong_audience_rejected(self, verifier):
+        """Tokens for another audience should fail verification."""
+        with pytest.raises(TokenVerificationError):
+            verifier.verify(make_token(aud="anon"))
+
+    def test_bad_signature_rejected(self, verifier):
+        """Tokens signed with another secret should fail verification."""
+        with pytest.raises(TokenVerificationError):
+            verifier.verify(make_token(secret="some-other-secret"))
+
+    def test_malformed_token_rejected(self, verifier):
+        """Garbage input should fail verification."""
+        with pytest.raises(TokenVerificationError):
+            verifier.verify("not-a-jwt")
+
+    def test_missing_secret_rejected(self):
+        """HS256 tokens cannot be verified without the project secret."""
+        verifier = SupabaseJWTVerifier(jwt_secret=None)
+        with pytest.raises(TokenVerificationError, match="SUPABASE_JWT_SECRET"):
+            verifier.verify(make_token())
+
+
+class TestJWKSVerification:
+    """Tests for asymmetric tokens verified against a cached JWKS."""
+
+    @pytest.fixture
+    def rsa_keys(self):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from jose import jwk
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode()
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+        public_jwk["kid"] = "key-1"
+        return private_pem, public_jwk
+
+    def test_jwks_fetched_once(self, rsa_keys):
+        """JWKS should be fetched on first use and then served from cache."""
+        private_pem, public_jwk = rsa_keys
+        token = jwt.encode(
+            {"sub": "22222222-2222-4222-a222-222222222222", "aud": "authenticated", "exp": int(time.time()) + 60},
+            private_pem,
+            algorithm="RS256",
+            headers={"kid": "key-1"}
+        )
+        verifier = SupabaseJWTVerifier(jwks_url="https://test.supabase.co/jwks")
+
+        with patch("app.core.jwt_verifier.httpx.get") as mock_get:
+            mock_get.return_value.json.return_value = {"keys": [public_jwk]}
+            assert str(verifier.verify(token).id) == "22222222-2222-4222-a222-222222222222"
+            assert str(verifier.verify(token).id) == "22222222-2222-4222-a222-222222222222"
+
+        mock_get.assert_called_once()
+
+
+class TestVerifyModeDefault:
+    """Tests for the AUTH_VERIFY_MODE default in Settings."""
+
+    @pytest.mark.parametrize("overrides, expected", [
+        ({}, "remote"),
+        ({"SUPABASE_JWT_SECRET": SECRET}, "local"),
+        ({"SUPABASE_JWKS_URL": "https://test.supabase.co/auth/v1/.well-known/jwks.json"}, "local"),
+        ({"AUTH_VERIFY_MODE": "local"}, "local"),
+        ({"SUPABASE_JWT_SECRET": SECRET, "AUTH_VERIFY_MODE": "remote"}, "remote"),
+    ])
+    def test_local_only_with_a_key_source(self, overrides, expected):
+        from app.core.config import Settings
+
+        values = {"SUPABASE_JWT_SECRET": None, "SUPABASE_JWKS_URL": None, "AUTH_VERIFY_MODE": None, **overrides}
+        assert Settings(_env_file=None, **values).AUTH_VERIFY_MODE == expected
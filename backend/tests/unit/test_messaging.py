@@ -0,0 +1,145 @@
+"""
+Unit tests for the messaging transport.
+
+Tests:
+- Mock backend records SMS and WhatsApp messages, keeping only the latest
+- Transient failures are retried (Retry-After capped); permanent ones are not
+- Sends are paced per sender number
+- Twilio backend speaks the Messages API (against the local stand-in)
+"""
+
+import asyncio
+import pytest
+
+import httpx
+
+from app.integrations.messaging import MessagingBackend, MessagingTransport, MockBackend, SendError, TwilioBackend
+from app.integrations.messaging_standin import create_standin_app
+
+
+class FlakyBackend(MessagingBackend):
+    """Fails the first ``failures`` sends with the given error"""
+
+    name = "flaky"
+
+    def __init__(self, failures: int, retryable: bool = True, retry_after=None):
+        self.failures = failures
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.calls = 0
+
+    async def send(self, sender, to, body):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise SendError("HTTP 429", retryable=self.retryable, retry_after=self.retry_after)
+        return f"SID{self.calls}"
+
+
+def _transport(backend, **overrides):
+    options = dict(sms_sender="+6560000000", rate_per_second=0, max_attempts=3, retry_base_seconds=0)
+    options.update(overrides)
+    return MessagingTransport(backend, **options)
+
+
+class TestMessagingTransport:
+    """Tests for MessagingTransport."""
+
+    @pytest.mark.asyncio
+    async def test_mock_backend_records_messages(self):
+        backend = MockBackend()
+        transport = _transport(backend)
+
+        assert await transport.send_sms("+6591234567", "Hello")
+        assert await transport.send("whatsapp", "+6598765432", "Update")
+
+        assert [(m.sender, m.to) for m in backend.sent] == [
+            ("+6560000000", "+6591234567"),
+            ("whatsapp:+6560000000", "whatsapp:+6598765432"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_mock_backend_keeps_latest_messages(self):
+        backend = MockBackend(max_kept=3)
+        transport = _transport(backend)
+
+        sids = [await transport.send_sms("+6591234567", f"Message {i}") for i in range(5)]
+
+        assert len(set(sids)) == 5
+        assert [m.body for m in backend.sent] == ["Message 2", "Message 3", "Message 4"]
+
+    @pytest.mark.asyncio
+    async def test_retry_after_is_capped(self):
+        transport = _transport(FlakyBackend(failures=1, retry_after=3600), max_retry_after_seconds=0.01)
+
+        sid = await asyncio.wait_for(transport.send_sms("+6591234567", "Hello"), timeout=1)
+
+        assert sid == "SID2"
+
+    @pytest.mark.asyncio
+    async def test_transient_failures_are_retried(self):
+        backend = FlakyBackend(failures=2)
+        transport = _transport(backend)
+
+        assert await transport.send_sms("+6591234567", "Hello") == "SID3"
+        assert transport.stats()["retried"] == 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts_or_permanent_error(self):
+        transport = _transport(FlakyBackend(failures=5))
+        assert await transport.send_sms("+6591234567", "Hello") is None
+        assert transport.backend.calls == 3
+
+        transport = _transport(FlakyBackend(failures=1, retryable=False))
+        assert await transport.send_sms("+6591234567", "Hello") is None
+        assert transport.backend.calls == 1
+        assert transport.stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sends_are_paced_per_sender(self):
+        transport = _transport(MockBackend(), rate_per_second=50)
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        await asyncio.gather(*(transport.send_sms("+6591234567", "Hi") for _ in range(6)))
+        sms_elapsed = loop.time() - start
+
+        start = loop.time()
+        await asyncio.gather(transport.send_sms("+6591234567", "Hi"), transport.send_whatsapp("+6591234567", "Hi"))
+        mixed_elapsed = loop.time() - start
+
+        # 6 sends at 50/s need 5 intervals of 20 ms; WhatsApp has its own budget
+        assert sms_elapsed >= 0.09
+        assert mixed_elapsed < sms_elapsed
+
+
+class TestTwilioBackend:
+    """Tests for TwilioBackend against the stand-in."""
+
+    @pytest.mark.asyncio
+    async def test_sends_through_messages_api(self):
+        backend = TwilioBackend(
+            "ACtest", "token", base_url="http://standin",
+            http_transport=httpx.ASGITransport(app=create_standin_app(latency_seconds=0))
+        )
+        try:
+            sid = await _transport(backend).send_sms("+6591234567", "Hello")
+        finally:
+            await backend.aclose()
+
+        assert sid.startswith("SM")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("failure_status, retryable", [(429, True), (500, False), (503, False)])
+    async def test_only_rate_limits_are_retryable(self, failure_status, retryable):
+        """A 5xx may follow an accepted message; retrying the POST could send it twice"""
+        app = create_standin_app(latency_seconds=0, failure_rate=1.0, failure_status=failure_status)
+        backend = TwilioBackend(
+            "ACtest", "token", base_url="http://standin", http_transport=httpx.ASGITransport(app=app)
+        )
+        try:
+            with pytest.raises(SendError) as error:
+                await backend.send("+6560000000", "+6591234567", "Hello")
+        finally:
+            await backend.aclose()
+
+        assert error.value.retryable is retryable
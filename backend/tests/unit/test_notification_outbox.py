@@ -0,0 +1,286 @@
+"""
+Unit tests for the notification outbox.
+
+Tests:
+- Registrations queue their notification in the same transaction
+- Dispatch sends due messages and records Notification rows
+- Duplicates in a batch are sent once; dedupe keys are enqueued once
+- Failed sends are retried later without resending delivered channels
+- No transaction is held open during sends; sends stop at the send budget
+- Bursts for one recipient are held for the digest window and sent as one message
+"""
+
+import asyncio
+import pytest
+from datetime import date, datetime, time, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.enums import MembershipType, NotificationKind, Role
+from app.db.models import Activity, Notification, OutboxMessage, User
+from app.services import catalog_version
+from app.services import notification_outbox
+from app.services.notification_outbox import NotificationOutbox
+from app.services.registration_service import RegistrationService
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog_version(monkeypatch):
+    monkeypatch.setattr(catalog_version, "_catalog_version_instance", None)
+
+
+@pytest.fixture(autouse=True)
+def no_digest_window(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_DIGEST_WINDOW_SECONDS", 0)
+
+
+@pytest.fixture
+def messaging():
+    client = MagicMock()
+    client.send_sms = AsyncMock(return_value="sms_sid")
+    client.send_whatsapp = AsyncMock(return_value="whatsapp_sid")
+    with patch("app.services.notification_service.get_messaging_transport", return_value=client):
+        yield client
+
+
+async def _seed(db, caregiver_phone=None):
+    user = User(
+        id=uuid4(),
+        email=f"{uuid4()}@example.com",
+        hashed_password="x",
+        role=Role.PARTICIPANT,
+        membership_type=MembershipType.AD_HOC,
+        phone="+6591234567",
+        caregiver_phone=caregiver_phone,
+    )
+    activity = Activity(
+        id=uuid4(),
+        title="Music Therapy",
+        date=date.today() + timedelta(days=3),
+        start_time=time(14, 0),
+        end_time=time(15, 0),
+        max_capacity=5,
+        current_participants=0,
+    )
+    db.add_all([user, activity])
+    await db.commit()
+    return user, activity
+
+
+async def _outbox(db):
+    return (await db.execute(
+        select(OutboxMessage).execution_options(populate_existing=True)
+    )).scalars().all()
+
+
+class TestEnqueue:
+    """Tests for NotificationOutbox.enqueue."""
+
+    @pytest.mark.asyncio
+    async def test_registration_queues_confirmation(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            user, activity = await _seed(db)
+            await RegistrationService(db).register(user.id, activity.id)
+
+            [message] = await _outbox(db)
+
+            assert message.kind == NotificationKind.REGISTRATION_CONFIRMATION.value
+            assert (message.user_id, message.activity_id, message.status) == (user.id, activity.id, "pending")
+            messaging.send_sms.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dedupe_key_is_enqueued_once(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            user, activity = await _seed(db)
+            outbox = NotificationOutbox(db)
+            for _ in range(3):
+                await outbox.enqueue(NotificationKind.CANCELLATION, user.id, activity.id, dedupe_key="k1")
+                await db.commit()
+
+            assert len(await _outbox(db)) == 1
+
+
+class TestDispatch:
+    """Tests for NotificationOutbox.dispatch_batch."""
+
+    @pytest.mark.asyncio
+    async def test_dispatch_sends_and_records(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            user, activity = await _seed(db, caregiver_phone="+6598765432")
+            await NotificationOutbox(db).enqueue(NotificationKind.REGISTRATION_CONFIRMATION, user.id, activity.id)
+            await db.commit()
+
+            assert await NotificationOutbox(db).dispatch_batch() == 1
+
+            [message] = await _outbox(db)
+            assert message.status == "sent"
+            assert message.delivered_channels == "sms,whatsapp"
+            messaging.send_sms.assert_called_once()
+            messaging.send_whatsapp.assert_called_once()
+            notifications = (await db.execute(select(Notification))).scalars().all()
+            assert sorted(n.channel for n in notifications) == ["sms", "whatsapp"]
+            assert await NotificationOutbox(db).dispatch_batch() == 0
+
+    @pytest.mark.asyncio
+    async def test_duplicates_in_batch_sent_once(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            user, activity = await _seed(db)
+            outbox = NotificationOutbox(db)
+            for _ in range(3):
+                await outbox.enqueue(NotificationKind.CANCELLATION, user.id, activity.id)
+            await db.commit()
+
+            assert await outbox.dispatch_batch() == 3
+
+            assert sorted(m.status for m in await _outbox(db)) == ["duplicate", "duplicate", "sent"]
+            messaging.send_sms.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_later_state_change_is_not_a_duplicate(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            user, activity = await _seed(db)
+            outbox = NotificationOutbox(db)
+            for kind in (
+                NotificationKind.REGISTRATION_CONFIRMATION,
+                NotificationKind.CANCELLATION,
+                NotificationKind.REGISTRATION_CONFIRMATION,
+            ):
+                await outbox.enqueue(kind, user.id, activity.id)
+                await db.commit()
+
+            assert await outbox.dispatch_batch() == 3
+
+            assert [m.status for m in await _outbox(db)] == ["sent"] * 3
+            [text] = [call.args[1] for call in messaging.send_sms.call_args_list]
+            assert text.startswith("MINDS: 3 updates")
+            first, second, third = (text.index(marker) for marker in (
+                "1) Registration Confirmed!", "2) Cancellation Confirmed", "3) Registration Confirmed!"
+            ))
+            assert first < second < third
+
+    @pytest.mark.asyncio
+    async def test_failed_channel_is_retried_alone(self, sqlite_sessionmaker, messaging):
+        messaging.send_whatsapp.side_effect = [None, "whatsapp_sid"]
+        async with sqlite_sessionmaker() as db:
+            user, activity = await _seed(db, caregiver_phone="+6598765432")
+            outbox = NotificationOutbox(db)
+            await outbox.enqueue(NotificationKind.WAITLIST_PROMOTION, user.id, activity.id)
+            await db.commit()
+
+            await outbox.dispatch_batch()
+
+            [message] = await _outbox(db)
+            assert (message.status, message.attempts, message.delivered_channels) == ("pending", 1, "sms")
+            assert message.last_error == "whatsapp: send failed"
+            next_attempt_at = message.next_attempt_at.replace(tzinfo=timezone.utc)
+            assert next_attempt_at > datetime.now(timezone.utc)
+
+            # Nothing is due until the backoff passes
+            assert await outbox.dispatch_batch() == 0
+            message.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            await db.commit()
+            await outbox.dispatch_batch()
+
+            [message] = await _outbox(db)
+            assert (message.status, message.attempts, message.delivered_channels) == ("sent", 2, "sms,whatsapp")
+            assert messaging.send_sms.call_count == 1
+            assert messaging.send_whatsapp.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_no_transaction_open_during_sends(self, sqlite_sessionmaker, messaging):
+        async with sqlite_sessionmaker() as db:
+            user, activity = await _seed(db)
+            await NotificationOutbox(db).enqueue(NotificationKind.REGISTRATION_CONFIRMATION, user.id, activity.id)
+            await db.commit()
+
+            in_transaction = []
+
+            async def send_sms(phone, text):
+                in_transaction.append(db.in_transaction())
+                return "sms_sid"
+
+            messaging.send_sms.side_effect = send_sms
+            assert await NotificationOutbox(db).dispatch_batch() == 1
+
+            assert in_transaction == [False]
+            assert not db.in_transaction()
+            [message] = await _outbox(db)
+            assert message.status == "sent"
+
+    @pytest.mark.asyncio
+    async def test_sends_stop_at_budget(self, sqlite_sessionmaker, messaging, monkeypatch):
+        monkeypatch.setattr(notification_outbox, "SEND_BUDGET_SECONDS", 0.05)
+
+        async def hung_send(phone, text):
+            await asyncio.sleep(10)
+
+        messaging.send_sms.side_effect = hung_send
+        async with sqlite_sessionmaker() as db:
+            user, activity = await _seed(db)
+            await NotificationOutbox(db).enqueue(NotificationKind.REGISTRATION_CONFIRMATION, user.id, activity.id)
+            await db.commit()
+
+            await asyncio.wait_for(NotificationOutbox(db).dispatch_batch(), 2)
+
+            [message] = await _outbox(db)
+            assert (message.status, message.last_error) == ("pending", "sms: send budget exhausted")
+            assert message.next_attempt_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+
+
+class TestDigest:
+    """Tests for coalescing bursts into digests."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_sent_as_one_digest_per_number(self, sqlite_sessionmaker, messaging, monkeypatch):
+        monkeypatch.setattr(settings, "NOTIFICATION_DIGEST_WINDOW_SECONDS", 60)
+        async with sqlite_sessionmaker() as db:
+            user, first = await _seed(db, caregiver_phone="+6598765432")
+            _, second = await _seed(db)
+            outbox = NotificationOutbox(db)
+            await outbox.enqueue(NotificationKind.REGISTRATION_CONFIRMATION, user.id, first.id)
+            await outbox.enqueue(NotificationKind.REGISTRATION_CONFIRMATION, user.id, second.id)
+            await outbox.enqueue(NotificationKind.CANCELLATION, user.id, first.id)
+            await db.commit()
+
+            # Still inside the window
+            assert await outbox.dispatch_batch() == 0
+
+            # The first message's deadline flushes the whole burst
+            oldest = (await _outbox(db))[0]
+            oldest.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            await db.commit()
+            assert await outbox.dispatch_batch() == 3
+
+            assert {m.status for m in await _outbox(db)} == {"sent"}
+            messaging.send_sms.assert_called_once()
+            phone, text = messaging.send_sms.call_args.args
+            assert phone == "+6591234567"
+            assert text.startswith("MINDS: 3 updates")
+            assert "Cancellation Confirmed" in text
+            # Only the confirmations include the caregiver
+            messaging.send_whatsapp.assert_called_once()
+            assert messaging.send_whatsapp.call_args.args[1].startswith("MINDS: 2 updates")
+            notifications = (await db.execute(select(Notification))).scalars().all()
+            assert len(notifications) == 2
+
+    @pytest.mark.asyncio
+    async def test_other_users_wait_for_their_own_deadline(self, sqlite_sessionmaker, messaging, monkeypatch):
+        monkeypatch.setattr(settings, "NOTIFICATION_DIGEST_WINDOW_SECONDS", 60)
+        async with sqlite_sessionmaker() as db:
+            user, activity = await _seed(db)
+            other, _ = await _seed(db)
+            outbox = NotificationOutbox(db)
+            await outbox.enqueue(NotificationKind.CANCELLATION, user.id, activity.id)
+            await outbox.enqueue(NotificationKind.CANCELLATION, other.id, activity.id)
+            await db.commit()
+
+            [mine] = [m for m in await _outbox(db) if m.user_id == user.id]
+            mine.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            await db.commit()
+
+            assert await outbox.dispatch_batch() == 1
+            statuses = {m.user_id: m.status for m in await _outbox(db)}
+            assert statuses == {user.id: "sent", other.id: "pending"}
@@ -5,16 +5,17 @@ Tests:
 - send_notification with valid user
 - send_notification with missing phone
 - get_user_notifications returns correct results
+- compose addresses the participant and caregiver
 """
 
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, AsyncMock, patch
 from uuid import uuid4
 from datetime import datetime
 
 from app.services.notification_service import NotificationService
 from app.db.models import User, Notification
-from app.core.enums import Role
+from app.core.enums import NotificationKind, Role
 
 
 class TestNotificationService:
@@ -22,8 +23,13 @@ class TestNotificationService:
 
     @pytest.fixture
     def mock_db(self):
-        """Mock database session."""
-        return MagicMock()
+        """Mock async database session."""
+        db = MagicMock()
+        db.get = AsyncMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        db.refresh = AsyncMock()
+        return db
 
     @pytest.fixture
     def mock_user_with_phone(self):
@@ -48,19 +54,19 @@ class TestNotificationService:
     @pytest.fixture
     def service(self, mock_db):
         """NotificationService instance with mocked dependencies."""
-        with patch('app.services.notification_service.get_twilio_client') as mock_twilio:
+        with patch('app.services.notification_service.get_messaging_transport') as mock_transport:
             mock_client = MagicMock()
-            mock_client.send_sms.return_value = 'mock_sid_123'
-            mock_client.send_whatsapp.return_value = 'mock_sid_456'
-            mock_twilio.return_value = mock_client
+            mock_client.send_sms = AsyncMock(return_value='mock_sid_123')
+            mock_client.send_whatsapp = AsyncMock(return_value='mock_sid_456')
+            mock_transport.return_value = mock_client
             service = NotificationService(mock_db)
-            service.twilio = mock_client
+            service.messaging = mock_client
             return service
 
     @pytest.mark.asyncio
     async def test_send_notification_sms_success(self, service, mock_db, mock_user_with_phone):
         """Test sending SMS notification to valid user."""
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user_with_phone
+        mock_db.get.return_value = mock_user_with_phone
 
         result = await service.send_notification(
             user_id=mock_user_with_phone.id,
@@ -68,20 +74,23 @@ class TestNotificationService:
             channel="sms"
         )
 
-        # Verify Twilio was called
-        service.twilio.send_sms.assert_called_once_with(
+        # Verify the SMS was sent
+        service.messaging.send_sms.assert_called_once_with(
             mock_user_with_phone.phone,
             "Test message"
         )
 
-        # Verify notification was added to DB
-        mock_db.add.assert_called_once()
-        mock_db.commit.assert_called_once()
+        # Verify notification was written in one INSERT, with no refresh
+        mock_db.execute.assert_awaited_once()
+        mock_db.commit.assert_awaited_once()
+        mock_db.refresh.assert_not_awaited()
+        assert result.status == 'sent'
+        assert result.id is not None and result.created_at is not None
 
     @pytest.mark.asyncio
     async def test_send_notification_whatsapp_success(self, service, mock_db, mock_user_with_phone):
         """Test sending WhatsApp notification to valid user."""
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user_with_phone
+        mock_db.get.return_value = mock_user_with_phone
 
         result = await service.send_notification(
             user_id=mock_user_with_phone.id,
@@ -89,8 +98,8 @@ class TestNotificationService:
             channel="whatsapp"
         )
 
-        # Verify Twilio WhatsApp was called with caregiver phone
-        service.twilio.send_whatsapp.assert_called_once_with(
+        # Verify WhatsApp was sent to the caregiver phone
+        service.messaging.send_whatsapp.assert_called_once_with(
             mock_user_with_phone.caregiver_phone,
             "Test WhatsApp message"
         )
@@ -98,7 +107,7 @@ class TestNotificationService:
     @pytest.mark.asyncio
     async def test_send_notification_user_not_found(self, service, mock_db):
         """Test sending notification to non-existent user raises error."""
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.get.return_value = None
 
         with pytest.raises(ValueError, match="User not found"):
             await service.send_notification(
@@ -110,7 +119,7 @@ class TestNotificationService:
     @pytest.mark.asyncio
     async def test_send_notification_no_phone(self, service, mock_db, mock_user_no_phone):
         """Test sending notification to user without phone raises error."""
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user_no_phone
+        mock_db.get.return_value = mock_user_no_phone
 
         with pytest.raises(ValueError, match="has no phone number"):
             await service.send_notification(
@@ -119,7 +128,8 @@ class TestNotificationService:
                 channel="sms"
             )
 
-    def test_get_user_notifications(self, service, mock_db):
+    @pytest.mark.asyncio
+    async def test_get_user_notifications(self, service, mock_db):
         """Test retrieving user notifications."""
         user_id = uuid4()
         mock_notifications = [
@@ -127,14 +137,30 @@ class TestNotificationService:
             MagicMock(id=uuid4(), user_id=user_id, message="Msg 2", status="sent"),
         ]
 
-        mock_query = MagicMock()
-        mock_query.filter.return_value.order_by.return_value.all.return_value = mock_notifications
-        mock_db.query.return_value = mock_query
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = mock_notifications
+        mock_db.execute.return_value = mock_result
 
-        result = service.get_user_notifications(user_id)
+        result, has_more = await service.get_user_notifications(user_id, limit=2)
 
         assert len(result) == 2
-        mock_db.query.assert_called_once()
+        assert has_more is False
+        mock_db.execute.assert_awaited_once()
+
+    def test_compose_waitlist_promotion(self, service, mock_user_with_phone):
+        """Test promoted participant and caregiver are both told about the spot."""
+        activity = MagicMock(title="Art Jam", date="2025-01-01", start_time="10:00",
+                             end_time="12:00", location="MINDS Hall")
+        mock_user_with_phone.full_name = "Alex"
+        mock_user_with_phone.preferred_language = "en"
+
+        messages = service.compose(NotificationKind.WAITLIST_PROMOTION, mock_user_with_phone, activity)
+
+        assert [(channel, phone) for channel, phone, _ in messages] == [
+            ('sms', mock_user_with_phone.phone),
+            ('whatsapp', mock_user_with_phone.caregiver_phone),
+        ]
+        assert "Art Jam" in messages[0][2]
 
 
 class TestNotificationAuthorization:
@@ -0,0 +1,157 @@
+"""
+Unit tests for the localized notification templates.
+
+Tests:
+- Each template phrase is translated once per language, at compile time
+- Rendering and recompiling make no further translation calls
+- Titles come from the pre-translated columns
+- Mock mode and unsupported languages fall back to English
+- Languages whose translation failed are recompiled by retry_failed
+- English output is unchanged from the previous hard-coded messages
+"""
+
+import pytest
+from datetime import date, time
+from types import SimpleNamespace
+
+from app.core.enums import NotificationKind
+from app.services.notification_templates import (
+    NotificationTemplates,
+    TemplateTranslator,
+    activity_fields,
+)
+
+
+class FakeTranslateClient:
+    """Prefixes each phrase with its language and counts calls"""
+
+    def __init__(self, is_mock_mode=False):
+        self.is_mock_mode = is_mock_mode
+        self.calls = []
+
+    def translate(self, text, source_lang, target_lang):
+        self.calls.append((text, target_lang))
+        return f"<{target_lang}>{text}"
+
+
+def _activity():
+    return SimpleNamespace(
+        title="Art Jamming",
+        title_zh="艺术创作",
+        title_ms=None,
+        title_ta=None,
+        date=date(2026, 11, 2),
+        start_time=time(10, 0),
+        end_time=time(12, 0),
+        location="MINDS Centre",
+    )
+
+
+def _reminder(templates, language):
+    return templates.render(
+        NotificationKind.ACTIVITY_REMINDER.value, language, **activity_fields(_activity(), language)
+    )
+
+
+class TestCompile:
+    """Tests for NotificationTemplates.compile."""
+
+    def test_phrases_translated_once_per_language(self):
+        client = FakeTranslateClient()
+        NotificationTemplates(TemplateTranslator(client))
+
+        assert client.calls
+        assert len(client.calls) == len(set(client.calls))
+        assert {language for _, language in client.calls} == {"zh", "ms", "ta"}
+
+    def test_rendering_and_recompiling_make_no_calls(self):
+        client = FakeTranslateClient()
+        templates = NotificationTemplates(TemplateTranslator(client))
+        compiled_calls = len(client.calls)
+
+        for _ in range(1000):
+            _reminder(templates, "ta")
+        templates.compile()
+
+        assert len(client.calls) == compiled_calls
+        assert templates.translator.api_calls == compiled_calls
+
+    def test_error_fallback_is_not_cached(self):
+        client = FakeTranslateClient()
+        client.translate = lambda text, source, target: f"[{target.upper()}] {text}"
+        templates = NotificationTemplates(TemplateTranslator(client))
+
+        assert _reminder(templates, "ms") == _reminder(templates, "en")
+        assert templates.translator._cache == {}
+        assert templates.translator.failed == {"zh", "ms", "ta"}
+
+    def test_failed_languages_are_retried_later(self):
+        client = FakeTranslateClient()
+        healthy = client.translate
+        client.translate = lambda text, source, target: (
+            f"[{target.upper()}] {text}" if target == "ta" else healthy(text, source, target)
+        )
+        templates = NotificationTemplates(TemplateTranslator(client))
+        assert not templates.retry_failed()  # too soon
+
+        client.translate = healthy
+        templates._retry_at = 0  # retry interval elapsed
+        calls_before = len(client.calls)
+
+        assert templates.retry_failed()
+        assert _reminder(templates, "ta").startswith("<ta>Reminder")
+        assert {language for _, language in client.calls[calls_before:]} == {"ta"}
+        assert templates.translator.failed == set()
+        assert not templates.retry_failed()
+
+
+class TestRender:
+    """Tests for NotificationTemplates.render."""
+
+    def test_localized_text_and_title(self):
+        templates = NotificationTemplates(TemplateTranslator(FakeTranslateClient()))
+
+        message = _reminder(templates, "zh")
+
+        assert message.startswith("<zh>Reminder: Upcoming Activity\n\n艺术创作\n<zh>Date:")
+        assert "MINDS Centre" in message
+        assert "<zh>Date: 2026-11-02\n<zh>Time: 10:00:00" in message
+
+    def test_missing_translated_title_uses_english(self):
+        templates = NotificationTemplates(TemplateTranslator(FakeTranslateClient()))
+
+        assert "\n\nArt Jamming\n" in _reminder(templates, "ms")
+
+    @pytest.mark.parametrize("language", ["fr", None])
+    def test_unsupported_language_uses_english(self, language):
+        templates = NotificationTemplates(TemplateTranslator(FakeTranslateClient()))
+
+        assert _reminder(templates, language) == _reminder(templates, "en")
+
+    def test_mock_mode_keeps_english_text(self):
+        client = FakeTranslateClient(is_mock_mode=True)
+        templates = NotificationTemplates(TemplateTranslator(client))
+
+        assert client.calls == []
+        assert _reminder(templates, "zh").startswith("Reminder: Upcoming Activity\n\n艺术创作\n")
+
+    def test_english_matches_previous_messages(self):
+        templates = NotificationTemplates(TemplateTranslator(FakeTranslateClient()))
+        fields = activity_fields(_activity(), "en")
+
+        assert templates.render(NotificationKind.REGISTRATION_CONFIRMATION.value, "en", **fields) == (
+            "Registration Confirmed!\n\n"
+            "Activity: Art Jamming\n"
+            "Date: 2026-11-02\n"
+            "Time: 10:00:00 - 12:00:00\n"
+            "Location: MINDS Centre"
+        )
+        assert templates.render(NotificationKind.BALLOT_WAITLISTED.value, "en", **fields) == (
+            "Ballot result: you're on the waitlist. We'll message you if a spot opens.\n\n"
+            "Activity: Art Jamming\n"
+            "Date: 2026-11-02\n"
+            "Time: 10:00:00 - 12:00:00"
+        )
+        assert templates.render("digest", "en", count=2, messages="1) a\n\n2) b") == (
+            "MINDS: 2 updates\n\n1) a\n\n2) b"
+        )
@@ -0,0 +1,128 @@
+"""
+Unit tests for NotificationWriter and paginated notification history.
+
+Tests:
+- Buffered rows and status changes are written with one statement each per flush
+- History pages follow the (created_at, id) cursor without gaps or repeats
+- A deep page costs one query, like the first
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import select
+
+from app.core.enums import Role
+from app.db.models import Notification, User
+from app.services.notification_service import NotificationService
+from app.services.notification_writer import NotificationWriter
+from app.utils.cursors import decode_cursor, encode_cursor
+
+CURSOR_FIELDS = (datetime.fromisoformat, UUID)
+
+
+async def _user(db):
+    user = User(id=uuid4(), email=f"{uuid4()}@example.com", hashed_password="x", role=Role.PARTICIPANT)
+    db.add(user)
+    await db.commit()
+    return user
+
+
+async def _history(db, user, count):
+    """``count`` notifications, one minute apart, with a pair sharing a timestamp"""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        Notification(
+            id=uuid4(),
+            user_id=user.id,
+            message=f"Reminder {i}",
+            channel='sms',
+            status='sent',
+            created_at=start + timedelta(minutes=min(i, count - 2))
+        )
+        for i in range(count)
+    ]
+    db.add_all(rows)
+    await db.commit()
+
+
+class TestNotificationWriter:
+    """Tests for NotificationWriter."""
+
+    @pytest.mark.asyncio
+    async def test_flush_batches_inserts_and_updates(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            user = await _user(db)
+            writer = NotificationWriter(db)
+            added = [writer.add(user.id, f"Message {i}", 'sms') for i in range(20)]
+            assert writer.pending == 20
+
+            with query_counter(db.bind.sync_engine) as counter:
+                await writer.flush()
+            assert counter["count"] == 1
+
+            for i, notification in enumerate(added):
+                writer.mark(notification.id, 'sent' if i % 4 else 'failed')
+            with query_counter(db.bind.sync_engine) as counter:
+                await writer.flush()
+            await db.commit()
+
+            # one UPDATE per status
+            assert counter["count"] == 2
+            assert writer.pending == 0
+            rows = (await db.execute(select(Notification))).scalars().all()
+            assert sorted(r.status for r in rows) == ["failed"] * 5 + ["sent"] * 15
+            assert all(r.sent_at is not None for r in rows if r.status == 'sent')
+
+    @pytest.mark.asyncio
+    async def test_flush_with_nothing_buffered_is_free(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            with query_counter(db.bind.sync_engine) as counter:
+                await NotificationWriter(db).flush()
+
+            assert counter["count"] == 0
+
+
+class TestUserNotificationHistory:
+    """Tests for NotificationService.get_user_notifications."""
+
+    @pytest.mark.asyncio
+    async def test_cursor_walks_whole_history(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            user = await _user(db)
+            other = await _user(db)
+            await _history(db, user, 25)
+            await _history(db, other, 3)
+            service = NotificationService(db)
+
+            seen, after = [], None
+            while True:
+                page, has_more = await service.get_user_notifications(user.id, limit=10, after=after)
+                seen.extend(page)
+                if not has_more:
+                    break
+                after = tuple(decode_cursor(encode_cursor((page[-1].created_at, page[-1].id)), CURSOR_FIELDS))
+
+            assert len(seen) == 25
+            assert len({n.id for n in seen}) == 25
+            assert all(n.user_id == user.id for n in seen)
+            keys = [(n.created_at, str(n.id)) for n in seen]
+            assert keys == sorted(keys, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_deep_page_is_one_query(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            user = await _user(db)
+            await _history(db, user, 200)
+            service = NotificationService(db)
+            first, _ = await service.get_user_notifications(user.id, limit=150)
+
+            with query_counter(db.bind.sync_engine) as counter:
+                page, has_more = await service.get_user_notifications(
+                    user.id, limit=50, after=(first[-1].created_at, first[-1].id)
+                )
+
+            assert counter["count"] == 1
+            assert (len(page), has_more) == (50, False)
+            assert page[-1].message == "Reminder 0"
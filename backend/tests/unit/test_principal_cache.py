@@ -0,0 +1,57 @@
+"""
+Unit tests for the authenticated principal cache.
+"""
+
+import time
+import pytest
+from unittest.mock import MagicMock
+
+from app.core.principal_cache import PrincipalCache
+
+
+class TestPrincipalCache:
+    """Tests for PrincipalCache."""
+
+    @pytest.fixture
+    def cache(self):
+        return PrincipalCache(max_size=2, max_ttl_seconds=300)
+
+    def test_miss_then_hit(self, cache):
+        """Cached users should be returned and counted as hits."""
+        user = MagicMock(id="user-1")
+
+        assert cache.get("token-1") is None
+        cache.put("token-1", user, int(time.time()) + 60)
+
+        assert cache.get("token-1") is user
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_keyed_by_fingerprint(self, cache):
+        """Raw tokens should not be stored as keys."""
+        cache.put("secret-token", MagicMock(), None)
+        assert "secret-token" not in cache._entries
+        assert PrincipalCache.fingerprint("secret-token") in cache._entries
+
+    def test_entry_expires_with_token(self, cache):
+        """Entries should not outlive the token's exp claim."""
+        cache.put("token-1", MagicMock(), int(time.time()) - 1)
+        assert cache.get("token-1") is None
+
+    def test_lru_eviction(self, cache):
+        """Least recently used entry should be evicted when full."""
+        cache.put("a", MagicMock(), None)
+        cache.put("b", MagicMock(), None)
+        cache.get("a")
+        cache.put("c", MagicMock(), None)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_evict(self, cache):
+        """Evicting a token (logout) should remove its entry."""
+        cache.put("token-1", MagicMock(), None)
+        assert cache.evict("token-1") is True
+        assert cache.get("token-1") is None
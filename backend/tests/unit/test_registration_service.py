@@ -0,0 +1,295 @@
+"""
+Unit tests for RegistrationService.register / cancel.
+
+Tests:
+- Parallel sign-ups never overbook an activity; parallel waitlisters never tie
+- Duplicate, time-conflict and full-activity cases raise ConflictError,
+  including a duplicate that races past the check (unique constraint)
+- Cancelled registrations are reused and seats released
+- Validation runs as a single query and keeps the per-rule messages
+- Full activities waitlist; cancellations promote the queue head
+"""
+
+import asyncio
+import pytest
+from datetime import date, time, timedelta
+from uuid import uuid4
+
+from sqlalchemy import func, select
+
+from app.core.enums import MembershipType, RegistrationStatus, Role
+from app.db.models import Activity, Registration, User
+from app.services import catalog_version
+from app.services.registration_service import RegistrationService, ConflictError
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog_version(monkeypatch):
+    monkeypatch.setattr(catalog_version, "_catalog_version_instance", None)
+
+
+async def _activity(db, **overrides):
+    data = dict(
+        id=uuid4(),
+        title="Art Jam",
+        date=date.today() + timedelta(days=3),
+        start_time=time(10, 0),
+        end_time=time(12, 0),
+        max_capacity=10,
+        current_participants=0,
+    )
+    data.update(overrides)
+    activity = Activity(**data)
+    db.add(activity)
+    await db.commit()
+    return activity
+
+
+class TestRegister:
+    """Tests for RegistrationService.register."""
+
+    @pytest.mark.asyncio
+    async def test_parallel_signups_never_overbook(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=10)
+
+        async def attempt():
+            async with sqlite_sessionmaker() as db:
+                registration = await RegistrationService(db).register(uuid4(), activity.id)
+                return registration.status
+
+        results = await asyncio.gather(*(attempt() for _ in range(200)))
+
+        assert results.count(RegistrationStatus.CONFIRMED) == 10
+        assert results.count(RegistrationStatus.WAITLIST) == 190
+        async with sqlite_sessionmaker() as db:
+            refreshed = await db.get(Activity, activity.id)
+            confirmed = (await db.execute(
+                select(func.count(Registration.id)).where(
+                    Registration.activity_id == activity.id,
+                    Registration.status == RegistrationStatus.CONFIRMED
+                )
+            )).scalar_one()
+        assert refreshed.current_participants == 10
+        assert confirmed == 10
+
+    @pytest.mark.asyncio
+    async def test_parallel_waitlisters_get_distinct_positions(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=2)
+
+        async def attempt():
+            async with sqlite_sessionmaker() as db:
+                service = RegistrationService(db)
+                registration = await service.register(uuid4(), activity.id)
+                return registration.waitlist_position, await service.waitlist_rank(registration)
+
+        results = await asyncio.gather(*(attempt() for _ in range(50)))
+
+        waitlisted = [r for r in results if r[0] is not None]
+        assert len(waitlisted) == 48
+        assert sorted(position for position, _ in waitlisted) == list(range(1, 49))
+        assert sorted(rank for _, rank in waitlisted) == list(range(1, 49))
+
+    @pytest.mark.asyncio
+    async def test_seat_and_registration_commit_together(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db)
+            user_id = uuid4()
+
+            with query_counter(db.bind.sync_engine) as counter:
+                registration = await RegistrationService(db).register(user_id, activity.id)
+
+            assert registration.status == RegistrationStatus.CONFIRMED
+            # validation query, seat UPDATE, registration and outbox inserts
+            assert counter["count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_full_activity_waitlists(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=1, current_participants=1)
+            service = RegistrationService(db)
+
+            first = await service.register(uuid4(), activity.id)
+            second = await service.register(uuid4(), activity.id)
+
+            assert first.status == second.status == RegistrationStatus.WAITLIST
+            assert await service.waitlist_rank(first) == 1
+            assert await service.waitlist_rank(second) == 2
+            assert (await db.get(Activity, activity.id)).current_participants == 1
+
+            with pytest.raises(ConflictError, match="already on the waitlist"):
+                await service.register(first.user_id, activity.id)
+
+    @pytest.mark.asyncio
+    async def test_duplicate_rejected(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db)
+            user_id = uuid4()
+            service = RegistrationService(db)
+            await service.register(user_id, activity.id)
+
+            with pytest.raises(ConflictError, match="already registered"):
+                await service.register(user_id, activity.id)
+
+            refreshed = await db.get(Activity, activity.id)
+            assert refreshed.current_participants == 1
+
+    @pytest.mark.asyncio
+    async def test_parallel_duplicate_hits_unique_constraint(self, sqlite_sessionmaker, monkeypatch):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db)
+        user_id = uuid4()
+
+        # Hold both requests after their check, so neither sees the other's row
+        checked, both_checked = [], asyncio.Event()
+        original_check = RegistrationService.check
+
+        async def racing_check(self, *args):
+            result = await original_check(self, *args)
+            checked.append(result)
+            if len(checked) == 2:
+                both_checked.set()
+            await both_checked.wait()
+            return result
+
+        monkeypatch.setattr(RegistrationService, "check", racing_check)
+
+        async def attempt():
+            async with sqlite_sessionmaker() as db:
+                return await RegistrationService(db).register(user_id, activity.id)
+
+        results = await asyncio.gather(attempt(), attempt(), return_exceptions=True)
+
+        assert all(result.existing_id is None for result in checked)
+        assert sum(isinstance(r, Registration) for r in results) == 1
+        [error] = [r for r in results if isinstance(r, Exception)]
+        assert isinstance(error, ConflictError) and "already registered" in str(error)
+        async with sqlite_sessionmaker() as db:
+            rows = (await db.execute(
+                select(func.count(Registration.id)).where(Registration.user_id == user_id)
+            )).scalar_one()
+            refreshed = await db.get(Activity, activity.id)
+        assert rows == 1
+        # The loser's seat claim was rolled back with its insert
+        assert refreshed.current_participants == 1
+
+    @pytest.mark.asyncio
+    async def test_time_conflict_rejected(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            first = await _activity(db)
+            overlapping = await _activity(db, start_time=time(11, 0), end_time=time(13, 0))
+            user_id = uuid4()
+            service = RegistrationService(db)
+            await service.register(user_id, first.id)
+
+            with pytest.raises(ConflictError, match="Time conflict"):
+                await service.register(user_id, overlapping.id)
+
+    @pytest.mark.asyncio
+    async def test_weekly_membership_limit(self, sqlite_sessionmaker):
+        # Monday-to-Sunday weeks, as in validate_membership_limit
+        monday = date.today() + timedelta(days=7 - date.today().weekday())
+        async with sqlite_sessionmaker() as db:
+            user = User(id=uuid4(), email="p@example.com", hashed_password="x",
+                        role=Role.PARTICIPANT, membership_type=MembershipType.ONCE_WEEKLY)
+            db.add(user)
+            first = await _activity(db, date=monday)
+            same_week = await _activity(db, date=monday + timedelta(days=6))
+            next_week = await _activity(db, date=monday + timedelta(days=7))
+            service = RegistrationService(db)
+            await service.register(user.id, first.id)
+
+            with pytest.raises(ConflictError, match="Weekly registration limit exceeded"):
+                await service.register(user.id, same_week.id)
+            await service.register(user.id, next_week.id)
+
+    @pytest.mark.asyncio
+    async def test_messages_match_individual_checks(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            first = await _activity(db)
+            overlapping = await _activity(db, start_time=time(11, 0), end_time=time(13, 0))
+            user_id = uuid4()
+            service = RegistrationService(db)
+            await service.register(user_id, first.id)
+
+            with pytest.raises(ConflictError) as combined:
+                await service.validate_all(user_id, overlapping.id)
+            with pytest.raises(ConflictError) as individual:
+                await service.check_time_conflict(user_id, overlapping.id)
+
+            assert str(combined.value) == str(individual.value)
+
+    @pytest.mark.asyncio
+    async def test_missing_activity(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            with pytest.raises(ConflictError, match="Activity not found"):
+                await RegistrationService(db).register(uuid4(), uuid4())
+
+
+class TestCancel:
+    """Tests for RegistrationService.cancel."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_releases_seat_and_allows_reregistering(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=1)
+            user_id = uuid4()
+            service = RegistrationService(db)
+
+            registration = await service.register(user_id, activity.id)
+            await service.cancel(registration)
+            assert (await db.get(Activity, activity.id)).current_participants == 0
+
+            again = await service.register(user_id, activity.id)
+
+            assert again.id == registration.id
+            assert again.status == RegistrationStatus.CONFIRMED
+            assert (await db.get(Activity, activity.id)).current_participants == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_promotes_waitlist_head(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=1)
+            service = RegistrationService(db)
+            confirmed = await service.register(uuid4(), activity.id)
+            head = await service.register(uuid4(), activity.id)
+            behind = await service.register(uuid4(), activity.id)
+
+            promoted = await service.cancel(confirmed)
+
+            assert promoted.id == head.id
+            assert head.status == RegistrationStatus.CONFIRMED
+            assert head.waitlist_position is None
+            assert await service.waitlist_rank(behind) == 1
+            assert (await db.get(Activity, activity.id)).current_participants == 1
+
+    @pytest.mark.asyncio
+    async def test_promotion_skips_users_with_conflicts(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=1)
+            elsewhere = await _activity(db, start_time=time(9, 0), end_time=time(11, 0))
+            service = RegistrationService(db)
+            confirmed = await service.register(uuid4(), activity.id)
+            busy = await service.register(uuid4(), activity.id)
+            free = await service.register(uuid4(), activity.id)
+            # The head of the queue has since booked an overlapping activity
+            await service.register(busy.user_id, elsewhere.id)
+
+            promoted = await service.cancel(confirmed)
+
+            assert promoted.id == free.id
+            assert busy.status == RegistrationStatus.WAITLIST
+            assert await service.waitlist_rank(busy) == 1
+
+    @pytest.mark.asyncio
+    async def test_leaving_waitlist_keeps_seats(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=1)
+            service = RegistrationService(db)
+            await service.register(uuid4(), activity.id)
+            waiting = await service.register(uuid4(), activity.id)
+
+            assert await service.cancel(waiting) is None
+            assert waiting.status == RegistrationStatus.CANCELLED
+            assert (await db.get(Activity, activity.id)).current_participants == 1
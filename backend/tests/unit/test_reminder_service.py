@@ -0,0 +1,151 @@
+"""
+Unit tests for ReminderService.
+
+Tests:
+- Only activities starting inside the reminder window are claimed
+- Confirmed participants and volunteers get one reminder each
+- Each activity is reminded at most once, even with parallel schedulers
+- Claiming doesn't count as an edit (updated_at is kept); a rescheduled
+  activity is reminded again
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, time, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import select, update
+
+from app.core.enums import NotificationKind, RegistrationStatus, Role
+from app.db.models import Activity, OutboxMessage, Registration, User, VolunteerMatch
+from app.services.reminder_service import ReminderService
+
+NOW = datetime(2026, 3, 10, 15, 30)
+
+
+async def _activity(db, starts_at):
+    activity = Activity(
+        id=uuid4(),
+        title="Music Therapy",
+        date=starts_at.date(),
+        start_time=starts_at.time(),
+        end_time=time(23, 59),
+        max_capacity=10,
+        current_participants=0,
+    )
+    db.add(activity)
+    await db.commit()
+    return activity
+
+
+async def _user(db):
+    user = User(id=uuid4(), email=f"{uuid4()}@example.com", hashed_password="x", role=Role.PARTICIPANT)
+    db.add(user)
+    await db.commit()
+    return user
+
+
+async def _reminders(db):
+    return (await db.execute(
+        select(OutboxMessage.user_id, OutboxMessage.activity_id)
+        .where(OutboxMessage.kind == NotificationKind.ACTIVITY_REMINDER.value)
+    )).all()
+
+
+class TestEnqueueDue:
+    """Tests for ReminderService.enqueue_due."""
+
+    @pytest.mark.asyncio
+    async def test_only_activities_in_window_are_claimed(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            started = await _activity(db, NOW - timedelta(minutes=5))
+            soon = await _activity(db, NOW + timedelta(hours=2))
+            tomorrow = await _activity(db, NOW + timedelta(hours=23, minutes=59))
+            later = await _activity(db, NOW + timedelta(hours=24, minutes=1))
+
+            await ReminderService(db).enqueue_due(now=NOW)
+
+            claimed = (await db.execute(
+                select(Activity.id).where(Activity.reminder_sent_at.is_not(None))
+            )).scalars().all()
+            assert set(claimed) == {soon.id, tomorrow.id}
+            assert started.id not in claimed and later.id not in claimed
+
+    @pytest.mark.asyncio
+    async def test_confirmed_registrants_and_volunteers_reminded_once(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, NOW + timedelta(hours=20))
+            participant, waitlisted, volunteer, cancelled = [await _user(db) for _ in range(4)]
+            db.add_all([
+                Registration(user_id=participant.id, activity_id=activity.id, status=RegistrationStatus.CONFIRMED),
+                Registration(user_id=waitlisted.id, activity_id=activity.id, status=RegistrationStatus.WAITLIST),
+                VolunteerMatch(volunteer_id=volunteer.id, activity_id=activity.id, status=RegistrationStatus.CONFIRMED),
+                VolunteerMatch(volunteer_id=cancelled.id, activity_id=activity.id, status=RegistrationStatus.CANCELLED),
+            ])
+            await db.commit()
+
+            with query_counter(db.bind.sync_engine) as counter:
+                queued = await ReminderService(db).enqueue_due(now=NOW)
+
+            # claim UPDATE, recipients query, bulk outbox INSERT
+            assert counter["count"] == 3
+            assert queued == 2
+            assert set(await _reminders(db)) == {(participant.id, activity.id), (volunteer.id, activity.id)}
+
+            assert await ReminderService(db).enqueue_due(now=NOW + timedelta(minutes=1)) == 0
+            assert len(await _reminders(db)) == 2
+
+    @pytest.mark.asyncio
+    async def test_parallel_schedulers_fire_once(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, NOW + timedelta(hours=3))
+            users = [await _user(db) for _ in range(5)]
+            db.add_all([
+                Registration(user_id=u.id, activity_id=activity.id, status=RegistrationStatus.CONFIRMED)
+                for u in users
+            ])
+            await db.commit()
+
+        async def tick():
+            async with sqlite_sessionmaker() as db:
+                return await ReminderService(db).enqueue_due(now=NOW)
+
+        results = await asyncio.gather(*(tick() for _ in range(4)))
+
+        assert sorted(results) == [0, 0, 0, 5]
+        async with sqlite_sessionmaker() as db:
+            assert len(await _reminders(db)) == 5
+
+    @pytest.mark.asyncio
+    async def test_claim_keeps_updated_at(self, sqlite_sessionmaker):
+        edited_at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, NOW + timedelta(hours=2))
+            await db.execute(update(Activity).where(Activity.id == activity.id).values(updated_at=edited_at))
+            await db.commit()
+
+            await ReminderService(db).enqueue_due(now=NOW)
+
+            row = (await db.execute(
+                select(Activity.updated_at, Activity.reminder_sent_at).where(Activity.id == activity.id)
+            )).one()
+            assert row.reminder_sent_at is not None
+            assert row.updated_at.replace(tzinfo=timezone.utc) == edited_at
+
+    @pytest.mark.asyncio
+    async def test_rescheduled_activity_is_reminded_again(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, NOW + timedelta(hours=2))
+            user = await _user(db)
+            db.add(Registration(user_id=user.id, activity_id=activity.id, status=RegistrationStatus.CONFIRMED))
+            await db.commit()
+            assert await ReminderService(db).enqueue_due(now=NOW) == 1
+
+            # What PUT /activities/{id} does when the date or start time changes
+            await db.execute(
+                update(Activity).where(Activity.id == activity.id).values(start_time=time(19, 0), reminder_sent_at=None)
+            )
+            await db.commit()
+
+            assert await ReminderService(db).enqueue_due(now=NOW) == 1
+            assert len(await _reminders(db)) == 2
@@ -0,0 +1,195 @@
+"""
+Unit tests for SeatHoldService.
+
+Tests:
+- Holds count against capacity for holds and registrations alike
+- Confirming converts the held seat into a registration; a conflict releases it
+- Expired holds can't be confirmed and are swept in bulk
+- Released seats promote the waitlist
+"""
+
+import asyncio
+import pytest
+from datetime import date, datetime, time, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import func, select
+
+from app.core.enums import RegistrationStatus
+from app.db.models import Activity, SeatHold
+from app.services import catalog_version
+from app.services.registration_service import ConflictError, RegistrationService
+from app.services.seat_hold_service import HoldExpiredError, SeatHoldService
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog_version(monkeypatch):
+    monkeypatch.setattr(catalog_version, "_catalog_version_instance", None)
+
+
+async def _activity(db, **overrides):
+    data = dict(
+        id=uuid4(),
+        title="Music Therapy",
+        date=date.today() + timedelta(days=3),
+        start_time=time(14, 0),
+        end_time=time(15, 0),
+        max_capacity=2,
+        current_participants=0,
+    )
+    data.update(overrides)
+    activity = Activity(**data)
+    db.add(activity)
+    await db.commit()
+    return activity
+
+
+async def _seats(db, activity_id):
+    """(held_seats, current_participants) as stored"""
+    return tuple((await db.execute(
+        select(Activity.held_seats, Activity.current_participants).where(Activity.id == activity_id)
+    )).one())
+
+
+async def _expire(db, hold):
+    hold.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await db.commit()
+
+
+class TestHold:
+    """Tests for SeatHoldService.hold."""
+
+    @pytest.mark.asyncio
+    async def test_holds_count_against_capacity(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=2)
+            service = SeatHoldService(db)
+            await service.hold(uuid4(), activity.id)
+            await service.hold(uuid4(), activity.id)
+
+            with pytest.raises(ConflictError, match="Activity is full"):
+                await service.hold(uuid4(), activity.id)
+            registration = await RegistrationService(db).register(uuid4(), activity.id)
+
+            assert registration.status == RegistrationStatus.WAITLIST
+            assert await _seats(db, activity.id) == (2, 0)
+
+    @pytest.mark.asyncio
+    async def test_holding_again_extends(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db)
+            user_id = uuid4()
+            service = SeatHoldService(db)
+
+            first = await service.hold(user_id, activity.id)
+            expires_at = first.expires_at
+            await asyncio.sleep(0.01)
+            second = await service.hold(user_id, activity.id)
+
+            assert second.id == first.id
+            assert second.expires_at > expires_at
+            assert await _seats(db, activity.id) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_parallel_holds_never_oversubscribe(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=5)
+
+        async def attempt():
+            async with sqlite_sessionmaker() as db:
+                try:
+                    await SeatHoldService(db).hold(uuid4(), activity.id)
+                    return True
+                except ConflictError:
+                    return False
+
+        results = await asyncio.gather(*(attempt() for _ in range(50)))
+
+        assert results.count(True) == 5
+        async with sqlite_sessionmaker() as db:
+            assert await _seats(db, activity.id) == (5, 0)
+
+
+class TestConfirm:
+    """Tests for SeatHoldService.confirm."""
+
+    @pytest.mark.asyncio
+    async def test_confirm_moves_seat_to_registration(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=1)
+            service = SeatHoldService(db)
+            hold = await service.hold(uuid4(), activity.id)
+
+            registration = await service.confirm(hold)
+
+            assert registration.status == RegistrationStatus.CONFIRMED
+            assert await _seats(db, activity.id) == (0, 1)
+            assert (await db.execute(select(func.count(SeatHold.id)))).scalar_one() == 0
+
+            with pytest.raises(ConflictError):
+                await service.confirm(hold)
+
+    @pytest.mark.asyncio
+    async def test_expired_hold_cannot_be_confirmed(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db)
+            service = SeatHoldService(db)
+            hold = await service.hold(uuid4(), activity.id)
+            await _expire(db, hold)
+
+            with pytest.raises(HoldExpiredError):
+                await service.confirm(hold)
+            assert await _seats(db, activity.id) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_conflict_releases_hold(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db)
+            overlapping = await _activity(db)
+            user_id = uuid4()
+            service = SeatHoldService(db)
+            hold = await service.hold(user_id, activity.id)
+            await RegistrationService(db).register(user_id, overlapping.id)
+
+            with pytest.raises(ConflictError, match="Time conflict"):
+                await service.confirm(hold)
+
+            assert await _seats(db, activity.id) == (0, 0)
+            assert (await db.execute(select(func.count(SeatHold.id)))).scalar_one() == 0
+
+
+class TestRelease:
+    """Tests for release and the expiry sweep."""
+
+    @pytest.mark.asyncio
+    async def test_sweep_releases_expired_in_bulk(self, sqlite_sessionmaker, query_counter):
+        async with sqlite_sessionmaker() as db:
+            activities = [await _activity(db, max_capacity=10) for _ in range(3)]
+            service = SeatHoldService(db)
+            holds = [await service.hold(uuid4(), a.id) for a in activities for _ in range(4)]
+            for hold in holds[:10]:
+                hold.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            await db.commit()
+
+            with query_counter(db.bind.sync_engine) as counter:
+                released, promoted = await service.release_expired()
+
+            assert (released, promoted) == (10, [])
+            # DELETE, one UPDATE for every activity, waitlist lookup
+            assert counter["count"] == 3
+            assert [await _seats(db, a.id) for a in activities] == [(0, 0), (0, 0), (2, 0)]
+
+    @pytest.mark.asyncio
+    async def test_released_seat_promotes_waitlist(self, sqlite_sessionmaker):
+        async with sqlite_sessionmaker() as db:
+            activity = await _activity(db, max_capacity=1)
+            service = SeatHoldService(db)
+            hold = await service.hold(uuid4(), activity.id)
+            waiting = await RegistrationService(db).register(uuid4(), activity.id)
+            assert waiting.status == RegistrationStatus.WAITLIST
+
+            promoted = await service.release(hold)
+
+            assert promoted.id == waiting.id
+            assert waiting.status == RegistrationStatus.CONFIRMED
+            assert await _seats(db, activity.id) == (0, 1)